@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# See LICENSE for details.
+
+"""
+Benchmarks for :py:mod:`elffile`.  Run with the names of the
+benchmarks wanted, or with none to run them all.
+"""
+
+from __future__ import unicode_literals, print_function
+
+__docformat__ = 'restructuredtext en'
+
+import mmap
+import optparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import elffile
+
+def _allocated(fn):
+    """
+    Return the result of calling *fn* along with the number of bytes it
+    left allocated.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return result, after - before
+
+def bench_sizes(count=100000):
+    """
+    Per-object memory of the slotted header classes compared with
+    plain classes holding the same attributes in a per-instance
+    :py:attr:`__dict__`, (which is what they were before they grew
+    :py:attr:`__slots__`).
+    """
+
+    for cls in [elffile.ElfFileIdent,
+                elffile.ElfFileHeader64l,
+                elffile.ElfSectionHeader64l,
+                elffile.ElfProgramHeader64l]:
+        names = [slot for c in cls.__mro__ for slot in getattr(c, '__slots__', ())]
+        values = tuple(range(1000, 1000 + len(names)))
+        withDict = type(str('Dict' + cls.__name__), (object,), {})
+
+        results = []
+        for c in [withDict, cls]:
+            def build():
+                objs = []
+                for i in range(count):
+                    obj = c()
+                    for name, value in zip(names, values):
+                        setattr(obj, name, value)
+                    objs.append(obj)
+                return objs
+
+            objs, size = _allocated(build)
+            results.append(size / float(count))
+            del objs
+
+        print('{0:24} dict: {1:7.1f} B  slots: {2:7.1f} B  saved: {3:5.1f}%'
+              .format(cls.__name__, results[0], results[1],
+                      100.0 * (results[0] - results[1]) / results[0]))
+
+def bench_pack(size=1024, sections=64, workers=None):
+    """
+    Serial against parallel :py:meth:`elffile.ElfFile.pack_into` of a
+    synthetic file of about *size* MiB, (an object file from the test
+    files with *sections* big PROGBITS sections added), into an
+    :py:class:`mmap.mmap` of a file truncated to fit.
+    """
+
+    ef = elffile.open(name=os.path.join('testfiles', 'x86_64-unknown-linux-gnu', 'a.o'))
+
+    chunk = os.urandom(1 << 20)
+    perSection = max(1, size // sections)
+    for i in range(sections):
+        sh = ef.sectionHeaderClass()
+        sh.name = '.synthetic.{0}'.format(i).encode('ascii')
+        sh.type = elffile.SHT.byname['SHT_PROGBITS'].code
+        sh.flags = sh.addr = sh.offset = sh.link = sh.info = sh.entsize = 0
+        sh.addralign = 1
+        sh.content = chunk * perSection
+        sh.section_size = len(sh.content)
+        ef.sectionHeaders.append(sh)
+
+    ef.fileHeader.shnum = len(ef.sectionHeaders)
+    total = ef.size
+
+    print('{0} sections, {1:.1f} MiB, numpy: {2}'.format(len(ef.sectionHeaders), total / float(1 << 20),
+                                                         'yes' if elffile.numpy is not None else 'no'))
+
+    with tempfile.TemporaryFile() as f:
+        f.truncate(total)
+        m = mmap.mmap(f.fileno(), total)
+
+        # once untimed, so neither run pays for faulting in the pages
+        ef.pack_into(m)
+
+        for w in [None, workers or os.cpu_count()]:
+            start = time.time()
+            ef.pack_into(m, workers=w)
+            elapsed = time.time() - start
+
+            print('workers: {0:>6}  {1:7.3f} s  {2:8.1f} MiB/s'.format(w or 'serial', elapsed,
+                                                                     total / float(1 << 20) / elapsed))
+
+        m.close()
+
+benchmarks = {
+    'pack': bench_pack,
+    'sizes': bench_sizes,
+    }
+
+if __name__ == '__main__':
+    parser = optparse.OptionParser(usage='usage: %prog [benchmark [benchmark ...]]')
+    parser.add_option('--size', type='int', default=1024,
+                      help='size of the synthetic file for pack, in MiB, (default %default)')
+    parser.add_option('--workers', type='int', default=None,
+                      help='threads for parallel pack, (default one per cpu)')
+    options, args = parser.parse_args()
+
+    kwargs = {
+        'pack': {'size': options.size, 'workers': options.workers},
+        }
+
+    for name in args or sorted(benchmarks):
+        print('== {0}'.format(name))
+        benchmarks[name](**kwargs.get(name, {}))
+
+    sys.exit()
@@ -26,16 +26,34 @@ __docformat__ = 'restructuredtext en'
 
 #__all__ = []
 
+import array
+import asyncio
+import bisect
+import collections
+import concurrent.futures
 import functools
+import hashlib
 import io
+import itertools
+import marshal
 import mmap
 import operator
 import os
+import re
 import struct
+import sys
+import tempfile
+import threading
+import weakref
 
 import coding
 
-def open(name=None, fileobj=None, map=None, block=None):
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def open(name=None, fileobj=None, map=None, block=None, lazy=False, zero_copy=False):
     """
 
     The open function takes some form of file identifier and creates
@@ -45,6 +63,12 @@ def open(name=None, fileobj=None, map=None, block=None):
     :param :py:class:`file` fileobj: if given, this overrides *name*
     :param :py:class:`mmap.mmap` map: if given, this overrides *fileobj*
     :param :py:class:`bytes` block: file contents in a block of memory, (if given, this overrides *map*)
+    :param :py:class:`bool` lazy: if true, section and segment
+        contents are not copied out of the file until first accessed.
+        See :py:meth:`ElfFile.unpack_from`.
+    :param :py:class:`bool` zero_copy: if true, section and segment
+        contents are :py:class:`memoryview` slices of the file rather
+        than copies.  See :py:meth:`ElfFile.unpack_from`.
 
     The file to be used can be specified in any of four different
     forms, (in reverse precedence):
@@ -53,39 +77,301 @@ def open(name=None, fileobj=None, map=None, block=None):
     #. :py:class:`file` object
     #. :py:mod:`mmap.mmap`, or
     #. a block of memory
+
+    When contents are read eagerly, *fileobj* and any
+    :py:class:`mmap.mmap` created here are closed before returning.
+    When *lazy* or *zero_copy* is set, they belong to the returned
+    :py:class:`ElfFile` instead and are released by
+    :py:meth:`ElfFile.close`, (or on leaving a ``with`` block).  A
+    *map* or *block* supplied by the caller is never closed here.
     """
 
-    if block:
-        if not name:
-            name = '<unknown>'
+    ownedMap = None
+    ownedFile = None
+
+    if not block:
+        if not map:
+            if not fileobj:
+                assert name
+                fileobj = ownedFile = io.open(os.path.normpath(os.path.expanduser(name)), 'rb')
+
+            try:
+                map = ownedMap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+            except Exception:
+                if ownedFile is not None:
+                    ownedFile.close()
+                raise
 
+        block = map
+
+    if not name:
+        name = '<unknown>'
+
+    ef = None
+    try:
         efi = ElfFileIdent()
         efi.unpack_from(block)
 
         ef = ElfFile.encodedClass(efi)(name, efi)
-        ef.unpack_from(block)
+        ef.unpack_from(block, lazy=lazy, zero_copy=zero_copy)
+
+    except Exception:
+        # a partial zero_copy parse holds views of the map, which
+        # close releases first
+        if ef is not None:
+            ef._map = ownedMap
+            ef._fileobj = ownedFile
+            ef.close()
+
+        else:
+            if ownedMap is not None:
+                ownedMap.close()
+
+            if ownedFile is not None:
+                ownedFile.close()
+
+        raise
+
+    if lazy or zero_copy:
+        ef._map = ownedMap
+        ef._fileobj = fileobj
+
+    else:
+        if ownedMap is not None:
+            ownedMap.close()
 
         if fileobj:
             fileobj.close()
 
-        return ef
+    return ef
+
+def open_archive(name=None, fileobj=None, map=None, block=None):
+    """
+    The open_archive function is to ``ar`` archives, (static
+    libraries), what :py:func:`open` is to ELF files.  It takes the
+    same forms of file identifier and returns an
+    :py:class:`ElfArchive`.
+
+    :param :py:class:`str` name: a file name
+    :param :py:class:`file` fileobj: if given, this overrides *name*
+    :param :py:class:`mmap.mmap` map: if given, this overrides *fileobj*
+    :param :py:class:`bytes` block: archive contents in a block of memory, (if given, this overrides *map*)
+
+    Members are read straight out of the archive as they are wanted,
+    so *fileobj* and any :py:class:`mmap.mmap` created here belong to
+    the returned :py:class:`ElfArchive` and are released by
+    :py:meth:`ElfArchive.close`, (or on leaving a ``with`` block).
+    """
+
+    ownedMap = None
+
+    if not block:
+        if not map:
+            if not fileobj:
+                assert name
+                fileobj = io.open(os.path.normpath(os.path.expanduser(name)), 'rb')
+
+            map = ownedMap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
 
-    if map:
         block = map
 
-    elif fileobj:
-        map = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+    if not name:
+        name = '<unknown>'
 
-    elif name:
-        fileobj = io.open(os.path.normpath(os.path.expanduser(name)), 'rb')
+    try:
+        archive = ElfArchive(name, block)
+    except ElfArchive.NOT_ARCHIVE:
+        if ownedMap is not None:
+            ownedMap.close()
+            fileobj.close()
+        raise
+
+    archive._map = ownedMap
+    archive._fileobj = fileobj if ownedMap is not None else None
+    return archive
+
+class _PositionalReader(object):
+    """
+    Reads slices of an open file with :py:func:`os.pread`, without
+    moving the file position or mapping the file.  The first *head*
+    bytes are read once up front since the file header, program
+    header table and often PT_INTERP and PT_NOTE all live there.
+    """
+
+    def __init__(self, fd, head=4096):
+        self.fd = fd
+        self.head = os.pread(fd, head, 0)
+
+    def __getitem__(self, key):
+        start, stop = key.start, key.stop
+        if stop <= len(self.head):
+            return self.head[start:stop]
+
+        return os.pread(self.fd, stop - start, start)
+
+def scan(name=None, fileobj=None, sections=False):
+    """
+    Read just enough of a file to answer dependency questions: the
+    :py:class:`ElfFileIdent`, :py:class:`ElfFileHeader` and program
+    header table, plus the contents of the PT_DYNAMIC, PT_INTERP and
+    PT_NOTE segments and the dynamic string table.  Everything is
+    read with positioned reads, (:py:func:`os.pread`), so a typical
+    shared object costs three small reads rather than a mapping of
+    the whole file.
+
+    :param :py:class:`str` name: a file name
+    :param :py:class:`file` fileobj: if given, this overrides *name*
+        and is left open
+    :param :py:class:`bool` sections: also read the section header
+        table and the section names, (two more reads)
+    :rtype: :py:class:`ElfFile`
+
+    Only the segments listed above have
+    :py:attr:`ElfProgramHeader.content`, and no section has contents
+    apart from the section name table, but :py:meth:`ElfFile.dynamic`,
+    :py:meth:`ElfFile.interpreter` and :py:meth:`ElfFile.build_id`
+    work as usual, (the dynamic section is decoded here, while the
+    file is open).
+    """
+
+    ownedFile = None
+    if not fileobj:
+        assert name
+        fileobj = ownedFile = io.open(os.path.normpath(os.path.expanduser(name)), 'rb')
+
+    if not name:
+        name = '<unknown>'
+
+    try:
+        reader = _PositionalReader(fileobj.fileno())
+
+        efi = ElfFileIdent()
+        efi.unpack_from(reader.head)
+
+        ef = ElfFile.encodedClass(efi)(name, efi)
+        ef._unpack_file_header(reader.head, 0)
+
+        header = ef.fileHeader
+        if header.phoff != 0:
+            segmentCount = header.phnum
+
+            if segmentCount == ElfProgramHeader.PN_XNUM:
+                first = ef.sectionHeaderClass().unpack_from(reader[header.shoff:header.shoff + ef.sectionHeaderClass.size])
+                segmentCount = first.info
+
+            table = reader[header.phoff:header.phoff + (segmentCount * header.phentsize)]
+            ef.programHeaders = ef.programHeaderClass.unpack_table(table, 0, segmentCount, header.phentsize)
+
+        wanted = (PT.byname['PT_DYNAMIC'].code, PT.byname['PT_INTERP'].code, PT.byname['PT_NOTE'].code)
+        for ph in ef.programHeaders:
+            if ph.type in wanted:
+                ph.content = reader[ph.offset:ph.offset + ph.filesz]
+            elif ph.type == PT.byname['PT_LOAD'].code:
+                # only for mapping DT_STRTAB in ElfFile.dynamic() below
+                ph._contentSource = (reader, ph.offset, ph.offset + ph.filesz)
+
+        try:
+            ef.dynamic()
+        finally:
+            for ph in ef.programHeaders:
+                ph._contentSource = None
+
+        if sections and header.shoff != 0:
+            first = ef.sectionHeaderClass().unpack_from(reader[header.shoff:header.shoff + ef.sectionHeaderClass.size])
+            sectionCount = header.shnum or first.section_size
+
+            table = reader[header.shoff:header.shoff + (sectionCount * header.shentsize)]
+            ef.sectionHeaders = ef.sectionHeaderClass.unpack_table(table, 0, sectionCount, header.shentsize)
+
+            names = ef.sectionHeaders[header.shstrndx]
+            names.content = reader[names.offset:names.offset + names.section_size]
+            ef._unpack_section_names()
+
+    finally:
+        if ownedFile is not None:
+            ownedFile.close()
+
+    return ef
+
+def _copy_range(src, dst, start, count, position):
+    """
+    Copy *count* bytes at offset *start* of file descriptor *src* to
+    offset *position* of file descriptor *dst* inside the kernel, with
+    :py:func:`os.copy_file_range` where available and
+    :py:func:`os.sendfile` otherwise.  Return False, having copied
+    nothing, if neither can be used for this pair of files.
+    """
+
+    useCopy = hasattr(os, 'copy_file_range')
+    done = 0
+    while done < count:
+        try:
+            if useCopy:
+                n = os.copy_file_range(src, dst, count - done, start + done, position + done)
+            else:
+                os.lseek(dst, position + done, os.SEEK_SET)
+                n = os.sendfile(dst, src, start + done, count - done)
+
+        except OSError:
+            if done:
+                raise
+
+            if useCopy and hasattr(os, 'sendfile'):
+                # older kernels refuse copies between file systems
+                useCopy = False
+                continue
+
+            return False
+
+        if n == 0:
+            raise IOError('source file is shorter than expected')
+
+        done += n
+
+    return True
+
+def _contentView(header):
+    """
+    Return a :py:class:`memoryview` of the content of the section or
+    segment *header* without reading it into :py:attr:`content` if
+    it hasn't been already.  The caller releases it.
+    """
+
+    if header._contentSource is None:
+        return memoryview(header._content)
+
+    block, start, stop = header._contentSource
+    with memoryview(block) as view:
+        return view[start:stop]
 
+def _contentSize(header):
+    """
+    Return the length of the content of the section or segment
+    *header*, again without reading it.
+    """
+
+    if header._contentSource is None:
+        return len(header._content)
+
+    block, start, stop = header._contentSource
+    return stop - start
+
+_numpyCopySize = 1 << 20
+"""
+Copies of at least this many bytes are done by :py:mod:`numpy`, if
+available, which drops the GIL while copying.
+"""
+
+def _copy_into(block, start, view):
+    """
+    Copy the :py:class:`memoryview` *view* into *block* at *start*.
+    """
+
+    if numpy is not None and len(view) >= _numpyCopySize:
+        numpy.copyto(numpy.frombuffer(block, numpy.uint8, len(view), start),
+                     numpy.frombuffer(view, numpy.uint8))
     else:
-        assert False
-        
-    return open(name=name,
-                fileobj=fileobj,
-                map=map,
-                block=block)
+        block[start:start + len(view)] = view
 
 class StructBase(object):
     """
@@ -93,6 +379,8 @@ class StructBase(object):
     based on a struct.
     """
 
+    __slots__ = ()
+
     coder = None
     """
     The :py:class:`struct.Struct` used to encode/decode this object
@@ -110,6 +398,64 @@ class StructBase(object):
     for packing this instance.
     """
 
+    _fields = ()
+    """
+    The names of the attributes which correspond, in order, to the
+    values encoded by :py:attr:`coder`.  Used by
+    :py:meth:`unpack_table`.  This is expected to be overridden by
+    subclasses.
+    """
+
+    def __init__(self):
+        # instances are slotted, so there are no class level defaults
+        # to fall back on.
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                setattr(self, slot, None)
+
+    @classmethod
+    def _from_values(cls, values):
+        """
+        Build an instance directly from a tuple of decoded *values*
+        without going through :py:meth:`unpack_from`.  Subclasses
+        which are unpacked in bulk override this with a straight tuple
+        assignment which also skips :py:meth:`__init__`.
+        """
+        self = cls()
+        for field, value in zip(cls._fields, values):
+            setattr(self, field, value)
+        return self
+
+    @classmethod
+    def unpack_table(cls, block, offset, count, entsize=None):
+        """
+        Unpack a table of consecutive structs, (like the section
+        header table), in one pass.
+
+        :param string block: block of memory from which to unpack
+        :param int offset: offset into the memory block of the first entry
+        :param int count: number of entries in the table
+        :param int entsize: distance in bytes between entries, if
+            other than :py:attr:`size`
+        :rtype: :py:class:`list` of instances of this class
+
+        When entries are exactly :py:attr:`size` bytes apart, the
+        whole table is decoded with :py:meth:`struct.Struct.iter_unpack`.
+        Otherwise this falls back to one :py:meth:`unpack_from` per
+        entry.
+        """
+        size = cls.coder.size
+
+        if count <= 0:
+            return []
+
+        if entsize not in (None, size):
+            return [cls().unpack_from(block, offset + (i * entsize)) for i in range(count)]
+
+        fromValues = cls._from_values
+        with memoryview(block) as view:
+            return [fromValues(values) for values in cls.coder.iter_unpack(view[offset:offset + (count * size)])]
+
     def unpack(self, block):
         return self.unpack_from(block)
 
@@ -158,6 +504,190 @@ class StructBase(object):
         return self == other
 
 
+class StructTable(object):
+    """
+    A columnar representation of a table of structs, (like the
+    section header table), decoded in one pass.  Rather than one
+    :py:class:`StructBase` instance per entry, there is one array per
+    field of *structClass*, keyed by the names in
+    :py:attr:`StructBase._fields`.
+
+    Columns are :py:class:`array.array`'s, or, if *use_numpy* is set,
+    native byte order :py:class:`numpy.ndarray`'s decoded through a
+    structured dtype.  Either way the columns are copies, so *block*
+    is not referenced once the table is built.  The query methods
+    work on both and run vectorized with numpy.
+    """
+
+    structClass = None
+    """
+    The :py:class:`StructBase` subclass describing one entry.
+    """
+
+    columns = None
+    """
+    A :py:class:`dict` mapping field names to arrays.
+    """
+
+    use_numpy = False
+    """
+    True if :py:attr:`columns` are :py:class:`numpy.ndarray`'s.
+    """
+
+    _numpyCodes = {
+        'B': 'u1', 'H': 'u2', 'I': 'u4', 'Q': 'u8',
+        'b': 'i1', 'h': 'i2', 'i': 'i4', 'q': 'i8',
+        }
+
+    _nativeOrder = '<' if sys.byteorder == 'little' else '>'
+
+    def __init__(self, structClass, block, offset, count, entsize=None, use_numpy=False):
+        """
+        :param :py:class:`type` structClass: the class of each entry
+        :param string block: block of memory from which to unpack
+        :param int offset: offset into the memory block of the first entry
+        :param int count: number of entries in the table
+        :param int entsize: distance in bytes between entries, if
+            other than the size of *structClass*
+        :param :py:class:`bool` use_numpy: decode into numpy arrays
+        """
+
+        coder = structClass.coder
+        if entsize is None:
+            entsize = coder.size
+
+        fmt = coder.format
+        if not isinstance(fmt, str):
+            fmt = fmt.decode('ascii')
+
+        order = fmt[0] if fmt[0] in '@=<>!' else '@'
+        codes = [c for c in fmt.lstrip('@=<>!') if c != 'x']
+        fields = structClass._fields
+        assert len(codes) == len(fields)
+
+        self.structClass = structClass
+        self.use_numpy = use_numpy
+        self.columns = {}
+
+        if use_numpy:
+            if numpy is None:
+                raise ImportError('numpy is required for use_numpy')
+
+            order = {'<': '<', '>': '>', '!': '>'}.get(order, '=')
+            formats = [order + self._numpyCodes[c] for c in codes]
+            offsets = [struct.calcsize(order + ''.join(codes[:i])) for i in range(len(codes))]
+            dtype = numpy.dtype({'names': list(fields), 'formats': formats,
+                                 'offsets': offsets, 'itemsize': entsize})
+
+            records = numpy.frombuffer(block, dtype=dtype, count=count, offset=offset)
+            for name, code in zip(fields, codes):
+                self.columns[name] = records[name].astype(self._numpyCodes[code])
+
+            return
+
+        size = struct.calcsize(order + codes[0]) if codes else 0
+        if (count > 0 and entsize == coder.size
+            and all(struct.calcsize(order + c) == size and array.array(c).itemsize == size for c in codes)):
+            # every field is the same width, (as in relocation
+            # entries), so decode the whole table as one array of
+            # words and stride through it for each column.
+            word = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}[size]
+            words = array.array(word)
+            with memoryview(block) as view:
+                words.frombytes(view[offset:offset + (count * entsize)])
+
+            if order in ('<', '>', '!') and order != self._nativeOrder:
+                words.byteswap()
+
+            for i, (name, code) in enumerate(zip(fields, codes)):
+                column = words[i::len(codes)]
+                self.columns[name] = column if code == word else array.array(code, column.tobytes())
+
+            return
+
+        if count <= 0:
+            values = []
+
+        elif entsize == coder.size:
+            with memoryview(block) as view:
+                values = list(coder.iter_unpack(view[offset:offset + (count * entsize)]))
+
+        else:
+            values = [coder.unpack_from(block, offset + (i * entsize)) for i in range(count)]
+
+        for name, code, column in zip(fields, codes, zip(*values) if values else [()] * len(fields)):
+            self.columns[name] = array.array(code, column)
+
+    def __len__(self):
+        return len(self.columns[self.structClass._fields[0]])
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def equal(self, field, value):
+        """
+        Return the indices of the entries whose *field* is *value*.
+        """
+        column = self.columns[field]
+
+        if self.use_numpy:
+            return numpy.flatnonzero(column == value)
+
+        return list(itertools.compress(range(len(column)), map(value.__eq__, column)))
+
+    def masked(self, field, mask):
+        """
+        Return the indices of the entries whose *field* has any of the
+        bits in *mask* set, (as for :py:class:`SHF` flags).
+        """
+        column = self.columns[field]
+
+        if self.use_numpy:
+            return numpy.flatnonzero(column & mask)
+
+        return list(itertools.compress(range(len(column)), map(mask.__and__, column)))
+
+    def total(self, field, indices=None):
+        """
+        Return the sum of *field* over the entries in *indices*, (or
+        over all entries).
+        """
+        column = self.columns[field]
+
+        if self.use_numpy:
+            return int(column.sum() if indices is None else column[indices].sum())
+
+        if indices is None:
+            return sum(column)
+
+        return sum(map(column.__getitem__, indices))
+
+
+class _Content(object):
+    """
+    A descriptor for the content of sections and segments.  Contents
+    can either be set outright or deferred, (see
+    :py:meth:`ElfFile.unpack_from`), in which case the owner records
+    a (block, start, stop) triple in *_contentSource* and the bytes
+    are sliced out of the block only on first access.
+    """
+
+    def __get__(self, obj, t):
+        if obj is None:
+            return self
+
+        if obj._contentSource is not None:
+            block, start, stop = obj._contentSource
+            obj._content = block[start:stop]
+            obj._contentSource = None
+
+        return obj._content
+
+    def __set__(self, obj, value):
+        obj._content = value
+        obj._contentSource = None
+
+
 EI_NIDENT = 16
 """
 Length of the byte-endian-independent, word size independent initial
@@ -178,40 +708,31 @@ class ElfFileIdent(StructBase):
     :py:class:`coding.Coding` subclasses.
     """
 
-    magic = None
-    """
-    The magic 'number' which should be '\x7fELF' for all ELF format files. 
-    """
-
-    elfClass = None
-    """
-    The 'class', (sic), of the file which represents whether the file
-    is 32-bit or 64-bit.  Encoded using :py:class:`ElfClass`.
-    """
-
-    elfData = None
-    """
-    The 'data', (sic), of the file which represents the endian-ness
-    used to encode this file.  Encoded using :py:class:`ElfData`.
-    """
-
-    fileVersion = None
-    """
-    The version of the ELF format used to encode this file.  Must be
-    :py:const:`EV_CURRENT`.  Encoded using :py:class:`EV`.
-    """
-
-    osabi = None
-    """
-    Represents the operating system for which this ELF file is
-    intended.  Encoded using :py:class:`ElfOsabi`.
-    """
-    
-    abiversion = None
-    """
-    Represents the version of the operating system ABI format used by
-    this ELF file.
-    """
+    __slots__ = {
+        'magic': """
+        The magic 'number' which should be '\x7fELF' for all ELF format files. 
+        """,
+        'elfClass': """
+        The 'class', (sic), of the file which represents whether the file
+        is 32-bit or 64-bit.  Encoded using :py:class:`ElfClass`.
+        """,
+        'elfData': """
+        The 'data', (sic), of the file which represents the endian-ness
+        used to encode this file.  Encoded using :py:class:`ElfData`.
+        """,
+        'fileVersion': """
+        The version of the ELF format used to encode this file.  Must be
+        :py:const:`EV_CURRENT`.  Encoded using :py:class:`EV`.
+        """,
+        'osabi': """
+        Represents the operating system for which this ELF file is
+        intended.  Encoded using :py:class:`ElfOsabi`.
+        """,
+        'abiversion': """
+        Represents the version of the operating system ABI format used by
+        this ELF file.
+        """,
+    }
 
     coder = struct.Struct(b'=4sBBBBBxxxxxxx')
     """
@@ -225,6 +746,9 @@ class ElfFileIdent(StructBase):
     * abiversion
     """
 
+    _fields = ('magic', 'elfClass', 'elfData', 'fileVersion', 'osabi',
+               'abiversion')
+
     # size is EI_IDENT
     assert (coder.size == EI_NIDENT), 'coder.size = {0}({0}), EI_NIDENT = {0}({0})'.format(coder.size, type(coder.size),
                                                                                            EI_NIDENT, type(EI_NIDENT))
@@ -396,6 +920,80 @@ class ElfFile(StructBase):
     and word size sensitive class to be used for the ELF file header.
     """
 
+    symbolClass = None
+    """
+    Intended to be set by the subclasses.  Points to the byte order
+    and word size sensitive class to be used for symbol table entries.
+    """
+
+    relClass = None
+    """
+    Intended to be set by the subclasses.  Points to the byte order
+    and word size sensitive class to be used for SHT_REL entries.
+    """
+
+    relaClass = None
+    """
+    Intended to be set by the subclasses.  Points to the byte order
+    and word size sensitive class to be used for SHT_RELA entries.
+    """
+
+    dynClass = None
+    """
+    Intended to be set by the subclasses.  Points to the byte order
+    and word size sensitive class to be used for dynamic section
+    entries.
+    """
+
+    noteClass = None
+    """
+    Intended to be set by the subclasses.  Points to the byte order
+    sensitive class to be used for notes.
+    """
+
+    _map = None
+    _fileobj = None
+    _symbolIndex = None
+    _hashTable = None
+    _stringTables = None
+    _dynamic = None
+    _sectionDigests = None
+
+    closeEnoughIgnores = frozenset([
+        b'.ARM.attributes',
+        b'.ARM.exidx',
+        b'.ARM.extab',
+        b'.comment',
+        b'.debug_aranges',
+        b'.debug_frame',
+        b'.debug_info',    # x86_64 linux dyn
+        b'.debug_line',    # arm debug lines contain file names
+        b'.debug_loc',
+        b'.debug_pubnames',
+        b'.debug_ranges',
+        b'.debug_str',           # x86_64 linux rela
+        b'.gnu_debuglink',       # arm: maybe time stamps?
+        b'.note.GNU-stack',
+        b'.note.gnu.build-id',   # x86_64 linux dyn
+        b'.rel.ARM.exidx',
+        b'.rel.debug_aranges',
+        b'.rel.debug_frame',
+        b'.rel.debug_info',      # x86_64 linux rela
+        b'.rel.debug_line',
+        b'.rel.debug_pubnames',
+        b'.rel.text',
+        b'.rodata',
+        b'.rodata.str1.4',
+        b'.shstrtab',
+        b'.strtab',
+        b'.symtab',
+        ])
+    """
+    Names of the sections which :py:meth:`close_enough` skips because
+    they tend to differ between builds, (paths, time stamps, build
+    ids).
+    """
+
     class NO_CLASS(Exception):
         """
         Raised when attempting to decode an unrecognized value for
@@ -409,6 +1007,21 @@ class ElfFile(StructBase):
         :py:class:`ElfData`, (that is, byte order).
         """
 
+    class NO_ROOM(Exception):
+        """
+        Raised by :py:meth:`patch_into` when the file cannot be
+        patched in place, (for instance, a section has outgrown its
+        original slot).
+        """
+
+    class NO_LAYOUT(Exception):
+        """
+        Raised by :py:meth:`pack_into` and :py:meth:`write_to` when a
+        segment's contents would not stay together in the new layout,
+        (for instance, a PT_LOAD segment which covers the file header
+        or the padding between sections).
+        """
+
     @staticmethod
     def encodedClass(ident):
         """
@@ -457,10 +1070,25 @@ class ElfFile(StructBase):
         self.sectionHeaders = []
         self.programHeaders = []
 
-    def unpack_from(self, block, offset=0):
+    def unpack_from(self, block, offset=0, lazy=False, zero_copy=False):
         """
         Unpack an entire file.
 
+        :param :py:class:`bool` lazy: if true, section and segment
+            contents are not sliced out of *block* here.  Instead, each
+            :py:attr:`ElfSectionHeader.content` and
+            :py:attr:`ElfProgramHeader.content` is copied out on first
+            access.  *block* is referenced until then, so it must
+            remain valid, (for an :py:class:`mmap.mmap`, open), for as
+            long as unread contents may be wanted.
+        :param :py:class:`bool` zero_copy: if true, contents are
+            :py:class:`memoryview` slices of *block* rather than
+            copies.  These views are valid only until
+            :py:meth:`close`, which releases them.  Views derived from
+            them by the caller must be released first or *block*, (if
+            an :py:class:`mmap.mmap` owned by this file), cannot be
+            closed.
+
         .. todo:: I don't understand whether segments overlap sections
             or not.
         """
@@ -468,10 +1096,10 @@ class ElfFile(StructBase):
         self._unpack_fileIdent(block, offset)
         self._unpack_file_header(block, offset)
         self._unpack_section_headers(block, offset)
-        self._unpack_sections(block, offset)
+        self._unpack_sections(block, offset, lazy, zero_copy)
         self._unpack_section_names()
         self._unpack_program_headers(block, offset)
-        self._unpack_segments(block, offset)
+        self._unpack_segments(block, offset, lazy, zero_copy)
 
         return self
 
@@ -499,23 +1127,39 @@ class ElfFile(StructBase):
 
             if sectionCount == 0:
                 sectionCount = self.sectionHeaders[0].section_size
-                
-            for i in range(1, sectionCount):
-                self.sectionHeaders.append(self.sectionHeaderClass().unpack_from(block,
+
+            self.sectionHeaders.extend(self.sectionHeaderClass.unpack_table(block,
                                                                             offset + self.fileHeader.shoff
-                                                                            + (i * self.fileHeader.shentsize)))
+                                                                            + self.fileHeader.shentsize,
+                                                                            sectionCount - 1,
+                                                                            self.fileHeader.shentsize))
+
+    def _unpack_sections(self, block, offset, lazy=False, zero_copy=False):
+        if zero_copy:
+            block = memoryview(block)
 
-    def _unpack_sections(self, block, offset):
         for sh in self.sectionHeaders:
-            sh.content = block[offset + sh.offset:offset + sh.offset + sh.section_size] # section contents are copied
+            start = offset + sh.offset
+            stop = start + sh.section_size
+
+            if lazy:
+                sh._contentSource = (block, start, stop)
+            else:
+                sh.content = block[start:stop] # section contents are copied
 
 
     def _unpack_section_names(self):
         # little tricky here - can't read section names until after
         # that section has been read.  So effectively this is two pass.
 
+        if not self.sectionHeaders:
+            return
+
+        strings = self.stringTable(self.fileHeader.shstrndx)
+        split = strings.split()
         for section in self.sectionHeaders:
-            section.name = self.sectionName(section)
+            offset = section.nameoffset
+            section.name = split[offset] if offset in split else strings[offset]
 
 
     def _unpack_program_headers(self, block, offset):
@@ -527,44 +1171,270 @@ class ElfFile(StructBase):
             if segmentCount == ElfProgramHeader.PN_XNUM:
                 segmentCount = self.sectionHeaders[0].info
 
-            for i in range(1, segmentCount):
-                self.programHeaders.append(self.programHeaderClass().unpack_from(block,
-                                                                                 offset + self.fileHeader.phoff
-                                                                                 + (i * self.fileHeader.phentsize)))
+            self.programHeaders.extend(self.programHeaderClass.unpack_table(block,
+                                                                            offset + self.fileHeader.phoff
+                                                                            + self.fileHeader.phentsize,
+                                                                            segmentCount - 1,
+                                                                            self.fileHeader.phentsize))
 
 
-    def _unpack_segments(self, block, offset):
+    def _unpack_segments(self, block, offset, lazy=False, zero_copy=False):
+        if zero_copy:
+            block = memoryview(block)
+
         for ph in self.programHeaders:
-            ph.content = block[offset + ph.offset:offset + ph.offset + ph.filesz] # segment contents are copied
+            start = offset + ph.offset
+            stop = start + ph.filesz
 
+            if lazy:
+                ph._contentSource = (block, start, stop)
+            else:
+                ph.content = block[start:stop] # segment contents are copied
 
-    def pack_into(self, block, offset=0):
+
+    def pack_into(self, block, offset=0, workers=None):
         """
         Pack the entire file.  Rewrite offsets as necessary.
+
+        :param string block: block of memory into which to pack, at
+            least :py:attr:`size` bytes from *offset*.  For large
+            files, an :py:class:`mmap.mmap` of an output file
+            truncated to that size avoids holding the file in memory.
+        :param int offset: optional offset into the memory block into
+            which to start packing
+        :param int workers: if given, section contents are copied by
+            a thread pool of this many threads, each into its own
+            range of *block*, and the header tables are written once
+            they are all done.  This only pays for big sections, and
+            only when :py:mod:`numpy` is available to do the copying
+            without the GIL.
+
+        The section name table is regenerated first.  Segments move
+        along with the sections they cover; if that would split one
+        up, :py:exc:`ElfFile.NO_LAYOUT` is raised before anything is
+        written.
         """
 
-        total, scoff, shoff, pcoff, phoff = self._offsets(offset)
+        names = self._section_names()
+        total, scoff, shoff, pcoff, phoff = self._offsets(offset, names)
+        moves = self._place_segments(scoff, phoff, names)
+
+        self._regen_section_name_table(names)
+        for ph, new in moves:
+            ph.offset = new
 
-        self._regen_section_name_table()
         self._pack_file_header(block, offset, shoff, phoff)
-        self._pack_sections(block, scoff)
+        self._pack_sections(block, scoff, workers)
         self._pack_section_headers(block, shoff)
+        self._pack_program_headers(block, phoff)
 
-        
-    def _offsets(self, offset=0):
+    def write_to(self, fileobj):
+        """
+        Write the entire file to *fileobj*, starting at its current
+        position, in the same layout as :py:meth:`pack_into` but
+        without building the file in memory first.  Rewrite offsets as
+        necessary.
+
+        :param :py:class:`file` fileobj: a binary file object open for
+            writing
+
+        Section contents are written one at a time, in order.  Those
+        which have not been read or changed since a *lazy*
+        :py:func:`open` by name or file object are copied
+        from the source file by the kernel, (with
+        :py:func:`os.copy_file_range` or :py:func:`os.sendfile`),
+        without passing through memory at all.  Otherwise they are
+        written straight from their contents or from the block they
+        were read from.  Only the header tables are built in memory.
+        As with :py:meth:`pack_into`, :py:exc:`ElfFile.NO_LAYOUT` is
+        raised before anything is written if a segment can't be
+        moved.
+        """
+
+        names = self._section_names()
+        total, scoff, shoff, pcoff, phoff = self._offsets(0, names)
+        moves = self._place_segments(scoff, phoff, names)
+
+        self._regen_section_name_table(names)
+        for ph, new in moves:
+            ph.offset = new
+
+        header = bytearray(scoff)
+        self._pack_file_header(header, 0, shoff, phoff)
+        fileobj.write(header)
+
+        p = scoff
+        for section in self.sectionHeaders:
+            section.section_size = self._write_content(fileobj, section)
+            section.offset = p
+            p += section.section_size
+
+        table = bytearray(len(self.sectionHeaders) * self.fileHeader.shentsize)
+        self._pack_section_headers(table, 0)
+        fileobj.write(table)
+
+        table = bytearray(len(self.programHeaders) * self.fileHeader.phentsize)
+        self._pack_program_headers(table, 0)
+        fileobj.write(table)
+
+    def patch_into(self, block, offset=0):
+        """
+        Patch the file already in *block* in place, keeping its
+        layout, rather than laying it out afresh as
+        :py:meth:`pack_into` does.  Only sections whose contents have
+        been read, (and so may have changed), are compared with
+        *block*, and only the contents of those which differ are
+        written, along with any section or program header entries
+        which differ.  Everything else is left untouched.
+
+        :param string block: a writable block of memory holding the
+            file, like a :py:class:`bytearray` or an
+            :py:class:`mmap.mmap` opened for writing or with
+            :py:const:`mmap.ACCESS_COPY`
+        :param int offset: offset into the memory block of the file
+        :rtype: :py:class:`list` of (offset, size) pairs written
+
+        Each section keeps the offset it has in *block*, and may
+        shrink but not grow.  A section which shrinks inside a PT_LOAD
+        or PT_NOTE segment must end it, and the segment's *filesz*
+        shrinks with it.  If any section no longer fits its original
+        slot, or would leave stale bytes inside a segment, or the
+        header tables don't match those in *block*,
+        :py:exc:`ElfFile.NO_ROOM` is raised before anything is
+        written.  Section names are not rewritten, so renaming
+        sections still needs a full rewrite.
+        """
+
+        header = self.fileHeaderClass().unpack_from(block, offset + self.fileIdent.size)
+
+        # counts too big for the file header are kept in section 0
+        shnum = header.shnum if header.shoff else 0
+        phnum = header.phnum if header.phoff else 0
+        if header.shoff:
+            first = self.sectionHeaderClass().unpack_from(block, offset + header.shoff)
+            if shnum == 0:
+                shnum = first.section_size
+            if phnum == ElfProgramHeader.PN_XNUM:
+                phnum = first.info
+
+        if (len(self.sectionHeaders) != shnum
+            or len(self.programHeaders) != phnum
+            or header.shentsize != self.fileHeader.shentsize
+            or header.phentsize != self.fileHeader.phentsize):
+            raise ElfFile.NO_ROOM('header tables differ from those in the file')
+
+        nobits = SHT.byname['SHT_NOBITS'].code
+        covering = (PT.byname['PT_LOAD'].code, PT.byname['PT_NOTE'].code)
+        writes = []
+        slots = []
+        filesz = dict((i, ph.filesz) for i, ph in enumerate(self.programHeaders))
+
+        for i, sh in enumerate(self.sectionHeaders):
+            entry = offset + header.shoff + (i * header.shentsize)
+            old = self.sectionHeaderClass().unpack_from(block, entry)
+
+            size = sh.section_size
+            if sh.type == nobits:
+                pass
+
+            elif sh._contentSource is None and sh._content is not None:
+                size = len(sh._content)
+                if size > old.section_size:
+                    raise ElfFile.NO_ROOM('section {0} has grown from {1} to {2} bytes'
+                                          .format(i, old.section_size, size))
+
+                if size < old.section_size:
+                    stop = old.offset + old.section_size
+                    for j, ph in enumerate(self.programHeaders):
+                        if ph.type in covering and ph.offset <= old.offset and stop <= ph.offset + ph.filesz:
+                            if stop != ph.offset + ph.filesz:
+                                raise ElfFile.NO_ROOM('section {0} has shrunk inside segment {1}'.format(i, j))
+
+                            filesz[j] -= old.section_size - size
+
+                start = offset + old.offset
+                if block[start:start + size] != sh._content:
+                    writes.append((start, sh._content))
+
+            elif size != old.section_size:
+                raise ElfFile.NO_ROOM('section {0} has changed size without new content'.format(i))
+
+            slot = {'offset': old.offset, 'section_size': size}
+            entryBlock = sh.coder.pack(*[slot.get(field, getattr(sh, field)) for field in sh._fields])
+            if block[entry:entry + len(entryBlock)] != entryBlock:
+                writes.append((entry, entryBlock))
+
+            slots.append((sh, old.offset, size))
+
+        for i, ph in enumerate(self.programHeaders):
+            entry = offset + header.phoff + (i * header.phentsize)
+            entryBlock = ph.coder.pack(*[filesz[i] if field == 'filesz' else getattr(ph, field) for field in ph._fields])
+            if block[entry:entry + len(entryBlock)] != entryBlock:
+                writes.append((entry, entryBlock))
+
+        for sh, shOffset, size in slots:
+            sh.offset = shOffset
+            sh.section_size = size
+
+        for i, ph in enumerate(self.programHeaders):
+            ph.filesz = filesz[i]
+
+        for start, data in writes:
+            block[start:start + len(data)] = data
+
+        return [(start, len(data)) for start, data in writes]
+
+    def _write_content(self, fileobj, header):
+        """
+        Write the content of the section or segment *header* to
+        *fileobj* without caching it on *header*.  Return the number
+        of bytes written.
+        """
+
+        if header._contentSource is None:
+            fileobj.write(header._content)
+            return len(header._content)
+
+        block, start, stop = header._contentSource
+        source = block.obj if isinstance(block, memoryview) else block
+
+        if self._fileobj is not None and source is self._map:
+            fileobj.flush()
+            try:
+                dst = fileobj.fileno()
+            except (AttributeError, io.UnsupportedOperation):
+                dst = None
+
+            if dst is not None:
+                position = fileobj.tell()
+                if _copy_range(self._fileobj.fileno(), dst, start, stop - start, position):
+                    fileobj.seek(position + stop - start)
+                    return stop - start
+
+        with memoryview(block) as view:
+            with view[start:stop] as content:
+                fileobj.write(content)
+
+        return stop - start
+
+    
+    def _offsets(self, offset=0, names=None):
         """
         Current packing layout is:
 
         * fileIdent + fileHeader
         * section contents
         * sectionHeaders
+
+        With *names* from :py:meth:`_section_names`, the section name
+        table is taken to be the one they will install.
         """
         x = offset
         x += self.fileHeader.ehsize
 
         scoff = x
-        for i in self.sectionHeaders:
-            x += i.section_size
+        for size in self._section_sizes(names):
+            x += size
 
         shoff = x
         x += (len(self.sectionHeaders) * self.fileHeader.shentsize)
@@ -580,63 +1450,153 @@ class ElfFile(StructBase):
 
         return (total, scoff, shoff, pcoff, phoff)
 
-    def _regen_section_name_table(self):
+    def _section_sizes(self, names=None):
+        sizes = [_contentSize(sh) for sh in self.sectionHeaders]
+        if names is not None:
+            sizes[self.fileHeader.shstrndx] = len(names[1])
+
+        return sizes
+
+    def _place_segments(self, scoff, phoff, names=None):
         """
-        (Re)build the section name table section.
+        Work out where each segment moves along with the sections it
+        covers, once they are laid out from *scoff*, (and a segment
+        covering just the program header table along with it to
+        *phoff*).  The covered sections must fill the segment, keep
+        their sizes and be laid out together, and a PT_LOAD segment
+        must keep its offset congruent to its address, or
+        :py:exc:`ElfFile.NO_LAYOUT` is raised.  Return a list of
+        (segment, new offset) pairs; nothing is changed here.
         """
 
-        # rewrite existing section.  If none exists, we're in trouble.
-        # (Will need to deal with that case when it arises.)
-        assert self.fileHeader.shstrndx
+        nobits = SHT.byname['SHT_NOBITS'].code
+        load = PT.byname['PT_LOAD'].code
 
-        section = self.sectionHeaders[self.fileHeader.shstrndx]
+        placed = []
+        p = scoff
+        for sh, size in zip(self.sectionHeaders, self._section_sizes(names)):
+            if sh.type != nobits and size:
+                placed.append((sh.offset, sh.offset + sh.section_size, p, size))
+            p += size
 
-        # sum of the sizes of all of the names plus initial null plus
-        # all terminating nulls
+        placed.sort()
 
-        # FIXME: could merge pointers to same strings and/or common suffixes.
+        phstart = self.fileHeader.phoff
+        phstop = phstart + (len(self.programHeaders) * self.fileHeader.phentsize)
 
-        section.section_size = (functools.reduce(operator.__add__, [len(sh.name) for sh in self.sectionHeaders])
-                                + len(self.sectionHeaders) + 1)
+        moves = []
+        for i, ph in enumerate(self.programHeaders):
+            start, stop = ph.offset, ph.offset + ph.filesz
 
-        section.contents = bytearray(section.section_size)
+            if start == stop:
+                continue
 
-        p = 0
-        section.contents[p] = b'\0'
-        p += 1
+            if (start, stop) == (phstart, phstop):
+                moves.append((ph, phoff))
+                continue
 
-        for sh in self.sectionHeaders:
-            l = len(sh.name)
-            section.contents[p:l] = sh.name
-            section.nameoffset = p
-            p += l
-            section.contents[l] = b'\0'
-            p += 1
+            position = start
+            new = None
+            for oldStart, oldStop, newStart, size in placed:
+                if oldStart < start or oldStop > stop:
+                    continue
 
-    def _pack_file_header(self, block, offset, shoff, phoff):
-        """
-        Determine and set current offsets then pack the file header.
-        """
-        self.fileIdent.pack_into(block, offset)
+                if (oldStart != position or size != oldStop - oldStart
+                    or (new is not None and newStart != new + (oldStart - start))):
+                    break
+
+                if new is None:
+                    new = newStart
+
+                position = oldStop
+
+            if new is None or position != stop:
+                raise ElfFile.NO_LAYOUT('segment {0} would not stay together'.format(i))
+
+            if ph.type == load and ph.align > 1 and (new - ph.vaddr) % ph.align:
+                raise ElfFile.NO_LAYOUT('segment {0} would lose its alignment'.format(i))
+
+            moves.append((ph, new))
+
+        return moves
+
+    def _section_names(self):
+        """
+        Build the section name table without installing it.  Return a
+        (:py:class:`StringTableBuilder`, content) pair for
+        :py:meth:`_regen_section_name_table`.
+        """
+
+        # rewrite existing section.  If none exists, we're in trouble.
+        # (Will need to deal with that case when it arises.)
+        assert self.fileHeader.shstrndx
+
+        builder = StringTableBuilder(sh.name for sh in self.sectionHeaders)
+        return (builder, builder.build())
+
+    def _regen_section_name_table(self, names=None):
+        """
+        (Re)build the section name table section, (or install *names*
+        from :py:meth:`_section_names`).
+        """
+
+        builder, content = names if names is not None else self._section_names()
+
+        section = self.sectionHeaders[self.fileHeader.shstrndx]
+
+        for sh in self.sectionHeaders:
+            sh.nameoffset = builder[sh.name]
+
+        section.section_size = len(content)
+
+        if isinstance(section._content, memoryview):
+            section._content.release()
+
+        section.content = content
+
+    def _pack_file_header(self, block, offset, shoff, phoff):
+        """
+        Determine and set current offsets then pack the file header.
+        """
+        self.fileIdent.pack_into(block, offset)
 
         self.fileHeader.shoff = shoff if len(self.sectionHeaders) > 0 else 0
         self.fileHeader.phoff = phoff if len(self.programHeaders) > 0 else 0
         self.fileHeader.pack_into(block, offset + self.fileIdent.size)
 
 
-    def _pack_sections(self, block, offset=0):
+    def _pack_sections(self, block, offset=0, workers=None):
         """
         Pack the section contents.  As a side effect, set the offsets
         in the section headers telling where we put them and the
-        section_sizes telling how much we put.
+        section_sizes telling how much we put.  Unread contents are
+        copied straight from their source, (without being cached).
         """
         p = offset
+        copies = []
         for section in self.sectionHeaders:
+            view = _contentView(section)
             section.offset = p
-            section.section_size = len(section.content)
-            block[p:p + section.section_size] = section.content
+            section.section_size = len(view)
+            copies.append((p, view))
             p += section.section_size
 
+        try:
+            if not workers:
+                for start, view in copies:
+                    _copy_into(block, start, view)
+
+            else:
+                # biggest first, so the threads finish together
+                copies.sort(key=lambda copy: -len(copy[1]))
+                with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+                    for future in [executor.submit(_copy_into, block, start, view) for start, view in copies]:
+                        future.result()
+
+        finally:
+            for start, view in copies:
+                view.release()
+
 
     def _pack_section_headers(self, block, offset):
         """
@@ -647,11 +1607,316 @@ class ElfFile(StructBase):
         """
         shiter = zip(range(0, len(self.sectionHeaders)), self.sectionHeaders)
         for i, sh in shiter:
-            sh.pack_into(block, offset + (i * self.fileHeader.shentsize))
+            sh._pack_header_into(block, offset + (i * self.fileHeader.shentsize))
+
+    def _pack_program_headers(self, block, offset):
+        """
+        Pack the program header table.
+        """
+        for i, ph in enumerate(self.programHeaders):
+            ph.pack_into(block, offset + (i * self.fileHeader.phentsize))
 
     @property
     def size(self):
-        return self._offsets()[0]
+        """
+        The size of the file as :py:meth:`pack_into` will lay it out,
+        including the section name table as it will be regenerated.
+        """
+
+        names = None
+        if self.sectionHeaders and self.fileHeader.shstrndx:
+            names = self._section_names()
+
+        return self._offsets(0, names)[0]
+
+    def sectionTable(self, use_numpy=False):
+        """
+        Return the section header table as a :py:class:`StructTable`,
+        that is, one array per :py:class:`ElfSectionHeader` field
+        rather than one object per section.  This is built from
+        :py:attr:`sectionHeaders` as they are now, so it reflects any
+        changes made since the file was read.  For example::
+
+            t = f.sectionTable()
+            alloc = t.total('section_size', t.masked('flags', SHF.byname['SHF_ALLOC'].code))
+            rela = t.equal('type', SHT.byname['SHT_RELA'].code)
+
+        :param :py:class:`bool` use_numpy: return numpy columns
+        """
+
+        coder = self.sectionHeaderClass.coder
+        fields = self.sectionHeaderClass._fields
+        entsize = coder.size
+
+        block = bytearray(entsize * len(self.sectionHeaders))
+        for i, sh in enumerate(self.sectionHeaders):
+            coder.pack_into(block, i * entsize, *[getattr(sh, field) for field in fields])
+
+        return StructTable(self.sectionHeaderClass, block, 0, len(self.sectionHeaders), entsize, use_numpy)
+
+    def symbolTables(self, use_numpy=False):
+        """
+        Return an :py:class:`ElfSymbolTable` for each SHT_SYMTAB and
+        SHT_DYNSYM section, in section header table order.
+
+        :param :py:class:`bool` use_numpy: decode into numpy columns
+        """
+
+        types = (SHT.byname['SHT_SYMTAB'].code, SHT.byname['SHT_DYNSYM'].code)
+        return [ElfSymbolTable(self, sh, use_numpy) for sh in self.sectionHeaders if sh.type in types]
+
+    def relocationTables(self, use_numpy=False):
+        """
+        Return an :py:class:`ElfRelocationTable` for each SHT_REL and
+        SHT_RELA section, in section header table order.
+
+        :param :py:class:`bool` use_numpy: decode into numpy columns
+        """
+
+        types = (SHT.byname['SHT_REL'].code, SHT.byname['SHT_RELA'].code)
+        return [ElfRelocationTable(self, sh, use_numpy) for sh in self.sectionHeaders if sh.type in types]
+
+    def loadSegment(self, address):
+        """
+        Return the PT_LOAD :py:class:`ElfProgramHeader` whose file
+        image covers the virtual *address*, or None.
+        """
+
+        load = PT.byname['PT_LOAD'].code
+        for ph in self.programHeaders:
+            if ph.type == load and ph.vaddr <= address < ph.vaddr + ph.filesz:
+                return ph
+
+        return None
+
+    def readAddress(self, address, size):
+        """
+        Return the *size* bytes of file image at the virtual *address*,
+        (clipped to the end of the PT_LOAD segment covering it), or
+        None if no PT_LOAD segment covers *address*.  Contents not yet
+        read by a *lazy* unpack are sliced from the file directly
+        rather than reading the whole segment.
+        """
+
+        segment = self.loadSegment(address)
+        if segment is None:
+            return None
+
+        start = address - segment.vaddr
+        stop = min(start + size, segment.filesz)
+
+        if segment._content is None and segment._contentSource is not None:
+            block, begin, end = segment._contentSource
+            return block[begin + start:begin + stop]
+
+        return segment.content[start:stop]
+
+    def interpreter(self):
+        """
+        Return the path name of the program interpreter from the
+        PT_INTERP segment, or None.
+        """
+
+        for ph in self.programHeaders:
+            if ph.type == PT.byname['PT_INTERP'].code:
+                content = bytes(ph.content)
+                return content[:content.find(b'\0')] if b'\0' in content else content
+
+        return None
+
+    def dynamic(self):
+        """
+        Return an :py:class:`ElfDynamic` for the SHT_DYNAMIC section,
+        or the PT_DYNAMIC segment if there is no such section, or None
+        if the file has neither.  It is kept after the first call.
+        """
+
+        if self._dynamic is None:
+            for sh in self.sectionHeaders:
+                if sh.type == SHT.byname['SHT_DYNAMIC'].code:
+                    self._dynamic = ElfDynamic(self, sh.content, sh.entsize)
+                    break
+            else:
+                for ph in self.programHeaders:
+                    if ph.type == PT.byname['PT_DYNAMIC'].code:
+                        self._dynamic = ElfDynamic(self, ph.content)
+                        break
+
+        return self._dynamic
+
+    def notes(self):
+        """
+        Generate the :py:class:`ElfNote`'s in the SHT_NOTE sections or,
+        if the file has no section headers or their contents were not
+        read, (see :py:func:`scan`), the PT_NOTE segments.
+        """
+
+        unread = [sh for sh in self.sectionHeaders
+                  if sh.type == SHT.byname['SHT_NOTE'].code
+                  and sh._content is None and sh._contentSource is None]
+        return self._unpack_notes(not self.sectionHeaders or bool(unread))
+
+    def _unpack_notes(self, segments):
+        if segments:
+            headers = [ph for ph in self.programHeaders
+                       if ph.type == PT.byname['PT_NOTE'].code]
+        else:
+            headers = [sh for sh in self.sectionHeaders
+                       if sh.type == SHT.byname['SHT_NOTE'].code]
+
+        for header in headers:
+            if header._content is None and header._contentSource is None:
+                # not read, (see scan())
+                continue
+
+            with _contentView(header) as content:
+                for note in self.noteClass.unpack_notes(content, align=self._noteAlign(header)):
+                    yield note
+
+    @staticmethod
+    def _noteAlign(header):
+        """
+        The alignment of the notes in the SHT_NOTE section or PT_NOTE
+        segment *header*: 8 if it is so aligned, otherwise 4.
+        """
+        align = header.addralign if isinstance(header, ElfSectionHeader) else header.align
+        return 8 if align == 8 else 4
+
+    def pack_notes(self, header, notes):
+        """
+        Replace the contents of the SHT_NOTE section or PT_NOTE
+        segment *header* with *notes*, padded to its alignment as
+        :py:meth:`notes` expects, (for instance 8 for
+        ``.note.gnu.property`` in 64 bit files).  Sizes are updated to
+        match.
+
+        :param :py:class:`ElfSectionHeader` header: or :py:class:`ElfProgramHeader`
+        :param notes: an iterable of :py:class:`ElfNote`'s
+        """
+
+        header.content = self.noteClass.pack_notes(notes, self._noteAlign(header))
+
+        if isinstance(header, ElfSectionHeader):
+            header.section_size = len(header.content)
+        else:
+            header.filesz = header.memsz = len(header.content)
+
+    def build_id(self):
+        """
+        Return the descriptor of the NT_GNU_BUILD_ID note as
+        :py:class:`bytes`, or None.  The PT_NOTE segments are searched
+        first, so for executables and shared objects only those are
+        read, (and :py:func:`scan` reads them too).  Relocatable files
+        have no program headers, so their SHT_NOTE sections are
+        searched instead.
+        """
+
+        buildId = NT.byname['NT_GNU_BUILD_ID'].code
+        for note in self._unpack_notes(bool(self.programHeaders)):
+            if note.type == buildId and note.name == b'GNU':
+                return note.desc
+
+        return None
+
+    def symbolIndex(self):
+        """
+        Return an :py:class:`ElfSymbolIndex` over the SHT_SYMTAB
+        sections, (or the SHT_DYNSYM sections if there are none).  It
+        is built on first use and kept, so repeated queries cost only
+        a lookup.
+        """
+
+        if self._symbolIndex is None:
+            tables = self.symbolTables()
+            symtab = [t for t in tables if t.section.type == SHT.byname['SHT_SYMTAB'].code]
+            self._symbolIndex = ElfSymbolIndex(symtab or tables)
+
+        return self._symbolIndex
+
+    def symbols_named(self, name):
+        """
+        Return a :py:class:`list` of the symbols called *name*.  See
+        :py:meth:`symbolIndex`.
+        """
+        return self.symbolIndex().symbols_named(name)
+
+    def symbol_at(self, address):
+        """
+        Return the symbol covering *address*, or None.  See
+        :py:meth:`symbolIndex` and :py:meth:`ElfSymbolIndex.symbol_at`.
+        """
+        return self.symbolIndex().symbol_at(address)
+
+    def hashTable(self):
+        """
+        Return an :py:class:`ElfHashTable` for the dynamic symbols,
+        preferring SHT_GNU_HASH over SHT_HASH, or None if the file has
+        neither.  It is kept after the first call.
+        """
+
+        if self._hashTable is None:
+            for sh in self.sectionHeaders:
+                if sh.type == SHT.byname['SHT_GNU_HASH'].code:
+                    self._hashTable = ElfGnuHashTable(self, sh)
+                    break
+
+                if sh.type == SHT.byname['SHT_HASH'].code and self._hashTable is None:
+                    self._hashTable = ElfSysvHashTable(self, sh)
+
+        return self._hashTable
+
+    def lookup_dynamic_symbol(self, name):
+        """
+        Return the defined dynamic symbol called *name*, or None, (an
+        SHN_UNDEF import of *name* is not an answer).  As in the
+        dynamic linker, this goes through :py:meth:`hashTable` so only
+        the hash chain for *name* is visited, (and with SHT_GNU_HASH
+        most misses never get past the bloom filter).  Files with a
+        SHT_DYNSYM section but no hash table are searched linearly.
+
+        :param :py:class:`bytes` name: a symbol name
+        """
+
+        if not isinstance(name, bytes):
+            name = name.encode('utf-8')
+
+        table = self.hashTable()
+        if table is not None:
+            return table.lookup(name)
+
+        undef = SHN.byname['SHN_UNDEF'].code
+        for table in self.symbolTables():
+            if table.section.type == SHT.byname['SHT_DYNSYM'].code:
+                shndx = table['shndx']
+                for i in range(1, len(table)):
+                    if shndx[i] != undef and table.name(i) == name:
+                        return table.symbol(i)
+
+        return None
+
+    def stringTable(self, index, zero_copy=False):
+        """
+        Return an :py:class:`ElfStringTable` for the section at *index*
+        in the section header table.  It is kept, along with the
+        strings it has recently resolved, until :py:meth:`close` or
+        until another section takes its place at *index*.
+
+        :param :py:class:`int` index: a section header table index
+        :param :py:class:`bool` zero_copy: return :py:class:`memoryview` slices
+        """
+
+        if self._stringTables is None:
+            self._stringTables = {}
+
+        key = (index, zero_copy)
+        section = self.sectionHeaders[index]
+        if key not in self._stringTables or self._stringTables[key].section is not section:
+            if key in self._stringTables:
+                self._stringTables[key].release()
+
+            self._stringTables[key] = ElfStringTable(section, zero_copy)
+
+        return self._stringTables[key]
 
     def sectionName(self, section):
         """
@@ -659,8 +1924,47 @@ class ElfFile(StructBase):
 
         :param :py:class:`ElfSectionHeader` section:
         """
-        x = self.sectionHeaders[self.fileHeader.shstrndx].content
-        return x[section.nameoffset:x.find(b'\0', section.nameoffset)]
+        return self.stringTable(self.fileHeader.shstrndx)[section.nameoffset]
+
+    def close(self):
+        """
+        Release any :py:class:`memoryview` contents created by a
+        *zero_copy* unpack, then close the :py:class:`mmap.mmap` and
+        file object owned by this file, if any, (see :py:func:`open`).
+        Contents which have not been read are unavailable afterwards.
+        Closing more than once is harmless.
+
+        :py:class:`ElfFile` is also a context manager which closes
+        itself on exit.
+        """
+
+        if self._stringTables is not None:
+            for strings in self._stringTables.values():
+                strings.release()
+
+            self._stringTables = None
+
+        for header in self.sectionHeaders + self.programHeaders:
+            if isinstance(header._content, memoryview):
+                header._content.release()
+
+            if (header._contentSource is not None
+                and isinstance(header._contentSource[0], memoryview)):
+                header._contentSource[0].release()
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._fileobj is not None:
+            self._fileobj.close()
+            self._fileobj = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __eq__(self, other):
         """
@@ -699,48 +2003,55 @@ class ElfFile(StructBase):
             or (not self.fileHeader.close_enough(other.fileHeader))):
             return False
 
+        ignores = self.closeEnoughIgnores
+        nobits = SHT.byname['SHT_NOBITS'].code # Not sure what this is or why it differs
+
         # FIXME: need to handle order independence
-        for this, that in zip(self.sectionHeaders, other.sectionHeaders):
-            if (this.name in [
-                '.ARM.attributes',
-                '.ARM.exidx',
-                '.ARM.extab',
-                '.comment',
-                '.debug_aranges',
-                '.debug_frame',
-                '.debug_info',    # x86_64 linux dyn
-                '.debug_line',    # arm debug lines contain file names
-                '.debug_loc',
-                '.debug_pubnames',
-                '.debug_ranges',
-                '.debug_str',           # x86_64 linux rela
-                '.gnu_debuglink',       # arm: maybe time stamps?
-                '.note.GNU-stack',
-                '.note.gnu.build-id',   # x86_64 linux dyn
-                '.rel.ARM.exidx',
-                '.rel.debug_aranges',
-                '.rel.debug_frame',
-                '.rel.debug_info',      # x86_64 linux rela
-                '.rel.debug_line',
-                '.rel.debug_pubnames',
-                '.rel.text',
-                '.rodata',
-                '.rodata.str1.4',
-                '.shstrtab',
-                '.strtab',
-                '.symtab',
-                ]
-                or this.type == SHT.byname['SHT_NOBITS'].code # Not sure what this is or why it differs
-                ):
+        for i, (this, that) in enumerate(zip(self.sectionHeaders, other.sectionHeaders)):
+            if this.name in ignores or this.type == nobits:
                 continue
 
-            if not this.close_enough(that):
+            if (not this._close_enough_header(that)
+                or self.sectionDigest(i) != other.sectionDigest(i)):
                 import sys
                 print('section({0}) not close enough to section({1})'.format(this.name, that.name), file=sys.stdout)
                 return False
 
         return True
 
+    def sectionDigest(self, index):
+        """
+        Return the :py:func:`hashlib.blake2b` digest of the contents
+        of section *index*.  Digests are remembered, so comparing one
+        file with many others reads each section at most once.  Unread
+        contents of a *lazy* file are hashed in place, without being
+        read into :py:attr:`ElfSectionHeader.content`.  A section
+        whose contents are replaced is hashed again, but changes made
+        to a mutable content in place are not noticed.
+
+        :param int index: index into :py:attr:`sectionHeaders`
+        :rtype: :py:class:`bytes`
+        """
+
+        if self._sectionDigests is None:
+            self._sectionDigests = {}
+
+        section = self.sectionHeaders[index]
+        source = section._contentSource if section._contentSource is not None else section._content
+
+        try:
+            known, digest = self._sectionDigests[index]
+            if known is source:
+                return digest
+        except KeyError:
+            pass
+
+        with _contentView(section) as view:
+            digest = hashlib.blake2b(view).digest()
+
+        self._sectionDigests[index] = (source, digest)
+        return digest
+
 
     def __repr__(self):
         return ('<{0}@{1}: name=\'{2}\', fileIdent={3}, fileHeader={4}>'
@@ -779,85 +2090,66 @@ class ElfFileHeader(StructBase):
     dependent methods.
     """
 
-    type = None
-    """
-    The 'type', (sic), of the file which represents whether this file
-    is an executable, relocatable object, shared library, etc.
-    Encoded using :py:class:`ET`.
-    """
-
-    machine = None
-    """
-    Specifies the processor architecture of the file.  Encoded using :py:class:`EM`.
-    """
-
-    version = None
-    """
-    Specifies the version of the ELF format used for this file.
-    Should be 1 in most cases.  Extensions are expected to increment
-    the number.
-    """
-
-    entry = None
-    """
-    Virtual start address when this file is converted into a process.
-    Zero if not used.
-    """
-
-    phoff = None
-    """
-    Offset in bytes into this file at which the program header table,
-    (:py:class:`ElfProgramHeader`), starts.
-    """
-
-    shoff = None
-    """
-    Offset in bytes into this file at which the section header table,
-    (:py:class:`ElfSectionHeader`), starts.
-    """
-
-    flags = None
-    """
-    Any processor specific flags for this file.
-    """
-
-    ehsize = None
-    """
-    Size in bytes of the ELF file header, (:py:class:`ElfFileHeader`),
-    as represented in this file.
-    """
-    
-    phentsize = None
-    """
-    Size in bytes of a program header table entry,
-    (:py:class:`ElfProgramHeader`), as represented in this file.  All
-    entries are the same size.
-    """
-
-    phnum = None
-    """
-    A count of the number of program header table entries,
-    (:py:class:`ElfProgramHeader`), in this file.
-    """
-
-    shentsize = None
-    """
-    Size in bytes of a section table entry,
-    (:py:class:`ElfSectionHeader`), as represented in this file.  All
-    entries aer the same size.
-    """
-
-    shnum = None
-    """
-    A count of the number of section header table entries,
-    (:py:class:`ElfSectionHeader`), in this file.
-    """
+    __slots__ = {
+        'type': """
+        The 'type', (sic), of the file which represents whether this file
+        is an executable, relocatable object, shared library, etc.
+        Encoded using :py:class:`ET`.
+        """,
+        'machine': """
+        Specifies the processor architecture of the file.  Encoded using :py:class:`EM`.
+        """,
+        'version': """
+        Specifies the version of the ELF format used for this file.
+        Should be 1 in most cases.  Extensions are expected to increment
+        the number.
+        """,
+        'entry': """
+        Virtual start address when this file is converted into a process.
+        Zero if not used.
+        """,
+        'phoff': """
+        Offset in bytes into this file at which the program header table,
+        (:py:class:`ElfProgramHeader`), starts.
+        """,
+        'shoff': """
+        Offset in bytes into this file at which the section header table,
+        (:py:class:`ElfSectionHeader`), starts.
+        """,
+        'flags': """
+        Any processor specific flags for this file.
+        """,
+        'ehsize': """
+        Size in bytes of the ELF file header, (:py:class:`ElfFileHeader`),
+        as represented in this file.
+        """,
+        'phentsize': """
+        Size in bytes of a program header table entry,
+        (:py:class:`ElfProgramHeader`), as represented in this file.  All
+        entries are the same size.
+        """,
+        'phnum': """
+        A count of the number of program header table entries,
+        (:py:class:`ElfProgramHeader`), in this file.
+        """,
+        'shentsize': """
+        Size in bytes of a section table entry,
+        (:py:class:`ElfSectionHeader`), as represented in this file.  All
+        entries aer the same size.
+        """,
+        'shnum': """
+        A count of the number of section header table entries,
+        (:py:class:`ElfSectionHeader`), in this file.
+        """,
+        'shstrndx': """
+        The section header table index of the section name string table.
+        (SHN_UNDEF if there is none).
+        """,
+    }
 
-    shstrndx = None
-    """
-    The section header table index of the section name string table.
-    (SHN_UNDEF if there is none).
-    """
+    _fields = ('type', 'machine', 'version', 'entry', 'phoff', 'shoff',
+               'flags', 'ehsize', 'phentsize', 'phnum', 'shentsize',
+               'shnum', 'shstrndx')
 
     def unpack_from(self, block, offset=0):
         (self.type, self.machine, self.version, self.entry,
@@ -951,6 +2243,8 @@ class ElfFileHeader32b(ElfFileHeader):
     A subclass of :py:class:`ElfFileHeader`.  This one represents
     32-bit, big-endian headers.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'>HHIIIIIHHHHHH')
 
 class ElfFileHeader32l(ElfFileHeader):
@@ -958,6 +2252,8 @@ class ElfFileHeader32l(ElfFileHeader):
     A subclass of :py:class:`ElfFileHeader`.  This one represents
     32-bit, little-endian headers.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'<HHIIIIIHHHHHH')
 
 class ElfFileHeader64b(ElfFileHeader):
@@ -965,6 +2261,8 @@ class ElfFileHeader64b(ElfFileHeader):
     A subclass of :py:class:`ElfFileHeader`.  This one represents
     64-bit, big-endian headers.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'>HHIQQQIHHHHHH')
 
 class ElfFileHeader64l(ElfFileHeader):
@@ -972,6 +2270,8 @@ class ElfFileHeader64l(ElfFileHeader):
     A subclass of :py:class:`ElfFileHeader`.  This one represents
     64-bit, little-endian headers.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'<HHIQQQIHHHHHH')
 
 class ET(coding.Coding):
@@ -1181,70 +2481,65 @@ class ElfSectionHeader(StructBase):
     dependent methods.
     """
 
-    nameoffset = None
-    """
-    Offset into the `section header string table section
-    <http://www.sco.com/developers/gabi/latest/ch4.strtab.html>`_ of
-    the name of this section.
-    """
-
-    name = None
-    """
-    The name of this section.
-    """
-
-    type = None
-    """
-    Section type encoded with :py:class:`SHT`.
-    """
-
-
-    flags = None
-    """
-    Flags which define miscellaneous attributes.  These are bit flags
-    which are or'd together.  The individual bit-flags are encoded
-    using :py:class:`SHF`.
-    """
-    
-    addr = None
-    """
-    The load address of this section if it will appear in memory during a running process.
-    """
-
-    offset = None
-    """
-    Byte offset from the start of the file to the beginning of the content of this section.
-    """
-
-    section_size = None
-    """
-    Size in bytes of the content of this section.
-    """
-    
-    link = None
-    """
-    A section header table index.  It's meaning varies by context.
-    """
-
-    info = None
-    """
-    Extra information.  It's meaning varies by context.
-    """
+    __slots__ = {
+        'nameoffset': """
+        Offset into the `section header string table section
+        <http://www.sco.com/developers/gabi/latest/ch4.strtab.html>`_ of
+        the name of this section.
+        """,
+        'name': """
+        The name of this section.
+        """,
+        'type': """
+        Section type encoded with :py:class:`SHT`.
+        """,
+        'flags': """
+        Flags which define miscellaneous attributes.  These are bit flags
+        which are or'd together.  The individual bit-flags are encoded
+        using :py:class:`SHF`.
+        """,
+        'addr': """
+        The load address of this section if it will appear in memory during a running process.
+        """,
+        'offset': """
+        Byte offset from the start of the file to the beginning of the content of this section.
+        """,
+        'section_size': """
+        Size in bytes of the content of this section.
+        """,
+        'link': """
+        A section header table index.  It's meaning varies by context.
+        """,
+        'info': """
+        Extra information.  It's meaning varies by context.
+        """,
+        'addralign': """
+        Section alignment constraints.
+        """,
+        'entsize': """
+        If the section holds fixed sized entries then this is the size of each entry.
+        """,
+        '_content': None,
+        '_contentSource': None,
+    }
 
-    addralign = None
+    content = _Content()
     """
-    Section alignment constraints.
+    A memory block representing the contents of this section.  When
+    unpacked lazily, this is only read from the file on first access.
     """
 
-    entsize = None
-    """
-    If the section holds fixed sized entries then this is the size of each entry.
-    """
+    _fields = ('nameoffset', 'type', 'flags', 'addr', 'offset',
+               'section_size', 'link', 'info', 'addralign', 'entsize')
 
-    content = None
-    """
-    A memory block representing the contents of this section.
-    """
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        (self.nameoffset, self.type, self.flags, self.addr,
+         self.offset, self.section_size, self.link, self.info,
+         self.addralign, self.entsize) = values
+        self.name = self._content = self._contentSource = None
+        return self
 
     def unpack_from(self, block, offset=0):
         (self.nameoffset, self.type, self.flags, self.addr,
@@ -1258,15 +2553,21 @@ class ElfSectionHeader(StructBase):
         .. note:: this is a special case.  *block* here must be the
             entire file or we won't know how to place our content.
         """
-        self.coder.pack_into(block, offset,
-                             self.nameoffset, self.type, self.flags, self.addr,
-                             self.offset, self.section_size, self.link, self.info,
-                             self.addralign, self.entsize)
+        self._pack_header_into(block, offset)
 
         block[self.offset:self.offset + self.section_size] = self.content
 
         return self
 
+    def _pack_header_into(self, block, offset=0):
+        """
+        Pack just the header entry, leaving the content alone.
+        """
+        self.coder.pack_into(block, offset,
+                             self.nameoffset, self.type, self.flags, self.addr,
+                             self.offset, self.section_size, self.link, self.info,
+                             self.addralign, self.entsize)
+
     def __eq__(self, other):
         return (isinstance(other, self.__class__)
                 and self.nameoffset == other.nameoffset
@@ -1282,6 +2583,13 @@ class ElfSectionHeader(StructBase):
                 and self.content == other.content)
 
     def close_enough(self, other):
+        return (self._close_enough_header(other)
+                and self.content == other.content)
+
+    def _close_enough_header(self, other):
+        """
+        :py:meth:`close_enough` for everything but the content.
+        """
         return (isinstance(other, self.__class__)
                 and self.nameoffset == other.nameoffset
                 and self.type == other.type
@@ -1291,8 +2599,7 @@ class ElfSectionHeader(StructBase):
                 and self.link == other.link
                 and self.info == other.info
                 and self.addralign == other.addralign
-                and self.entsize == other.entsize
-                and self.content == other.content)
+                and self.entsize == other.entsize)
 
     def __repr__(self):
         # FIXME: I wish I could include the first few bytes of the content as well.
@@ -1324,6 +2631,8 @@ class ElfSectionHeader32b(ElfSectionHeader):
     A subclass of :py:class:`ElfSectionHeader`.  This one represents
     32-bit, big-endian structs.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'>IIIIIIIIII')
 
 class ElfSectionHeader32l(ElfSectionHeader):
@@ -1331,6 +2640,8 @@ class ElfSectionHeader32l(ElfSectionHeader):
     A subclass of :py:class:`ElfSectionHeader`.  This one represents
     32-bit, little-endian structs.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'<IIIIIIIIII')
 
 class ElfSectionHeader64b(ElfSectionHeader):
@@ -1338,6 +2649,8 @@ class ElfSectionHeader64b(ElfSectionHeader):
     A subclass of :py:class:`ElfSectionHeader`.  This one represents
     64-bit, big-endian structs.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'>IIQQQQIIQQ')
 
 class ElfSectionHeader64l(ElfSectionHeader):
@@ -1345,6 +2658,8 @@ class ElfSectionHeader64l(ElfSectionHeader):
     A subclass of :py:class:`ElfSectionHeader`.  This one represents
     64-bit, little-endian structs.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'<IIQQQQIIQQ')
 
 class SHN(coding.Coding):
@@ -1491,51 +2806,41 @@ class ElfProgramHeader(StructBase):
     Program header overflow number.
     """
 
-    type = None
-    """
-    Segment type encoded with :py:class:`PT`.
-    """
-
-    offset = None
-    """
-    Offset in bytes from the beginning of the file to the start of this segment.
-    """
-
-    vaddr = None
-    """
-    Virtual address at which this segment will reside in memory when loaded to run.
-    """
-
-    paddr = None
-    """
-    Physical address in memory, when physical addresses are used.
-    """
-
-    filesz = None
-    """
-    Segment size in bytes in file.
-    """
-
-    memsz = None
-    """
-    Segment size in bytes when loaded into memory.  Must be at least
-    :py:attr:`ElfProgramHeader.filesz` or greater.  Extra space is
-    zero'd out.
-    """
-
-    flags = None
-    """
-    Flags for the segment.  Encoded using :py:class:`PF`.
-    """
-
-    content = None
-    """
-    A memory block representing the contents of this section.
-    """
+    __slots__ = {
+        'type': """
+        Segment type encoded with :py:class:`PT`.
+        """,
+        'offset': """
+        Offset in bytes from the beginning of the file to the start of this segment.
+        """,
+        'vaddr': """
+        Virtual address at which this segment will reside in memory when loaded to run.
+        """,
+        'paddr': """
+        Physical address in memory, when physical addresses are used.
+        """,
+        'filesz': """
+        Segment size in bytes in file.
+        """,
+        'memsz': """
+        Segment size in bytes when loaded into memory.  Must be at least
+        :py:attr:`ElfProgramHeader.filesz` or greater.  Extra space is
+        zero'd out.
+        """,
+        'flags': """
+        Flags for the segment.  Encoded using :py:class:`PF`.
+        """,
+        'align': """
+        Alignment of both segments in memory as well as in file.
+        """,
+        '_content': None,
+        '_contentSource': None,
+    }
 
-    align = None
+    content = _Content()
     """
-    Alignment of both segments in memory as well as in file.
+    A memory block representing the contents of this segment.  When
+    unpacked lazily, this is only read from the file on first access.
     """
 
     def __eq__(self, other):
@@ -1631,6 +2936,18 @@ class ElfProgramHeader32(ElfProgramHeader):
     represents the 32 bit element order.  A subclass of
     :py:class:`ElfProgramHeader`.
     """
+    __slots__ = ()
+
+    _fields = ('type', 'offset', 'vaddr', 'paddr', 'filesz', 'memsz',
+               'flags', 'align')
+
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        (self.type, self.offset, self.vaddr, self.paddr,
+         self.filesz, self.memsz, self.flags, self.align) = values
+        self._content = self._contentSource = None
+        return self
 
     def unpack_from(self, block, offset=0):
         (self.type, self.offset, self.vaddr, self.paddr,
@@ -1651,6 +2968,18 @@ class ElfProgramHeader64(ElfProgramHeader):
     represents the 64 bit element order.  A subclass of
     :py:class:`ElfProgramHeader`.
     """
+    __slots__ = ()
+
+    _fields = ('type', 'flags', 'offset', 'vaddr', 'paddr', 'filesz',
+               'memsz', 'align')
+
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        (self.type, self.flags, self.offset, self.vaddr,
+         self.paddr, self.filesz, self.memsz, self.align) = values
+        self._content = self._contentSource = None
+        return self
 
     def unpack_from(self, block, offset=0):
         (self.type, self.flags, self.offset, self.vaddr,
@@ -1671,6 +3000,8 @@ class ElfProgramHeader32b(ElfProgramHeader32):
     A subclass of :py:class:`ElfProgramHeader32`.  Represents big
     endian byte order.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'>IIIIIIII')
 
 class ElfProgramHeader32l(ElfProgramHeader32):
@@ -1678,6 +3009,8 @@ class ElfProgramHeader32l(ElfProgramHeader32):
     A subclass of :py:class:`ElfProgramHeader32`.  Represents little
     endian byte order.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'<IIIIIIII')
 
 class ElfProgramHeader64b(ElfProgramHeader64):
@@ -1685,6 +3018,8 @@ class ElfProgramHeader64b(ElfProgramHeader64):
     A subclass of :py:class:`ElfProgramHeader64`.  Represents big
     endian byte order.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'>IIQQQQQQ')
 
 class ElfProgramHeader64l(ElfProgramHeader64):
@@ -1692,70 +3027,3056 @@ class ElfProgramHeader64l(ElfProgramHeader64):
     A subclass of :py:class:`ElfProgramHeader64`.  Represents little
     endian byte order.
     """
+    __slots__ = ()
+
     coder = struct.Struct(b'<IIQQQQQQ')
 
-class ElfFile32b(ElfFile):
+class ElfSymbol(StructBase):
     """
-    A subclass of :py:class:`ElfFile`.  Represents 32-bit, big-endian
-    files.
+    This abstract base class corresponds to an entry in a `symbol
+    table <http://www.sco.com/developers/gabi/latest/ch4.symtab.html>`_,
+    (that is, an :c:type:`Elf32_Sym` or :c:type:`Elf64_Sym`), as found
+    in SHT_SYMTAB and SHT_DYNSYM sections.
+
+    Most attributes are :py:class:`int`'s.  Some have encoded meanings
+    which can be decoded with the accompanying
+    :py:class:`coding.Coding` subclasses.
+
+    This abstract base class works in tight concert with it's
+    subclasses: :py:class:`ElfSymbol32b`, :py:class:`ElfSymbol32l`,
+    :py:class:`ElfSymbol64b`, and :py:class:`ElfSymbol64l`.  As with
+    :py:class:`ElfProgramHeader`, 32 and 64 bit entries also differ
+    in element order.
+
+    Whole tables are usually read through :py:class:`ElfSymbolTable`
+    rather than one symbol at a time.
+    """
+
+    __slots__ = {
+        'nameoffset': """
+        Offset into the symbol table's associated string table of the
+        name of this symbol.
+        """,
+        'name': """
+        The name of this symbol, if it has been resolved.
+        """,
+        'value': """
+        The value of this symbol, (usually an address).
+        """,
+        'symbol_size': """
+        Size in bytes of the object this symbol refers to, if any.
+        """,
+        'info': """
+        The symbol's binding, (:py:class:`STB`), in the high four bits
+        and type, (:py:class:`STT`), in the low four bits.
+        """,
+        'other': """
+        The symbol's visibility, (:py:class:`STV`), in the low two bits.
+        """,
+        'shndx': """
+        The section header table index of the section this symbol is
+        defined relative to, or a special index from :py:class:`SHN`.
+        """,
+    }
+
+    @property
+    def bind(self):
+        """
+        The symbol binding, encoded with :py:class:`STB`.
+        """
+        return self.info >> 4
+
+    @property
+    def type(self):
+        """
+        The symbol type, encoded with :py:class:`STT`.
+        """
+        return self.info & 0xf
+
+    @property
+    def visibility(self):
+        """
+        The symbol visibility, encoded with :py:class:`STV`.
+        """
+        return self.other & 0x3
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__)
+                and self.nameoffset == other.nameoffset
+                and self.value == other.value
+                and self.symbol_size == other.symbol_size
+                and self.info == other.info
+                and self.other == other.other
+                and self.shndx == other.shndx)
+
+    def __repr__(self):
+        return ('<{0}@{1}: name=\'{2}\', value={3}, symbol_size={4},'
+                ' bind={5}, type={6}, visibility={7}, shndx={8}>'
+                .format(self.__class__.__name__, hex(id(self)), self.name,
+                        hex(self.value), self.symbol_size,
+                        STB.bycode[self.bind].name if self.bind in STB.bycode else self.bind,
+                        STT.bycode[self.type].name if self.type in STT.bycode else self.type,
+                        STV.bycode[self.visibility].name,
+                        self.shndx))
+
+    def _list_encode(self):
+        return (self.__class__.__name__,
+                hex(id(self)),
+                {
+                    'name': self.name,
+                    'value': hex(self.value),
+                    'symbol_size': self.symbol_size,
+                    'bind': STB.bycode[self.bind].name if self.bind in STB.bycode else self.bind,
+                    'type': STT.bycode[self.type].name if self.type in STT.bycode else self.type,
+                    'visibility': STV.bycode[self.visibility].name,
+                    'shndx': self.shndx,
+                })
+
+class STB(coding.Coding):
     """
-    fileHeaderClass = ElfFileHeader32b
-    sectionHeaderClass = ElfSectionHeader32b
-    programHeaderClass = ElfProgramHeader32b
+    Encodes the symbol binding as recorded in the high four bits of
+    :py:attr:`ElfSymbol.info`.
 
-class ElfFile32l(ElfFile):
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfSymbol.bind`.
     """
-    A subclass of :py:class:`ElfFile`.  Represents 32-bit,
-    little-endian files.
+    bycode = byname = {}
+    overload_codes = True
+
+STB('STB_LOCAL', 0, 'not visible outside the object file containing their definition')
+STB('STB_GLOBAL', 1, 'visible to all object files being combined')
+STB('STB_WEAK', 2, 'resemble global symbols, but their definitions have lower precedence')
+STB('STB_LOOS', 10, '')
+STB('STB_GNU_UNIQUE', 10, 'Unique symbol (GNU).')
+STB('STB_HIOS', 12, '')
+STB('STB_LOPROC', 13, '')
+STB('STB_HIPROC', 15, '')
+
+class STT(coding.Coding):
     """
-    fileHeaderClass = ElfFileHeader32l
-    sectionHeaderClass = ElfSectionHeader32l
-    programHeaderClass = ElfProgramHeader32l
+    Encodes the symbol type as recorded in the low four bits of
+    :py:attr:`ElfSymbol.info`.
 
-class ElfFile64b(ElfFile):
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfSymbol.type`.
     """
-    A subclass of :py:class:`ElfFile`.  Represents 64-bit, big-endian
-    files.
+    bycode = byname = {}
+    overload_codes = True
+
+STT('STT_NOTYPE', 0, 'The symbol\'s type is not specified.')
+STT('STT_OBJECT', 1, 'associated with a data object, such as a variable, an array, and so on')
+STT('STT_FUNC', 2, 'associated with a function or other executable code')
+STT('STT_SECTION', 3, 'associated with a section')
+STT('STT_FILE', 4, 'gives the name of the source file associated with the object file')
+STT('STT_COMMON', 5, 'labels an uninitialized common block')
+STT('STT_TLS', 6, 'specifies a Thread-Local Storage entity')
+STT('STT_LOOS', 10, '')
+STT('STT_GNU_IFUNC', 10, 'Indirect code object (GNU).')
+STT('STT_HIOS', 12, '')
+STT('STT_LOPROC', 13, '')
+STT('STT_HIPROC', 15, '')
+
+class STV(coding.Coding):
     """
-    fileHeaderClass = ElfFileHeader64b
-    sectionHeaderClass = ElfSectionHeader64b
-    programHeaderClass = ElfProgramHeader64b
+    Encodes the symbol visibility as recorded in the low two bits of
+    :py:attr:`ElfSymbol.other`.
 
-class ElfFile64l(ElfFile):
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfSymbol.visibility`.
     """
-    A subclass of :py:class:`ElfFile`.  Represents 64-bit,
-    little-endian files.
+    bycode = byname = {}
+
+STV('STV_DEFAULT', 0, 'visibility is as specified by the symbol\'s binding type')
+STV('STV_INTERNAL', 1, 'processor specific hidden class')
+STV('STV_HIDDEN', 2, 'not visible to other components')
+STV('STV_PROTECTED', 3, 'visible in other components but not preemptable')
+
+class ElfSymbol32(ElfSymbol):
     """
-    fileHeaderClass = ElfFileHeader64l
-    sectionHeaderClass = ElfSectionHeader64l
-    programHeaderClass = ElfProgramHeader64l
+    32 vs 64 bit files have differing element orders.  This class
+    represents the 32 bit element order.  A subclass of
+    :py:class:`ElfSymbol`.
+    """
+    __slots__ = ()
 
-_fileEncodingDict = {
-    1: {
-        1: ElfFile32l,
-        2: ElfFile32b,
-        },
-    2: {
-        1: ElfFile64l,
-        2: ElfFile32b,
-        },
-    }
-"""
-This is a dict of dicts.  The first level keys correspond to
-:py:class:`ElfClass` codes and the values are second level dicts.  The
-second level dict keys correspond to :py:class:`ElfData` codes and the
-second level values are the four :py:class:`ElfFile` subclasses.  It
-is used by :py:meth:`ElfClass.encodedClass` to determine an
-appropriate subclass to represent a file based on a
-:py:class:`ElfFileIdent`.
-"""
+    _fields = ('nameoffset', 'value', 'symbol_size', 'info', 'other', 'shndx')
 
-class GRP(coding.Coding):
-    bycode = byname = {}
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        (self.nameoffset, self.value, self.symbol_size, self.info,
+         self.other, self.shndx) = values
+        self.name = None
+        return self
 
-GRP('GRP_COMDAT', 0x1, 'This is a COMDAT group')
-GRP('GRP_MASKOS', 0x0ff00000, 'All bits included in this mask are'
-    ' reserved for operating system-specific semantics')
-GRP('GRP_MASKPROC', 0xf0000000, 'All bits included in this mask'
-    ' are reserved for processor-specific semantics')
+    def unpack_from(self, block, offset=0):
+        (self.nameoffset, self.value, self.symbol_size, self.info,
+         self.other, self.shndx) = self.coder.unpack_from(block, offset)
+
+        return self
+
+    def pack_into(self, block, offset=0):
+        self.coder.pack_into(block, offset,
+                             self.nameoffset, self.value, self.symbol_size, self.info,
+                             self.other, self.shndx)
+
+        return self
+
+class ElfSymbol64(ElfSymbol):
+    """
+    32 vs 64 bit files have differing element orders.  This class
+    represents the 64 bit element order.  A subclass of
+    :py:class:`ElfSymbol`.
+    """
+    __slots__ = ()
+
+    _fields = ('nameoffset', 'info', 'other', 'shndx', 'value', 'symbol_size')
+
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        (self.nameoffset, self.info, self.other, self.shndx,
+         self.value, self.symbol_size) = values
+        self.name = None
+        return self
+
+    def unpack_from(self, block, offset=0):
+        (self.nameoffset, self.info, self.other, self.shndx,
+         self.value, self.symbol_size) = self.coder.unpack_from(block, offset)
+
+        return self
+
+    def pack_into(self, block, offset=0):
+        self.coder.pack_into(block, offset,
+                             self.nameoffset, self.info, self.other, self.shndx,
+                             self.value, self.symbol_size)
+
+        return self
+
+class ElfSymbol32b(ElfSymbol32):
+    """
+    A subclass of :py:class:`ElfSymbol32`.  Represents big endian byte
+    order.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>IIIBBH')
+
+class ElfSymbol32l(ElfSymbol32):
+    """
+    A subclass of :py:class:`ElfSymbol32`.  Represents little endian
+    byte order.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<IIIBBH')
+
+class ElfSymbol64b(ElfSymbol64):
+    """
+    A subclass of :py:class:`ElfSymbol64`.  Represents big endian byte
+    order.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>IBBHQQ')
+
+class ElfSymbol64l(ElfSymbol64):
+    """
+    A subclass of :py:class:`ElfSymbol64`.  Represents little endian
+    byte order.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<IBBHQQ')
+
+class ElfStringTable(object):
+    """
+    A string table section, (SHT_STRTAB), as used for section names,
+    symbol names and dynamic strings.  Strings are looked up by
+    offset and recent lookups are remembered, (up to
+    :py:attr:`memoSize` of them), so repeated lookups of the same name
+    cost a :py:class:`dict` probe.  When many lookups are expected,
+    :py:meth:`split` resolves every string in one pass.
+
+    Terminators are found in the section contents in place, so no
+    copy of the table is made, (even when the contents are unread or
+    a :py:class:`memoryview` into an :py:class:`mmap.mmap`).  If the
+    section contents are replaced, the remembered strings are dropped.
+    """
+
+    section = None
+    """
+    The :py:class:`ElfSectionHeader` of the string table.
+    """
+
+    zero_copy = False
+    """
+    If true, strings are returned as :py:class:`memoryview` slices of
+    the section contents rather than :py:class:`bytes`.  They are only
+    valid until :py:meth:`release` or :py:meth:`ElfFile.close`.
+    """
+
+    memoSize = 4096
+    """
+    The most lookups remembered at once.  The oldest are forgotten
+    first.
+    """
+
+    _nul = re.compile(b'\0')
+
+    def __init__(self, section, zero_copy=False):
+        """
+        :param :py:class:`ElfSectionHeader` section: a string table section
+        :param :py:class:`bool` zero_copy: return :py:class:`memoryview` slices
+        """
+
+        self.section = section
+        self.zero_copy = zero_copy
+        self._source = None
+        self._view = None
+        self._memo = {}
+        self._handedOut = []
+        self._pruneAt = 2 * self.memoSize
+
+    def _check(self):
+        """
+        Start afresh if the section contents have been replaced since
+        they were last looked at.
+        """
+        section = self.section
+        source = section._contentSource if section._contentSource is not None else section._content
+
+        if source is not self._source:
+            self.release()
+            self._source = source
+
+    def _find(self, view, offset):
+        match = self._nul.search(view, offset)
+        return view[offset:match.start() if match else len(view)]
+
+    def _handOut(self, string):
+        """
+        Remember a :py:class:`memoryview` slice given to the caller,
+        (weakly), so :py:meth:`release` can release it.
+        """
+        handedOut = self._handedOut
+        if len(handedOut) >= self._pruneAt:
+            handedOut[:] = [ref for ref in handedOut if ref() is not None]
+            self._pruneAt = max(2 * len(handedOut), 2 * self.memoSize)
+
+        handedOut.append(weakref.ref(string))
+        return string
+
+    def __getitem__(self, offset):
+        """
+        Return the string starting at *offset*.
+        """
+        self._check()
+        memo = self._memo
+
+        try:
+            return memo[offset]
+        except KeyError:
+            pass
+
+        if self.zero_copy:
+            if self._view is None:
+                self._view = _contentView(self.section)
+
+            string = self._handOut(self._find(self._view, offset))
+        else:
+            with _contentView(self.section) as view:
+                string = self._find(view, offset).tobytes()
+
+        if len(memo) >= self.memoSize:
+            del memo[next(iter(memo))]
+
+        memo[offset] = string
+        return string
+
+    def __len__(self):
+        with _contentView(self.section) as view:
+            return len(view)
+
+    def split(self):
+        """
+        Resolve every string in the table in one pass and return a
+        :py:class:`dict` mapping offsets to strings.  The result is
+        not remembered, so it lives only as long as the caller keeps
+        it.  Offsets into the middle of a string, (shared suffixes),
+        are not in it; look those up with ``[]``.
+        """
+
+        self._check()
+        strings = {}
+        start = 0
+
+        if self.zero_copy:
+            if self._view is None:
+                self._view = _contentView(self.section)
+
+            view = self._view
+            for match in self._nul.finditer(view):
+                stop = match.start()
+                strings[start] = self._handOut(view[start:stop])
+                start = stop + 1
+
+        else:
+            with _contentView(self.section) as view:
+                content = view.tobytes()
+
+            for string in content.split(b'\0'):
+                strings[start] = string
+                start += len(string) + 1
+
+        return strings
+
+    def release(self):
+        """
+        Forget remembered strings and release any
+        :py:class:`memoryview` slices handed out.
+        """
+
+        for ref in self._handedOut:
+            string = ref()
+            if string is not None:
+                string.release()
+
+        if self._view is not None:
+            self._view.release()
+
+        self._memo = {}
+        self._handedOut = []
+        self._view = None
+        self._source = None
+
+class StringTableBuilder(object):
+    """
+    Builds the contents of a string table section, (SHT_STRTAB), like
+    the section name table, a symbol string table or the dynamic
+    string table.  Each distinct string is stored once, and a string
+    which is the tail of another, (as ``.text`` is of
+    ``.rela.text``), is not stored at all but points into the longer
+    one.  For example::
+
+        builder = StringTableBuilder(sh.name for sh in f.sectionHeaders)
+        content = builder.build()
+        for sh in f.sectionHeaders:
+            sh.nameoffset = builder[sh.name]
+
+    Tails are found by sorting the strings by their reversal, so
+    building costs O(n log n) for n strings.
+    """
+
+    def __init__(self, strings=()):
+        """
+        :param strings: an iterable of :py:class:`bytes` to :py:meth:`add`
+        """
+
+        self._strings = set()
+        self._offsets = None
+
+        for string in strings:
+            self.add(string)
+
+    def add(self, string):
+        """
+        Add *string* to the table.
+        """
+        string = bytes(string)
+        if string not in self._strings:
+            self._strings.add(string)
+            self._offsets = None
+
+    def __contains__(self, string):
+        return string in self._strings
+
+    def __len__(self):
+        return len(self._strings)
+
+    def build(self):
+        """
+        Lay out the table and return its contents as a
+        :py:class:`bytearray`.  The first byte is always the NUL
+        which the empty string shares.
+        """
+
+        # reversed, in descending order, a string is immediately
+        # preceded by a string it is the tail of, if there is one.
+        reverse = sorted((string[::-1] for string in self._strings), reverse=True)
+
+        content = bytearray(b'\0')
+        offsets = {b'': 0}
+        previous = None
+
+        for string in reverse:
+            if not string:
+                continue
+
+            if previous is not None and previous.startswith(string):
+                offsets[string[::-1]] = offsets[previous[::-1]] + len(previous) - len(string)
+                continue
+
+            offsets[string[::-1]] = len(content)
+            content += string[::-1]
+            content += b'\0'
+            previous = string
+
+        self._offsets = offsets
+        return content
+
+    def __getitem__(self, string):
+        """
+        Return the offset of *string* in the table, building it if
+        necessary.
+        """
+        if self._offsets is None:
+            self.build()
+
+        return self._offsets[bytes(string)]
+
+class ElfSymbolTable(object):
+    """
+    A symbol table section, (SHT_SYMTAB or SHT_DYNSYM), decoded in
+    bulk.  The entries are held as a :py:class:`StructTable`, so no
+    per-symbol objects exist unless :py:meth:`symbol` or
+    :py:meth:`symbols` are asked for.  Names are resolved through the
+    linked string table, which is only read on the first name lookup.
+    """
+
+    section = None
+    """
+    The :py:class:`ElfSectionHeader` of the symbol table.
+    """
+
+    stringSection = None
+    """
+    The :py:class:`ElfSectionHeader` of the linked string table.
+    """
+
+    symbolClass = None
+    """
+    The :py:class:`ElfSymbol` subclass used to decode entries.
+    """
+
+    table = None
+    """
+    A :py:class:`StructTable` holding one column per
+    :py:class:`ElfSymbol` field.
+    """
+
+    strings = None
+    """
+    The :py:class:`ElfStringTable` of the linked string table.
+    """
+
+    def __init__(self, elffile, section, use_numpy=False):
+        """
+        :param :py:class:`ElfFile` elffile: the file containing *section*
+        :param :py:class:`ElfSectionHeader` section: a symbol table section
+        :param :py:class:`bool` use_numpy: decode into numpy columns
+        """
+
+        self.section = section
+        self.stringSection = elffile.sectionHeaders[section.link]
+        self.strings = elffile.stringTable(section.link)
+        self.symbolClass = elffile.symbolClass
+
+        entsize = section.entsize or self.symbolClass.size
+        with _contentView(section) as view:
+            self.table = StructTable(self.symbolClass, view, 0,
+                                     section.section_size // entsize, entsize, use_numpy)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, field):
+        return self.table[field]
+
+    def name(self, index):
+        """
+        Return the name of the symbol at *index*.
+        """
+        return self.strings[int(self.table['nameoffset'][index])]
+
+    def names(self):
+        """
+        Return a :py:class:`list` of the names of all symbols.
+        """
+        split = self.strings.split()
+        strings = self.strings
+        return [split[offset] if offset in split else strings[offset]
+                for offset in map(int, self.table['nameoffset'])]
+
+    def symbol(self, index):
+        """
+        Return an :py:class:`ElfSymbol` for the entry at *index*,
+        with its name resolved.
+        """
+        columns = self.table.columns
+        symbol = self.symbolClass._from_values([int(columns[field][index]) for field in self.symbolClass._fields])
+        symbol.name = self.name(index)
+        return symbol
+
+    def symbols(self):
+        """
+        Generate an :py:class:`ElfSymbol` for each entry, with names
+        resolved.
+        """
+        columns = [self.table.columns[field] for field in self.symbolClass._fields]
+        fromValues = self.symbolClass._from_values
+
+        for i, name in enumerate(self.names()):
+            symbol = fromValues([int(column[i]) for column in columns])
+            symbol.name = name
+            yield symbol
+
+class ElfSymbolIndex(object):
+    """
+    An index over the symbols of one or more :py:class:`ElfSymbolTable`'s
+    supporting lookup by name through a :py:class:`dict` and by address
+    through :py:mod:`bisect` over a sorted array of start addresses.
+
+    Only defined symbols, (those not in SHN_UNDEF), are indexed by
+    address and section and file symbols are left out, as are ARM
+    and AArch64 mapping symbols, (``$a``, ``$t``, ``$d``, ``$x``),
+    which mark code and data rather than name them.  Addresses are
+    only meaningful for executables and shared objects; in relocatable
+    files symbol values are section offsets.
+
+    Instances can be reduced to plain tuples and rebuilt, which is how
+    :py:class:`MetadataCache` keeps them.
+    """
+
+    byName = None
+    """
+    A :py:class:`dict` mapping symbol names to lists of
+    :py:class:`ElfSymbol`'s.
+    """
+
+    starts = None
+    """
+    An :py:class:`array.array` of symbol start addresses in ascending
+    order, parallel to :py:attr:`byAddress`.
+    """
+
+    byAddress = None
+    """
+    A :py:class:`list` of :py:class:`ElfSymbol`'s sorted by address.
+    """
+
+    maxEnds = None
+    """
+    An :py:class:`array.array` parallel to :py:attr:`starts` holding,
+    for each entry, the greatest end address of it and all the
+    entries before it.  This bounds the search back for an enclosing
+    symbol in :py:meth:`symbol_at`.
+    """
+
+    _mappingSymbol = re.compile(b'\\$[atdx](\\.|$)')
+
+    def __init__(self, tables):
+        """
+        :param tables: an iterable of :py:class:`ElfSymbolTable`'s
+        """
+
+        undef = SHN.byname['SHN_UNDEF'].code
+        skip = (STT.byname['STT_SECTION'].code, STT.byname['STT_FILE'].code)
+
+        self.byName = {}
+        located = []
+
+        for table in tables:
+            for symbol in table.symbols():
+                if symbol.name:
+                    self.byName.setdefault(symbol.name, []).append(symbol)
+
+                if (symbol.shndx != undef and symbol.type not in skip
+                    and not (symbol.name and self._mappingSymbol.match(symbol.name))):
+                    located.append(symbol)
+
+        located.sort(key=operator.attrgetter('value'))
+        self._locate(located)
+
+    def _locate(self, located):
+        self.byAddress = located
+        self.starts = array.array('Q', [symbol.value for symbol in located])
+
+        self.maxEnds = array.array('Q', [0] * len(located))
+        end = 0
+        for k, symbol in enumerate(located):
+            end = max(end, symbol.value + symbol.symbol_size)
+            self.maxEnds[k] = end
+
+    def _values(self):
+        """
+        Return the index as a tuple of plain tuples, (each symbol's
+        fields followed by its name, then the positions of the symbols
+        by address and by name), for :py:meth:`_from_values`.
+        """
+
+        numbers = {}
+        symbols = []
+
+        def number(symbol):
+            key = id(symbol)
+            if key not in numbers:
+                numbers[key] = len(symbols)
+                symbols.append(tuple(getattr(symbol, field) for field in symbol._fields) + (symbol.name,))
+            return numbers[key]
+
+        located = tuple(number(symbol) for symbol in self.byAddress)
+        byName = tuple((name, tuple(number(symbol) for symbol in aliases))
+                       for name, aliases in self.byName.items())
+
+        return (tuple(symbols), located, byName)
+
+    @classmethod
+    def _from_values(cls, symbolClass, values):
+        """
+        Rebuild an index from the result of :py:meth:`_values` without
+        reading or sorting the symbol tables again.
+
+        :param :py:class:`type` symbolClass: the :py:class:`ElfSymbol`
+            subclass of the file
+        """
+
+        symbolValues, located, byName = values
+
+        symbols = []
+        for symbolValue in symbolValues:
+            symbol = symbolClass._from_values(symbolValue[:-1])
+            symbol.name = symbolValue[-1]
+            symbols.append(symbol)
+
+        self = cls.__new__(cls)
+        self.byName = dict((name, [symbols[k] for k in indices]) for name, indices in byName)
+        self._locate([symbols[k] for k in located])
+        return self
+
+    def symbols_named(self, name):
+        """
+        Return a :py:class:`list` of the symbols called *name*.
+        """
+        if not isinstance(name, bytes):
+            name = name.encode('utf-8')
+
+        return self.byName.get(name, [])
+
+    def symbol_at(self, address):
+        """
+        Return the symbol whose extent covers *address*, or None.
+
+        A sized symbol covers its whole extent, an unsized one only
+        its start address.  The candidates are the covering symbols
+        with the greatest start address, so a label inside a function
+        is found at its own address and the function everywhere else.
+        Among aliases, sized symbols are preferred over unsized ones
+        and then global symbols over weak and local ones.
+        """
+
+        starts = self.starts
+        maxEnds = self.maxEnds
+        byAddress = self.byAddress
+
+        candidates = []
+        k = bisect.bisect_right(starts, address) - 1
+        while k >= 0:
+            start = starts[k]
+            if candidates and start != candidates[0].value:
+                break
+
+            if not candidates and maxEnds[k] <= address and start != address:
+                # nothing at or before k reaches address
+                break
+
+            symbol = byAddress[k]
+            if address < start + symbol.symbol_size or (symbol.symbol_size == 0 and address == start):
+                candidates.append(symbol)
+
+            k -= 1
+
+        if not candidates:
+            return None
+
+        globl = STB.byname['STB_GLOBAL'].code
+        return min(candidates, key=lambda symbol: (symbol.symbol_size == 0, symbol.bind != globl))
+
+def elf_hash(name):
+    """
+    The System V ABI symbol hash function used by SHT_HASH sections.
+
+    :param :py:class:`bytes` name: a symbol name
+    """
+    h = 0
+    for c in bytearray(name):
+        h = (h << 4) + c
+        g = h & 0xf0000000
+        if g:
+            h ^= g >> 24
+        h &= ~g
+
+    return h & 0xffffffff
+
+def gnu_hash(name):
+    """
+    The GNU symbol hash function, (Bernstein's), used by SHT_GNU_HASH
+    sections.
+
+    :param :py:class:`bytes` name: a symbol name
+    """
+    h = 5381
+    for c in bytearray(name):
+        h = (h * 33 + c) & 0xffffffff
+
+    return h
+
+class ElfHashTable(object):
+    """
+    An abstract base class representing a dynamic symbol hash table
+    section, as used by the dynamic linker to find symbols in the
+    linked SHT_DYNSYM section without searching it.  Lookups read only
+    the hash table words and symbol entries they visit, straight out
+    of the section contents.
+
+    This abstract base class works in tight concert with it's
+    subclasses: :py:class:`ElfSysvHashTable` and
+    :py:class:`ElfGnuHashTable`.
+    """
+
+    section = None
+    """
+    The :py:class:`ElfSectionHeader` of the hash table.
+    """
+
+    symbolSection = None
+    """
+    The :py:class:`ElfSectionHeader` of the symbol table the hash
+    table indexes.
+    """
+
+    stringSection = None
+    """
+    The :py:class:`ElfSectionHeader` of the symbol table's string table.
+    """
+
+    symbolClass = None
+    """
+    The :py:class:`ElfSymbol` subclass used to decode entries.
+    """
+
+    def __init__(self, elffile, section):
+        """
+        :param :py:class:`ElfFile` elffile: the file containing *section*
+        :param :py:class:`ElfSectionHeader` section: a hash table section
+        """
+
+        self.section = section
+        self.symbolSection = elffile.sectionHeaders[section.link]
+        self.stringSection = elffile.sectionHeaders[self.symbolSection.link]
+        self.symbolClass = elffile.symbolClass
+
+        fmt = self.symbolClass.coder.format
+        self._order = fmt[:1] if isinstance(fmt, str) else fmt[:1].decode('ascii')
+        self._word = struct.Struct(str(self._order + 'I'))
+
+    def _symbol(self, index, name):
+        """
+        Return the symbol at *index* if it is called *name* and is
+        defined, (as the dynamic linker skips SHN_UNDEF imports),
+        otherwise None.  Unread section contents are looked at in
+        place rather than read in.
+        """
+        entsize = self.symbolSection.entsize or self.symbolClass.size
+        with _contentView(self.symbolSection) as symbols:
+            symbol = self.symbolClass().unpack_from(symbols, index * entsize)
+
+        if symbol.shndx == SHN.byname['SHN_UNDEF'].code:
+            return None
+
+        start = symbol.nameoffset
+        stop = start + len(name)
+
+        with _contentView(self.stringSection) as strings:
+            if strings[start:stop] == name and strings[stop:stop + 1] == b'\0':
+                symbol.name = name
+                return symbol
+
+        return None
+
+    def lookup(self, name):
+        """
+        Return the :py:class:`ElfSymbol` called *name*, or None.
+
+        :param :py:class:`bytes` name: a symbol name
+        """
+        raise NotImplementedError
+
+class ElfSysvHashTable(ElfHashTable):
+    """
+    A System V ABI SHT_HASH section: nbucket, nchain, the buckets and
+    then the chains, all words.  A subclass of :py:class:`ElfHashTable`.
+    """
+
+    def __init__(self, elffile, section):
+        ElfHashTable.__init__(self, elffile, section)
+
+        if section.entsize == 8:
+            self._word = struct.Struct(str(self._order + 'Q'))
+
+        with _contentView(section) as content:
+            self.nbucket, = self._word.unpack_from(content, 0)
+            self.nchain, = self._word.unpack_from(content, self._word.size)
+
+    def lookup(self, name):
+        if not self.nbucket:
+            return None
+
+        word = self._word
+        size = word.size
+        chains = (2 + self.nbucket) * size
+
+        with _contentView(self.section) as content:
+            index, = word.unpack_from(content, (2 + (elf_hash(name) % self.nbucket)) * size)
+            while index != 0:
+                symbol = self._symbol(index, name)
+                if symbol is not None:
+                    return symbol
+
+                index, = word.unpack_from(content, chains + (index * size))
+
+        return None
+
+class ElfGnuHashTable(ElfHashTable):
+    """
+    A GNU SHT_GNU_HASH section: a four word header, (nbuckets,
+    symoffset, bloom_size, bloom_shift), a bloom filter of address
+    sized words, the buckets and then the hash values of the hashed
+    symbols.  A subclass of :py:class:`ElfHashTable`.
+    """
+
+    def __init__(self, elffile, section):
+        ElfHashTable.__init__(self, elffile, section)
+
+        with _contentView(section) as content:
+            (self.nbuckets, self.symoffset,
+             self.bloomSize, self.bloomShift) = struct.unpack_from(str(self._order + 'IIII'), content, 0)
+
+        self._bloomWord = struct.Struct(str(self._order + ('Q' if issubclass(self.symbolClass, ElfSymbol64) else 'I')))
+        self._bloomBits = self._bloomWord.size * 8
+        self._buckets = 16 + (self.bloomSize * self._bloomWord.size)
+        self._chains = self._buckets + (self.nbuckets * 4)
+
+    def lookup(self, name):
+        if not self.nbuckets or not self.bloomSize:
+            return None
+
+        h = gnu_hash(name)
+        bits = self._bloomBits
+        word = self._word
+
+        with _contentView(self.section) as content:
+            bloom, = self._bloomWord.unpack_from(content, 16 + (((h // bits) % self.bloomSize) * self._bloomWord.size))
+            mask = (1 << (h % bits)) | (1 << ((h >> self.bloomShift) % bits))
+            if bloom & mask != mask:
+                return None
+
+            index, = word.unpack_from(content, self._buckets + ((h % self.nbuckets) * 4))
+            if index < self.symoffset:
+                return None
+
+            while True:
+                chained, = word.unpack_from(content, self._chains + ((index - self.symoffset) * 4))
+
+                if (chained | 1) == (h | 1):
+                    symbol = self._symbol(index, name)
+                    if symbol is not None:
+                        return symbol
+
+                if chained & 1:
+                    return None
+
+                index += 1
+
+class ElfRel(StructBase):
+    """
+    This abstract base class corresponds to an entry in a `relocation
+    section <http://www.sco.com/developers/gabi/latest/ch4.reloc.html>`_
+    without explicit addends, (that is, an :c:type:`Elf32_Rel` or
+    :c:type:`Elf64_Rel`), as found in SHT_REL sections.
+
+    This abstract base class works in tight concert with it's
+    subclasses: :py:class:`ElfRel32b`, :py:class:`ElfRel32l`,
+    :py:class:`ElfRel64b`, and :py:class:`ElfRel64l`.  32 and 64 bit
+    entries differ in how :py:attr:`info` is split into a symbol
+    index and a relocation type.
+
+    Whole sections are usually read through
+    :py:class:`ElfRelocationTable` rather than one entry at a time.
+    """
+
+    __slots__ = {
+        'offset': """
+        The location to be relocated.  A section offset in relocatable
+        files and a virtual address in executables and shared objects.
+        """,
+        'info': """
+        The symbol table index, (:py:attr:`sym`), and the processor
+        specific relocation type, (:py:attr:`type`), combined.
+        """,
+    }
+
+    _fields = ('offset', 'info')
+
+    _symShift = None
+    """
+    The number of bits :py:attr:`info` is shifted right by to get
+    :py:attr:`sym`.  Set by the subclasses.
+    """
+
+    _typeMask = None
+    """
+    The mask applied to :py:attr:`info` to get :py:attr:`type`.  Set
+    by the subclasses.
+    """
+
+    @property
+    def sym(self):
+        """
+        The index into the linked symbol table of the symbol this
+        relocation refers to.
+        """
+        return self.info >> self._symShift
+
+    @property
+    def type(self):
+        """
+        The relocation type, encoded with the :py:class:`coding.Coding`
+        from :py:data:`relocationTypes` for the file's machine.
+        """
+        return self.info & self._typeMask
+
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        self.offset, self.info = values
+        return self
+
+    def unpack_from(self, block, offset=0):
+        self.offset, self.info = self.coder.unpack_from(block, offset)
+        return self
+
+    def pack_into(self, block, offset=0):
+        self.coder.pack_into(block, offset, self.offset, self.info)
+        return self
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__)
+                and self.offset == other.offset
+                and self.info == other.info)
+
+    def __repr__(self):
+        return ('<{0}@{1}: offset={2}, sym={3}, type={4}>'
+                .format(self.__class__.__name__, hex(id(self)),
+                        hex(self.offset), self.sym, self.type))
+
+class ElfRela(ElfRel):
+    """
+    Corresponds to a relocation entry with an explicit addend, (that
+    is, an :c:type:`Elf32_Rela` or :c:type:`Elf64_Rela`), as found in
+    SHT_RELA sections.  A subclass of :py:class:`ElfRel`.
+    """
+
+    __slots__ = {
+        'addend': """
+        A constant addend used to compute the value to be stored.
+        """,
+    }
+
+    _fields = ('offset', 'info', 'addend')
+
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        self.offset, self.info, self.addend = values
+        return self
+
+    def unpack_from(self, block, offset=0):
+        self.offset, self.info, self.addend = self.coder.unpack_from(block, offset)
+        return self
+
+    def pack_into(self, block, offset=0):
+        self.coder.pack_into(block, offset, self.offset, self.info, self.addend)
+        return self
+
+    def __eq__(self, other):
+        return ElfRel.__eq__(self, other) and self.addend == other.addend
+
+    def __repr__(self):
+        return ('<{0}@{1}: offset={2}, sym={3}, type={4}, addend={5}>'
+                .format(self.__class__.__name__, hex(id(self)),
+                        hex(self.offset), self.sym, self.type, self.addend))
+
+class ElfRel32b(ElfRel):
+    """
+    A subclass of :py:class:`ElfRel`.  Represents 32-bit, big-endian
+    entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>II')
+    _symShift = 8
+    _typeMask = 0xff
+
+class ElfRel32l(ElfRel):
+    """
+    A subclass of :py:class:`ElfRel`.  Represents 32-bit,
+    little-endian entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<II')
+    _symShift = 8
+    _typeMask = 0xff
+
+class ElfRel64b(ElfRel):
+    """
+    A subclass of :py:class:`ElfRel`.  Represents 64-bit, big-endian
+    entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>QQ')
+    _symShift = 32
+    _typeMask = 0xffffffff
+
+class ElfRel64l(ElfRel):
+    """
+    A subclass of :py:class:`ElfRel`.  Represents 64-bit,
+    little-endian entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<QQ')
+    _symShift = 32
+    _typeMask = 0xffffffff
+
+class ElfRela32b(ElfRela):
+    """
+    A subclass of :py:class:`ElfRela`.  Represents 32-bit, big-endian
+    entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>IIi')
+    _symShift = 8
+    _typeMask = 0xff
+
+class ElfRela32l(ElfRela):
+    """
+    A subclass of :py:class:`ElfRela`.  Represents 32-bit,
+    little-endian entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<IIi')
+    _symShift = 8
+    _typeMask = 0xff
+
+class ElfRela64b(ElfRela):
+    """
+    A subclass of :py:class:`ElfRela`.  Represents 64-bit, big-endian
+    entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>QQq')
+    _symShift = 32
+    _typeMask = 0xffffffff
+
+class ElfRela64l(ElfRela):
+    """
+    A subclass of :py:class:`ElfRela`.  Represents 64-bit,
+    little-endian entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<QQq')
+    _symShift = 32
+    _typeMask = 0xffffffff
+
+class R_386(coding.Coding):
+    """
+    Encodes the Intel 80386 relocation types.
+
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfRel.type` for EM_386 files.
+    """
+    bycode = byname = {}
+
+R_386('R_386_NONE', 0, 'no relocation')
+R_386('R_386_32', 1, 'direct 32 bit')
+R_386('R_386_PC32', 2, 'PC relative 32 bit')
+R_386('R_386_GOT32', 3, '32 bit GOT entry')
+R_386('R_386_PLT32', 4, '32 bit PLT address')
+R_386('R_386_COPY', 5, 'copy symbol at runtime')
+R_386('R_386_GLOB_DAT', 6, 'create GOT entry')
+R_386('R_386_JMP_SLOT', 7, 'create PLT entry')
+R_386('R_386_RELATIVE', 8, 'adjust by program base')
+R_386('R_386_GOTOFF', 9, '32 bit offset to GOT')
+R_386('R_386_GOTPC', 10, '32 bit PC relative offset to GOT')
+R_386('R_386_32PLT', 11, '32 bit PLT address')
+R_386('R_386_TLS_TPOFF', 14, 'offset in static TLS block')
+R_386('R_386_TLS_IE', 15, 'address of GOT entry for static TLS block offset')
+R_386('R_386_TLS_GOTIE', 16, 'GOT entry for static TLS block offset')
+R_386('R_386_TLS_LE', 17, 'offset relative to static TLS block')
+R_386('R_386_TLS_GD', 18, 'direct 32 bit for GNU version of general dynamic thread local data')
+R_386('R_386_TLS_LDM', 19, 'direct 32 bit for GNU version of local dynamic thread local data in LE code')
+R_386('R_386_16', 20, 'direct 16 bit')
+R_386('R_386_PC16', 21, 'PC relative 16 bit')
+R_386('R_386_8', 22, 'direct 8 bit')
+R_386('R_386_PC8', 23, 'PC relative 8 bit')
+R_386('R_386_TLS_GD_32', 24, 'direct 32 bit for general dynamic thread local data')
+R_386('R_386_TLS_GD_PUSH', 25, 'tag for pushl in GD TLS code')
+R_386('R_386_TLS_GD_CALL', 26, 'relocation for call to __tls_get_addr()')
+R_386('R_386_TLS_GD_POP', 27, 'tag for popl in GD TLS code')
+R_386('R_386_TLS_LDM_32', 28, 'direct 32 bit for local dynamic thread local data in LE code')
+R_386('R_386_TLS_LDM_PUSH', 29, 'tag for pushl in LDM TLS code')
+R_386('R_386_TLS_LDM_CALL', 30, 'relocation for call to __tls_get_addr() in LDM code')
+R_386('R_386_TLS_LDM_POP', 31, 'tag for popl in LDM TLS code')
+R_386('R_386_TLS_LDO_32', 32, 'offset relative to TLS block')
+R_386('R_386_TLS_IE_32', 33, 'GOT entry for negated static TLS block offset')
+R_386('R_386_TLS_LE_32', 34, 'negated offset relative to static TLS block')
+R_386('R_386_TLS_DTPMOD32', 35, 'ID of module containing symbol')
+R_386('R_386_TLS_DTPOFF32', 36, 'offset in TLS block')
+R_386('R_386_TLS_TPOFF32', 37, 'negated offset in static TLS block')
+R_386('R_386_SIZE32', 38, '32 bit symbol size')
+R_386('R_386_TLS_GOTDESC', 39, 'GOT offset for TLS descriptor')
+R_386('R_386_TLS_DESC_CALL', 40, 'marker of call through TLS descriptor for relaxation')
+R_386('R_386_TLS_DESC', 41, 'TLS descriptor containing pointer to code and to argument')
+R_386('R_386_IRELATIVE', 42, 'adjust indirectly by program base')
+R_386('R_386_GOT32X', 43, 'load from 32 bit GOT entry, relaxable')
+
+class R_X86_64(coding.Coding):
+    """
+    Encodes the AMD x86-64 relocation types.
+
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfRel.type` for EM_X86_64 files.
+    """
+    bycode = byname = {}
+
+R_X86_64('R_X86_64_NONE', 0, 'no relocation')
+R_X86_64('R_X86_64_64', 1, 'direct 64 bit')
+R_X86_64('R_X86_64_PC32', 2, 'PC relative 32 bit signed')
+R_X86_64('R_X86_64_GOT32', 3, '32 bit GOT entry')
+R_X86_64('R_X86_64_PLT32', 4, '32 bit PLT address')
+R_X86_64('R_X86_64_COPY', 5, 'copy symbol at runtime')
+R_X86_64('R_X86_64_GLOB_DAT', 6, 'create GOT entry')
+R_X86_64('R_X86_64_JUMP_SLOT', 7, 'create PLT entry')
+R_X86_64('R_X86_64_RELATIVE', 8, 'adjust by program base')
+R_X86_64('R_X86_64_GOTPCREL', 9, '32 bit signed PC relative offset to GOT')
+R_X86_64('R_X86_64_32', 10, 'direct 32 bit zero extended')
+R_X86_64('R_X86_64_32S', 11, 'direct 32 bit sign extended')
+R_X86_64('R_X86_64_16', 12, 'direct 16 bit zero extended')
+R_X86_64('R_X86_64_PC16', 13, '16 bit sign extended PC relative')
+R_X86_64('R_X86_64_8', 14, 'direct 8 bit sign extended')
+R_X86_64('R_X86_64_PC8', 15, '8 bit sign extended PC relative')
+R_X86_64('R_X86_64_DTPMOD64', 16, 'ID of module containing symbol')
+R_X86_64('R_X86_64_DTPOFF64', 17, 'offset in module\'s TLS block')
+R_X86_64('R_X86_64_TPOFF64', 18, 'offset in initial TLS block')
+R_X86_64('R_X86_64_TLSGD', 19, '32 bit signed PC relative offset to two GOT entries for GD symbol')
+R_X86_64('R_X86_64_TLSLD', 20, '32 bit signed PC relative offset to two GOT entries for LD symbol')
+R_X86_64('R_X86_64_DTPOFF32', 21, 'offset in TLS block')
+R_X86_64('R_X86_64_GOTTPOFF', 22, '32 bit signed PC relative offset to GOT entry for IE symbol')
+R_X86_64('R_X86_64_TPOFF32', 23, 'offset in initial TLS block')
+R_X86_64('R_X86_64_PC64', 24, 'PC relative 64 bit')
+R_X86_64('R_X86_64_GOTOFF64', 25, '64 bit offset to GOT')
+R_X86_64('R_X86_64_GOTPC32', 26, '32 bit signed PC relative offset to GOT')
+R_X86_64('R_X86_64_GOT64', 27, '64 bit GOT entry offset')
+R_X86_64('R_X86_64_GOTPCREL64', 28, '64 bit PC relative offset to GOT entry')
+R_X86_64('R_X86_64_GOTPC64', 29, '64 bit PC relative offset to GOT')
+R_X86_64('R_X86_64_GOTPLT64', 30, 'like GOT64, says PLT entry needed')
+R_X86_64('R_X86_64_PLTOFF64', 31, '64 bit GOT relative offset to PLT entry')
+R_X86_64('R_X86_64_SIZE32', 32, 'size of symbol plus 32 bit addend')
+R_X86_64('R_X86_64_SIZE64', 33, 'size of symbol plus 64 bit addend')
+R_X86_64('R_X86_64_GOTPC32_TLSDESC', 34, 'GOT offset for TLS descriptor')
+R_X86_64('R_X86_64_TLSDESC_CALL', 35, 'marker for call through TLS descriptor')
+R_X86_64('R_X86_64_TLSDESC', 36, 'TLS descriptor')
+R_X86_64('R_X86_64_IRELATIVE', 37, 'adjust indirectly by program base')
+R_X86_64('R_X86_64_RELATIVE64', 38, '64 bit adjust by program base')
+R_X86_64('R_X86_64_GOTPCRELX', 41, 'load from 32 bit signed PC relative offset to GOT entry, relaxable')
+R_X86_64('R_X86_64_REX_GOTPCRELX', 42, 'load from 32 bit signed PC relative offset to GOT entry with REX prefix, relaxable')
+
+class R_ARM(coding.Coding):
+    """
+    Encodes the ARM relocation types, (the commonly used ones).
+
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfRel.type` for EM_ARM files.
+    """
+    bycode = byname = {}
+
+R_ARM('R_ARM_NONE', 0, 'no relocation')
+R_ARM('R_ARM_PC24', 1, 'deprecated PC relative 26 bit branch')
+R_ARM('R_ARM_ABS32', 2, 'direct 32 bit')
+R_ARM('R_ARM_REL32', 3, 'PC relative 32 bit')
+R_ARM('R_ARM_LDR_PC_G0', 4, 'PC relative LDR immediate')
+R_ARM('R_ARM_ABS16', 5, 'direct 16 bit')
+R_ARM('R_ARM_ABS12', 6, 'direct 12 bit')
+R_ARM('R_ARM_THM_ABS5', 7, 'direct & 0x7C, (LDR, STR)')
+R_ARM('R_ARM_ABS8', 8, 'direct 8 bit')
+R_ARM('R_ARM_SBREL32', 9, 'static base relative 32 bit')
+R_ARM('R_ARM_THM_CALL', 10, 'PC relative 24 bit, (Thumb32 BL)')
+R_ARM('R_ARM_THM_PC8', 11, 'PC relative & 0x3FC, (Thumb16 LDR, ADD, ADR)')
+R_ARM('R_ARM_BREL_ADJ', 12, 'base relative adjustment')
+R_ARM('R_ARM_TLS_DESC', 13, 'TLS descriptor')
+R_ARM('R_ARM_THM_SWI8', 14, 'obsolete')
+R_ARM('R_ARM_XPC25', 15, 'obsolete')
+R_ARM('R_ARM_THM_XPC22', 16, 'obsolete')
+R_ARM('R_ARM_TLS_DTPMOD32', 17, 'ID of module containing symbol')
+R_ARM('R_ARM_TLS_DTPOFF32', 18, 'offset in TLS block')
+R_ARM('R_ARM_TLS_TPOFF32', 19, 'offset in static TLS block')
+R_ARM('R_ARM_COPY', 20, 'copy symbol at runtime')
+R_ARM('R_ARM_GLOB_DAT', 21, 'create GOT entry')
+R_ARM('R_ARM_JUMP_SLOT', 22, 'create PLT entry')
+R_ARM('R_ARM_RELATIVE', 23, 'adjust by program base')
+R_ARM('R_ARM_GOTOFF32', 24, '32 bit offset to GOT')
+R_ARM('R_ARM_BASE_PREL', 25, '32 bit PC relative offset to GOT')
+R_ARM('R_ARM_GOT_BREL', 26, '32 bit GOT entry')
+R_ARM('R_ARM_PLT32', 27, 'deprecated 32 bit PLT address')
+R_ARM('R_ARM_CALL', 28, 'PC relative 24 bit, (BL, BLX)')
+R_ARM('R_ARM_JUMP24', 29, 'PC relative 24 bit, (B, BL<cond>)')
+R_ARM('R_ARM_THM_JUMP24', 30, 'PC relative 24 bit, (Thumb32 B.W)')
+R_ARM('R_ARM_BASE_ABS', 31, 'adjust by base')
+R_ARM('R_ARM_TARGET1', 38, 'ABS32 or REL32, platform defined')
+R_ARM('R_ARM_SBREL31', 39, 'static base relative 31 bit')
+R_ARM('R_ARM_V4BX', 40, 'BX marker for ARMv4 interworking')
+R_ARM('R_ARM_TARGET2', 41, 'platform defined')
+R_ARM('R_ARM_PREL31', 42, 'PC relative 31 bit')
+R_ARM('R_ARM_MOVW_ABS_NC', 43, 'direct 16 bit, (MOVW)')
+R_ARM('R_ARM_MOVT_ABS', 44, 'direct high 16 bit, (MOVT)')
+R_ARM('R_ARM_MOVW_PREL_NC', 45, 'PC relative 16 bit, (MOVW)')
+R_ARM('R_ARM_MOVT_PREL', 46, 'PC relative high 16 bit, (MOVT)')
+R_ARM('R_ARM_THM_MOVW_ABS_NC', 47, 'direct 16 bit, (Thumb32 MOVW)')
+R_ARM('R_ARM_THM_MOVT_ABS', 48, 'direct high 16 bit, (Thumb32 MOVT)')
+R_ARM('R_ARM_THM_MOVW_PREL_NC', 49, 'PC relative 16 bit, (Thumb32 MOVW)')
+R_ARM('R_ARM_THM_MOVT_PREL', 50, 'PC relative high 16 bit, (Thumb32 MOVT)')
+R_ARM('R_ARM_THM_JUMP19', 51, 'PC relative 20 bit, (Thumb32 B<cond>.W)')
+R_ARM('R_ARM_THM_JUMP11', 102, 'PC relative 12 bit, (Thumb16 B)')
+R_ARM('R_ARM_THM_JUMP8', 103, 'PC relative 9 bit, (Thumb16 B<cond>)')
+R_ARM('R_ARM_TLS_GD32', 104, 'PC relative 32 bit GOT entry for GD symbol')
+R_ARM('R_ARM_TLS_LDM32', 105, 'PC relative 32 bit GOT entry for LDM symbol')
+R_ARM('R_ARM_TLS_LDO32', 106, '32 bit offset relative to TLS block')
+R_ARM('R_ARM_TLS_IE32', 107, 'PC relative 32 bit GOT entry for IE symbol')
+R_ARM('R_ARM_TLS_LE32', 108, '32 bit offset relative to static TLS block')
+R_ARM('R_ARM_IRELATIVE', 160, 'adjust indirectly by program base')
+
+relocationTypes = {
+    EM.byname['EM_386'].code: R_386,
+    EM.byname['EM_X86_64'].code: R_X86_64,
+    EM.byname['EM_ARM'].code: R_ARM,
+    }
+"""
+A :py:class:`dict` mapping :py:class:`EM` codes to the
+:py:class:`coding.Coding` subclass encoding relocation types for that
+machine.  Used by :py:meth:`ElfRelocationTable.typeName`.  Other
+machines can be added here.
+"""
+
+class ElfRelocationTable(object):
+    """
+    A relocation section, (SHT_REL or SHT_RELA), decoded in bulk into
+    one column per quantity rather than one object per entry.  The
+    columns are :py:attr:`columns` ``'offset'``, ``'info'``,
+    ``'sym'``, ``'type'`` and ``'addend'``.  ``'sym'`` and ``'type'``
+    are split out of ``'info'`` in one pass over the column, (shift
+    and mask differ between 32 and 64 bit files).  SHT_REL entries
+    have no explicit addend, (it is stored at the relocated place),
+    so their ``'addend'`` column is all zeros.
+
+    With *use_numpy* the columns are :py:class:`numpy.ndarray`'s and
+    the whole decode is vectorized, which is the way to go for large
+    numbers of relocations.  The :py:class:`StructTable` query
+    methods, (:py:meth:`StructTable.equal` and so on), work on all of
+    the columns through :py:attr:`table`.
+    """
+
+    section = None
+    """
+    The :py:class:`ElfSectionHeader` of the relocation section.
+    """
+
+    relocationClass = None
+    """
+    The :py:class:`ElfRel` or :py:class:`ElfRela` subclass used to
+    decode entries.
+    """
+
+    machine = None
+    """
+    The file's :py:attr:`ElfFileHeader.machine`, (an :py:class:`EM`
+    code), which determines the meaning of ``'type'``.
+    """
+
+    table = None
+    """
+    A :py:class:`StructTable` holding the columns.
+    """
+
+    def __init__(self, elffile, section, use_numpy=False):
+        """
+        :param :py:class:`ElfFile` elffile: the file containing *section*
+        :param :py:class:`ElfSectionHeader` section: a relocation section
+        :param :py:class:`bool` use_numpy: decode into numpy columns
+        """
+
+        self.section = section
+        self.machine = elffile.fileHeader.machine
+
+        if section.type == SHT.byname['SHT_RELA'].code:
+            self.relocationClass = elffile.relaClass
+        else:
+            self.relocationClass = elffile.relClass
+
+        cls = self.relocationClass
+        entsize = section.entsize or cls.size
+        count = section.section_size // entsize
+
+        with _contentView(section) as view:
+            self.table = StructTable(cls, view, 0, count, entsize, use_numpy)
+        columns = self.table.columns
+
+        info = columns['info']
+        typeCode = 'B' if cls._typeMask == 0xff else 'I'
+
+        if use_numpy:
+            columns['sym'] = (info >> cls._symShift).astype('u4')
+            columns['type'] = (info & cls._typeMask).astype(StructTable._numpyCodes[typeCode])
+
+            if 'addend' not in columns:
+                columns['addend'] = numpy.zeros(count, dtype='i8' if cls._symShift == 32 else 'i4')
+
+        else:
+            # reinterpret the native order info column rather than
+            # shifting and masking each entry where the split falls on
+            # a byte boundary.
+            little = sys.byteorder == 'little'
+            if cls._symShift == 32:
+                halves = array.array('I', info.tobytes())
+                columns['sym'] = halves[1::2] if little else halves[0::2]
+                columns['type'] = halves[0::2] if little else halves[1::2]
+            else:
+                columns['sym'] = array.array('I', map(operator.rshift, info, itertools.repeat(cls._symShift, count)))
+                columns['type'] = array.array('B', info.tobytes())[0::4] if little else array.array('B', info.tobytes())[3::4]
+
+            if 'addend' not in columns:
+                addendCode = 'q' if cls._symShift == 32 else 'i'
+                columns['addend'] = array.array(addendCode, bytes(count * array.array(addendCode).itemsize))
+
+    def __len__(self):
+        return len(self.table)
+
+    def __getitem__(self, field):
+        return self.table[field]
+
+    @property
+    def columns(self):
+        """
+        A :py:class:`dict` mapping column names to arrays.
+        """
+        return self.table.columns
+
+    def typeName(self, index):
+        """
+        Return the name of the relocation type of the entry at
+        *index*, (from :py:data:`relocationTypes`), or the number if
+        the machine or the type is unknown.
+        """
+        code = int(self.table['type'][index])
+        coding = relocationTypes.get(self.machine)
+
+        if coding is not None and code in coding.bycode:
+            return coding.bycode[code].name
+
+        return code
+
+    def relocation(self, index):
+        """
+        Return an :py:class:`ElfRel` or :py:class:`ElfRela` for the
+        entry at *index*.
+        """
+        columns = self.table.columns
+        return self.relocationClass._from_values([int(columns[field][index]) for field in self.relocationClass._fields])
+
+    def relocations(self):
+        """
+        Generate an :py:class:`ElfRel` or :py:class:`ElfRela` for each
+        entry.
+        """
+        for i in range(len(self)):
+            yield self.relocation(i)
+
+class ElfDyn(StructBase):
+    """
+    This abstract base class corresponds to an entry in the `dynamic
+    section <http://www.sco.com/developers/gabi/latest/ch5.dynamic.html>`_,
+    (that is, an :c:type:`Elf32_Dyn` or :c:type:`Elf64_Dyn`), as found
+    in the SHT_DYNAMIC section or PT_DYNAMIC segment.
+
+    This abstract base class works in tight concert with it's
+    subclasses: :py:class:`ElfDyn32b`, :py:class:`ElfDyn32l`,
+    :py:class:`ElfDyn64b`, and :py:class:`ElfDyn64l`.
+
+    Whole sections are usually read through :py:class:`ElfDynamic`.
+    """
+
+    __slots__ = {
+        'tag': """
+        The kind of entry, encoded with :py:class:`DT`.
+        """,
+        'val': """
+        The value of the entry, an integer, a string table offset or
+        an address depending on :py:attr:`tag`.
+        """,
+    }
+
+    _fields = ('tag', 'val')
+
+    @classmethod
+    def _from_values(cls, values):
+        self = cls.__new__(cls)
+        self.tag, self.val = values
+        return self
+
+    def unpack_from(self, block, offset=0):
+        self.tag, self.val = self.coder.unpack_from(block, offset)
+        return self
+
+    def pack_into(self, block, offset=0):
+        self.coder.pack_into(block, offset, self.tag, self.val)
+        return self
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__)
+                and self.tag == other.tag
+                and self.val == other.val)
+
+    def __repr__(self):
+        return ('<{0}@{1}: tag={2}, val={3}>'
+                .format(self.__class__.__name__, hex(id(self)),
+                        DT.bycode[self.tag].name if self.tag in DT.bycode else self.tag,
+                        hex(self.val)))
+
+class ElfDyn32b(ElfDyn):
+    """
+    A subclass of :py:class:`ElfDyn`.  Represents 32-bit, big-endian
+    entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>iI')
+
+class ElfDyn32l(ElfDyn):
+    """
+    A subclass of :py:class:`ElfDyn`.  Represents 32-bit,
+    little-endian entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<iI')
+
+class ElfDyn64b(ElfDyn):
+    """
+    A subclass of :py:class:`ElfDyn`.  Represents 64-bit, big-endian
+    entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>qQ')
+
+class ElfDyn64l(ElfDyn):
+    """
+    A subclass of :py:class:`ElfDyn`.  Represents 64-bit,
+    little-endian entries.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<qQ')
+
+class DT(coding.Coding):
+    """
+    Encodes the dynamic section entry tags.
+
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfDyn.tag`.
+    """
+    bycode = byname = {}
+    overload_codes = True
+
+DT('DT_NULL', 0, 'marks the end of the dynamic array')
+DT('DT_NEEDED', 1, 'string table offset of the name of a needed library')
+DT('DT_PLTRELSZ', 2, 'total size of the relocation entries associated with the procedure linkage table')
+DT('DT_PLTGOT', 3, 'address of the procedure linkage table and/or the global offset table')
+DT('DT_HASH', 4, 'address of the symbol hash table')
+DT('DT_STRTAB', 5, 'address of the string table')
+DT('DT_SYMTAB', 6, 'address of the symbol table')
+DT('DT_RELA', 7, 'address of a relocation table with explicit addends')
+DT('DT_RELASZ', 8, 'total size of the DT_RELA relocation table')
+DT('DT_RELAENT', 9, 'size of a DT_RELA relocation entry')
+DT('DT_STRSZ', 10, 'size of the string table')
+DT('DT_SYMENT', 11, 'size of a symbol table entry')
+DT('DT_INIT', 12, 'address of the initialization function')
+DT('DT_FINI', 13, 'address of the termination function')
+DT('DT_SONAME', 14, 'string table offset of the name of the shared object')
+DT('DT_RPATH', 15, 'string table offset of a library search path, (deprecated)')
+DT('DT_SYMBOLIC', 16, 'symbol resolution starts from the shared object itself')
+DT('DT_REL', 17, 'address of a relocation table with implicit addends')
+DT('DT_RELSZ', 18, 'total size of the DT_REL relocation table')
+DT('DT_RELENT', 19, 'size of a DT_REL relocation entry')
+DT('DT_PLTREL', 20, 'type of relocation entry used for the procedure linkage table, (DT_REL or DT_RELA)')
+DT('DT_DEBUG', 21, 'used for debugging')
+DT('DT_TEXTREL', 22, 'relocations may modify a non-writable segment')
+DT('DT_JMPREL', 23, 'address of the relocation entries associated with the procedure linkage table')
+DT('DT_BIND_NOW', 24, 'process all relocations before transferring control')
+DT('DT_INIT_ARRAY', 25, 'address of the array of pointers to initialization functions')
+DT('DT_FINI_ARRAY', 26, 'address of the array of pointers to termination functions')
+DT('DT_INIT_ARRAYSZ', 27, 'size in bytes of the DT_INIT_ARRAY array')
+DT('DT_FINI_ARRAYSZ', 28, 'size in bytes of the DT_FINI_ARRAY array')
+DT('DT_RUNPATH', 29, 'string table offset of a library search path')
+DT('DT_FLAGS', 30, 'flag values specific to the object being loaded')
+DT('DT_ENCODING', 32, 'values at or above this and below DT_LOOS use the d_ptr interpretation when even')
+DT('DT_PREINIT_ARRAY', 32, 'address of the array of pointers to pre-initialization functions')
+DT('DT_PREINIT_ARRAYSZ', 33, 'size in bytes of the DT_PREINIT_ARRAY array')
+DT('DT_SYMTAB_SHNDX', 34, 'address of the SHT_SYMTAB_SHNDX section associated with the DT_SYMTAB table')
+DT('DT_RELRSZ', 35, 'total size of the DT_RELR relocation table')
+DT('DT_RELR', 36, 'address of a relative relocation table')
+DT('DT_RELRENT', 37, 'size of a DT_RELR relocation entry')
+DT('DT_LOOS', 0x6000000d, '')
+DT('DT_GNU_HASH', 0x6ffffef5, 'address of the GNU-style hash table')
+DT('DT_VERSYM', 0x6ffffff0, 'address of the version symbol table')
+DT('DT_RELACOUNT', 0x6ffffff9, 'number of relative DT_RELA relocations')
+DT('DT_RELCOUNT', 0x6ffffffa, 'number of relative DT_REL relocations')
+DT('DT_FLAGS_1', 0x6ffffffb, 'state flags')
+DT('DT_VERDEF', 0x6ffffffc, 'address of the version definition table')
+DT('DT_VERDEFNUM', 0x6ffffffd, 'number of version definitions')
+DT('DT_VERNEED', 0x6ffffffe, 'address of the table of needed versions')
+DT('DT_VERNEEDNUM', 0x6fffffff, 'number of needed versions')
+DT('DT_HIOS', 0x6ffff000, '')
+DT('DT_LOPROC', 0x70000000, '')
+DT('DT_HIPROC', 0x7fffffff, '')
+
+class ElfDynamic(object):
+    """
+    The dynamic section of a file, (from the SHT_DYNAMIC section or,
+    if the file has no section headers, the PT_DYNAMIC segment),
+    indexed by tag.  For example::
+
+        d = f.dynamic()
+        d.needed()              # [b'libc.so.6']
+        d.soname()              # b'libfoo.so.1' or None
+        d[DT.byname['DT_FLAGS_1'].code]
+
+    String valued entries are resolved through the dynamic string
+    table, which is found through the SHT_DYNAMIC section's link or,
+    failing that, by mapping DT_STRTAB through the PT_LOAD segments.
+    """
+
+    entries = None
+    """
+    A :py:class:`list` of :py:class:`ElfDyn`'s, in file order, up to
+    but not including the terminating DT_NULL.
+    """
+
+    tags = None
+    """
+    A :py:class:`dict` mapping :py:class:`DT` codes to lists of values
+    in file order.
+    """
+
+    strings = None
+    """
+    The :py:class:`ElfStringTable` of the dynamic string table, or
+    None if it could not be found.
+    """
+
+    def __init__(self, elffile, content, entsize=None, strings=None):
+        """
+        :param :py:class:`ElfFile` elffile: the file the entries come from
+        :param string content: the dynamic section or segment contents
+        :param int entsize: distance in bytes between entries, if
+            other than the size of :py:attr:`ElfFile.dynClass`
+        :param :py:class:`ElfStringTable` strings: the dynamic string
+            table, if known.  Otherwise it is looked for in *elffile*.
+        """
+
+        cls = elffile.dynClass
+        entsize = entsize or cls.size
+        null = DT.byname['DT_NULL'].code
+
+        self.entries = []
+        self.tags = {}
+
+        for entry in cls.unpack_table(content, 0, len(content) // entsize, entsize):
+            if entry.tag == null:
+                break
+
+            self.entries.append(entry)
+            self.tags.setdefault(entry.tag, []).append(entry.val)
+
+        self.strings = strings if strings is not None else self._find_strings(elffile)
+
+    def _find_strings(self, elffile):
+        for sh in elffile.sectionHeaders:
+            if sh.type == SHT.byname['SHT_DYNAMIC'].code:
+                return elffile.stringTable(sh.link)
+
+        address = self.value(DT.byname['DT_STRTAB'].code)
+        size = self.value(DT.byname['DT_STRSZ'].code)
+        content = elffile.readAddress(address, size) if None not in (address, size) else None
+
+        if content is None:
+            return None
+
+        section = elffile.sectionHeaderClass()
+        section.content = content
+        section.section_size = len(content)
+        return ElfStringTable(section)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, tag):
+        return tag in self.tags
+
+    def __getitem__(self, tag):
+        """
+        Return the :py:class:`list` of values of the entries with *tag*,
+        (a :py:class:`DT` code), which may be empty.
+        """
+        return self.tags.get(tag, [])
+
+    def value(self, tag):
+        """
+        Return the value of the first entry with *tag*, or None.
+        """
+        values = self.tags.get(tag)
+        return values[0] if values else None
+
+    def string(self, tag):
+        """
+        Return the string the first entry with *tag* refers to, or
+        None.
+        """
+        value = self.value(tag)
+        if value is None or self.strings is None:
+            return None
+
+        return self.strings[value]
+
+    def needed(self):
+        """
+        Return a :py:class:`list` of the DT_NEEDED library names.
+        """
+        if self.strings is None:
+            return []
+
+        return [self.strings[value] for value in self[DT.byname['DT_NEEDED'].code]]
+
+    def soname(self):
+        """
+        Return the DT_SONAME, or None.
+        """
+        return self.string(DT.byname['DT_SONAME'].code)
+
+    def rpath(self):
+        """
+        Return the DT_RPATH search path, or None.
+        """
+        return self.string(DT.byname['DT_RPATH'].code)
+
+    def runpath(self):
+        """
+        Return the DT_RUNPATH search path, or None.
+        """
+        return self.string(DT.byname['DT_RUNPATH'].code)
+
+class ElfNote(StructBase):
+    """
+    This abstract base class corresponds to an entry in a `note
+    section <http://www.sco.com/developers/gabi/latest/ch5.pheader.html#note_section>`_
+    or segment, (SHT_NOTE or PT_NOTE): a header of three words,
+    (:c:type:`Elf32_Nhdr` and :c:type:`Elf64_Nhdr` are the same),
+    followed by the owner name and the descriptor, each padded to the
+    note alignment.
+
+    This abstract base class works in tight concert with it's
+    subclasses: :py:class:`ElfNoteb` and :py:class:`ElfNotel`.  Note
+    headers differ only in byte order.
+    """
+
+    __slots__ = {
+        'namesz': """
+        Size in bytes of the owner name, including the terminating null.
+        """,
+        'descsz': """
+        Size in bytes of the descriptor.
+        """,
+        'type': """
+        The type of the note, interpreted according to the owner,
+        (for b'GNU', see :py:class:`NT`).
+        """,
+        'name': """
+        The owner name as :py:class:`bytes`, without the terminating
+        null.
+        """,
+        'desc': """
+        The descriptor as :py:class:`bytes`.
+        """,
+    }
+
+    _fields = ('namesz', 'descsz', 'type')
+
+    @classmethod
+    def unpack_notes(cls, block, offset=0, size=None, align=4):
+        """
+        Generate the notes in *size* bytes of *block* starting at
+        *offset*.
+
+        :param string block: block of memory from which to unpack
+        :param int offset: offset into the memory block of the first note
+        :param int size: number of bytes of notes, (default: to the end of *block*)
+        :param int align: the note alignment, 4 or, (for sections
+            and segments aligned so), 8
+        """
+
+        stop = len(block) if size is None else offset + size
+        header = cls.coder.size
+        mask = align - 1
+
+        while offset + header <= stop:
+            self = cls.__new__(cls)
+            self.namesz, self.descsz, self.type = cls.coder.unpack_from(block, offset)
+            offset += header
+
+            self.name = bytes(block[offset:offset + self.namesz]).rstrip(b'\0')
+            offset = (offset + self.namesz + mask) & ~mask
+
+            self.desc = bytes(block[offset:offset + self.descsz])
+            offset = (offset + self.descsz + mask) & ~mask
+
+            yield self
+
+    @classmethod
+    def pack_notes(cls, notes, align=4):
+        """
+        Return the contents of a note section or segment holding
+        *notes*, as a :py:class:`bytearray`.
+
+        :param notes: an iterable of :py:class:`ElfNote`'s
+        :param int align: the note alignment, as for :py:meth:`unpack_notes`
+        """
+
+        notes = list(notes)
+
+        offsets = [0]
+        for note in notes:
+            offsets.append(offsets[-1] + note.packed_size(offsets[-1], align))
+
+        block = bytearray(offsets[-1])
+        for note, offset in zip(notes, offsets):
+            note.pack_into(block, offset, align)
+
+        return block
+
+    def packed_size(self, offset=0, align=4):
+        """
+        Return the number of bytes this note takes when packed at
+        *offset*, padding included.  As in :py:meth:`unpack_notes`,
+        the name and descriptor are aligned relative to the start of
+        the block, (which is the start of the note section or
+        segment).
+
+        :param int offset: offset of the note
+        :param int align: the note alignment, as for :py:meth:`unpack_notes`
+        """
+        mask = align - 1
+        end = (offset + self.coder.size + len(self.name) + 1 + mask) & ~mask
+        end = (end + len(self.desc) + mask) & ~mask
+        return end - offset
+
+    def unpack_from(self, block, offset=0, align=4):
+        note = next(self.unpack_notes(block, offset, align=align))
+        for slot in ElfNote.__slots__:
+            setattr(self, slot, getattr(note, slot))
+        return self
+
+    def pack_into(self, block, offset=0, align=4):
+        """
+        :param int align: the note alignment, as for
+            :py:meth:`unpack_notes`.  Use the alignment of the
+            containing section or segment, (see
+            :py:meth:`ElfFile.pack_notes`).
+        """
+        mask = align - 1
+
+        self.coder.pack_into(block, offset, len(self.name) + 1, len(self.desc), self.type)
+        offset += self.coder.size
+
+        block[offset:offset + len(self.name)] = self.name
+        block[offset + len(self.name)] = 0
+        offset = (offset + len(self.name) + 1 + mask) & ~mask
+
+        block[offset:offset + len(self.desc)] = self.desc
+        return self
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__)
+                and self.type == other.type
+                and self.name == other.name
+                and self.desc == other.desc)
+
+    def __repr__(self):
+        return ('<{0}@{1}: name={2}, type={3}, descsz={4}>'
+                .format(self.__class__.__name__, hex(id(self)),
+                        self.name, self.type, self.descsz))
+
+class ElfNoteb(ElfNote):
+    """
+    A subclass of :py:class:`ElfNote`.  Represents big endian byte
+    order.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'>III')
+
+class ElfNotel(ElfNote):
+    """
+    A subclass of :py:class:`ElfNote`.  Represents little endian byte
+    order.
+    """
+    __slots__ = ()
+
+    coder = struct.Struct(b'<III')
+
+class NT(coding.Coding):
+    """
+    Encodes the types of notes owned by b'GNU'.
+
+    This is a subclass of :py:class:`coding.Coding` and encodes
+    :py:attr:`ElfNote.type`.
+    """
+    bycode = byname = {}
+
+NT('NT_GNU_ABI_TAG', 1, 'ABI information')
+NT('NT_GNU_HWCAP', 2, 'synthetic hwcap information')
+NT('NT_GNU_BUILD_ID', 3, 'unique build ID bitstring')
+NT('NT_GNU_GOLD_VERSION', 4, 'version of gold used to link')
+NT('NT_GNU_PROPERTY_TYPE_0', 5, 'program property')
+
+class ElfFile32b(ElfFile):
+    """
+    A subclass of :py:class:`ElfFile`.  Represents 32-bit, big-endian
+    files.
+    """
+    fileHeaderClass = ElfFileHeader32b
+    sectionHeaderClass = ElfSectionHeader32b
+    programHeaderClass = ElfProgramHeader32b
+    symbolClass = ElfSymbol32b
+    relClass = ElfRel32b
+    relaClass = ElfRela32b
+    dynClass = ElfDyn32b
+    noteClass = ElfNoteb
+
+class ElfFile32l(ElfFile):
+    """
+    A subclass of :py:class:`ElfFile`.  Represents 32-bit,
+    little-endian files.
+    """
+    fileHeaderClass = ElfFileHeader32l
+    sectionHeaderClass = ElfSectionHeader32l
+    programHeaderClass = ElfProgramHeader32l
+    symbolClass = ElfSymbol32l
+    relClass = ElfRel32l
+    relaClass = ElfRela32l
+    dynClass = ElfDyn32l
+    noteClass = ElfNotel
+
+class ElfFile64b(ElfFile):
+    """
+    A subclass of :py:class:`ElfFile`.  Represents 64-bit, big-endian
+    files.
+    """
+    fileHeaderClass = ElfFileHeader64b
+    sectionHeaderClass = ElfSectionHeader64b
+    programHeaderClass = ElfProgramHeader64b
+    symbolClass = ElfSymbol64b
+    relClass = ElfRel64b
+    relaClass = ElfRela64b
+    dynClass = ElfDyn64b
+    noteClass = ElfNoteb
+
+class ElfFile64l(ElfFile):
+    """
+    A subclass of :py:class:`ElfFile`.  Represents 64-bit,
+    little-endian files.
+    """
+    fileHeaderClass = ElfFileHeader64l
+    sectionHeaderClass = ElfSectionHeader64l
+    programHeaderClass = ElfProgramHeader64l
+    symbolClass = ElfSymbol64l
+    relClass = ElfRel64l
+    relaClass = ElfRela64l
+    dynClass = ElfDyn64l
+    noteClass = ElfNotel
+
+_fileEncodingDict = {
+    1: {
+        1: ElfFile32l,
+        2: ElfFile32b,
+        },
+    2: {
+        1: ElfFile64l,
+        2: ElfFile64b,
+        },
+    }
+"""
+This is a dict of dicts.  The first level keys correspond to
+:py:class:`ElfClass` codes and the values are second level dicts.  The
+second level dict keys correspond to :py:class:`ElfData` codes and the
+second level values are the four :py:class:`ElfFile` subclasses.  It
+is used by :py:meth:`ElfClass.encodedClass` to determine an
+appropriate subclass to represent a file based on a
+:py:class:`ElfFileIdent`.
+"""
+
+class GRP(coding.Coding):
+    bycode = byname = {}
+
+GRP('GRP_COMDAT', 0x1, 'This is a COMDAT group')
+GRP('GRP_MASKOS', 0x0ff00000, 'All bits included in this mask are'
+    ' reserved for operating system-specific semantics')
+GRP('GRP_MASKPROC', 0xf0000000, 'All bits included in this mask'
+    ' are reserved for processor-specific semantics')
+
+
+class ElfArchiveMember(StructBase):
+    """
+    This class corresponds to the header of one member of an ``ar``
+    archive, as found before each member's contents.  The header is
+    text: fixed width, space padded, decimal fields, (octal for
+    :py:attr:`mode`).  Members are normally found through
+    :py:class:`ElfArchive` which resolves long names.
+    """
+
+    __slots__ = {
+        'name': """
+        The member name as :py:class:`bytes`.  Until resolved by
+        :py:class:`ElfArchive` this is the raw name field, (for
+        instance ``b'a.o/'``, ``b'/26'`` or ``b'#1/20'``).
+        """,
+        'date': """
+        Modification time in seconds since the epoch.
+        """,
+        'uid': """
+        Owner user id.
+        """,
+        'gid': """
+        Owner group id.
+        """,
+        'mode': """
+        File mode.
+        """,
+        'member_size': """
+        Size in bytes of the member contents.
+        """,
+        'headerOffset': """
+        Offset into the archive of this header.
+        """,
+        'dataOffset': """
+        Offset into the archive of the member contents.
+        """,
+    }
+
+    coder = struct.Struct(b'16s12s6s6s8s10s2s')
+
+    fmag = b'`\n'
+    """
+    The two bytes which end every member header.
+    """
+
+    def unpack_from(self, block, offset=0):
+        (name, date, uid, gid, mode, size, fmag) = self.coder.unpack_from(block, offset)
+
+        if fmag != self.fmag:
+            raise ElfArchive.NOT_ARCHIVE('bad member header at offset {0}'.format(offset))
+
+        self.name = name.rstrip(b' ')
+        self.date = int(date.strip() or 0)
+        self.uid = int(uid.strip() or 0)
+        self.gid = int(gid.strip() or 0)
+        self.mode = int(mode.strip() or 0, 8)
+        self.member_size = int(size.strip() or 0)
+        self.headerOffset = offset
+        self.dataOffset = offset + self.coder.size
+
+        return self
+
+    def pack_into(self, block, offset=0):
+        fields = [self.name, str(self.date), str(self.uid), str(self.gid),
+                  '{0:o}'.format(self.mode), str(self.member_size)]
+        widths = [16, 12, 6, 6, 8, 10]
+
+        self.coder.pack_into(block, offset,
+                             *([(f if isinstance(f, bytes) else f.encode('ascii')).ljust(w, b' ')
+                                for f, w in zip(fields, widths)] + [self.fmag]))
+
+        return self
+
+    def __eq__(self, other):
+        return (isinstance(other, self.__class__)
+                and self.name == other.name
+                and self.date == other.date
+                and self.uid == other.uid
+                and self.gid == other.gid
+                and self.mode == other.mode
+                and self.member_size == other.member_size)
+
+    def __repr__(self):
+        return ('<{0}@{1}: name={2}, member_size={3}, dataOffset={4}>'
+                .format(self.__class__.__name__, hex(id(self)),
+                        self.name, self.member_size, self.dataOffset))
+
+class ElfArchive(object):
+    """
+    An ``ar`` archive, (static library), read in place.  The member
+    headers are walked once when the archive is opened, resolving
+    GNU, (``//`` table), and BSD, (``#1/``), long names.  Member
+    contents are not touched until a member is opened with
+    :py:meth:`open_member`, and then only through
+    :py:meth:`ElfFile.unpack_from` at the member's offset into the
+    archive, so there is no per-member copy.  Iterating over an
+    archive opens each ELF member in turn::
+
+        with elffile.open_archive('libfoo.a') as a:
+            for ef in a:
+                print(ef.name, len(ef.sectionHeaders))
+
+    Member :py:class:`ElfFile`'s read their contents from the archive
+    and so are only usable while the archive is open.
+
+    The archive symbol index, (armap), is available through
+    :py:meth:`armap`, and :py:meth:`open_defining` uses it the way a
+    linker does to open just the member defining a symbol.
+    """
+
+    name = None
+    """
+    A :py:class:`str` containing the file name of the archive.
+    """
+
+    block = None
+    """
+    The archive contents, (usually an :py:class:`mmap.mmap`).
+    """
+
+    members = None
+    """
+    A :py:class:`list` of the :py:class:`ElfArchiveMember`'s of the
+    regular members, in archive order.  The symbol index and long
+    name table are not included.
+    """
+
+    magic = b'!<arch>\n'
+    """
+    The global header which starts every archive.
+    """
+
+    _map = None
+    _fileobj = None
+    _armap = None
+    _armapIndex = None
+    _symbolIndexMember = None
+    _opened = None
+
+    class NOT_ARCHIVE(Exception):
+        """
+        Raised when attempting to read something which is not an
+        ``ar`` archive, (thin archives included).
+        """
+        pass
+
+    def __init__(self, name, block):
+        """
+        :param :py:class:`str` name: the archive name
+        :param string block: the archive contents
+        """
+
+        if block[:len(self.magic)] != self.magic:
+            raise ElfArchive.NOT_ARCHIVE(name)
+
+        self.name = name
+        self.block = block
+        self.members = []
+
+        longNames = None
+        offset = len(self.magic)
+        size = len(block)
+
+        while offset + ElfArchiveMember.size <= size:
+            member = ElfArchiveMember().unpack_from(block, offset)
+            offset = member.dataOffset + member.member_size + (member.member_size & 1)
+
+            name = member.name
+            if name in (b'/', b'/SYM64/', b'__.SYMDEF', b'__.SYMDEF SORTED', b'__.SYMDEF_64'):
+                self._symbolIndexMember = member
+                continue
+
+            if name == b'//':
+                longNames = bytes(block[member.dataOffset:member.dataOffset + member.member_size])
+                continue
+
+            if name.startswith(b'#1/'):
+                length = int(name[3:])
+                member.name = bytes(block[member.dataOffset:member.dataOffset + length]).rstrip(b'\0')
+                member.dataOffset += length
+                member.member_size -= length
+
+            elif name.startswith(b'/') and longNames is not None:
+                start = int(name[1:])
+                member.name = longNames[start:longNames.index(b'/\n', start)]
+
+            elif name.endswith(b'/'):
+                member.name = name[:-1]
+
+            self.members.append(member)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __iter__(self):
+        """
+        Generate an :py:class:`ElfFile` for each ELF member, skipping
+        any members which are not ELF files.
+        """
+        for member in self.members:
+            if self.block[member.dataOffset:member.dataOffset + 4] == b'\x7fELF':
+                yield self.open_member(member)
+
+    def member(self, name):
+        """
+        Return the first :py:class:`ElfArchiveMember` called *name*,
+        or None.
+        """
+        if not isinstance(name, bytes):
+            name = name.encode('utf-8')
+
+        for member in self.members:
+            if member.name == name:
+                return member
+
+        return None
+
+    def open_member(self, member, zero_copy=False):
+        """
+        Return an :py:class:`ElfFile` for *member*, named
+        ``archive(member)``.  It is unpacked *lazy* from the archive,
+        so only the headers are decoded here and section contents are
+        copied out on first access.  See :py:meth:`ElfFile.unpack_from`.
+
+        :param :py:class:`ElfArchiveMember` member: one of :py:attr:`members`
+        :param :py:class:`bool` zero_copy: if true, contents are
+            :py:class:`memoryview` slices of the archive, which must
+            be released, (by closing the returned :py:class:`ElfFile`),
+            before the archive is closed.
+        """
+        efi = ElfFileIdent()
+        efi.unpack_from(self.block, member.dataOffset)
+
+        name = '{0}({1})'.format(self.name, member.name.decode('utf-8', 'replace'))
+        ef = ElfFile.encodedClass(efi)(name, efi)
+        ef.unpack_from(self.block, member.dataOffset, lazy=True, zero_copy=zero_copy)
+        return ef
+
+    def armap(self):
+        """
+        Return the archive symbol index as a :py:class:`list` of
+        (symbol name, :py:class:`ElfArchiveMember`) pairs in index
+        order, or an empty list if the archive has none.  GNU ``/``
+        and ``/SYM64/`` and BSD ``__.SYMDEF`` indexes are understood.
+        It is decoded on first use and kept.
+        """
+
+        if self._armap is not None:
+            return self._armap
+
+        self._armap = []
+        index = self._symbolIndexMember
+        if index is None:
+            return self._armap
+
+        byOffset = dict((member.headerOffset, member) for member in self.members)
+        data = bytes(self.block[index.dataOffset:index.dataOffset + index.member_size])
+
+        if index.name.startswith(b'__.SYMDEF'):
+            # BSD: the size in bytes of an array of (string offset,
+            # member offset) pairs, the array, the size of the string
+            # table and the strings, all in host, (here taken to be
+            # little endian), order.
+            code = 'Q' if index.name == b'__.SYMDEF_64' else 'I'
+            word = struct.Struct(str('<' + code))
+            ranlibSize, = word.unpack_from(data, 0)
+            strings = word.size + ranlibSize + word.size
+
+            for stroff, offset in struct.iter_unpack(str('<' + code * 2), data[word.size:word.size + ranlibSize]):
+                name = data[strings + stroff:data.index(b'\0', strings + stroff)]
+                if offset in byOffset:
+                    self._armap.append((name, byOffset[offset]))
+
+        else:
+            # GNU: a big endian count, that many member offsets and
+            # then that many null terminated names.
+            code = 'Q' if index.name == b'/SYM64/' else 'I'
+            word = struct.Struct(str('>' + code))
+            count, = word.unpack_from(data, 0)
+            offsets = struct.unpack_from(str('>{0}{1}'.format(count, code)), data, word.size)
+            names = data[word.size * (count + 1):].split(b'\0')
+
+            for name, offset in zip(names, offsets):
+                if offset in byOffset:
+                    self._armap.append((name, byOffset[offset]))
+
+        return self._armap
+
+    def armapIndex(self):
+        """
+        Return a :py:class:`dict` mapping each symbol name in the
+        :py:meth:`armap` to the :py:class:`ElfArchiveMember` defining
+        it.  When more than one member defines a name, the first in
+        the armap wins, as with a linker.  It is built on first use
+        and kept.
+        """
+
+        if self._armapIndex is None:
+            self._armapIndex = dict(reversed(self.armap()))
+
+        return self._armapIndex
+
+    def member_defining(self, name):
+        """
+        Return the :py:class:`ElfArchiveMember` defining the symbol
+        *name* according to the armap, or None.  No member is opened.
+        """
+        if not isinstance(name, bytes):
+            name = name.encode('utf-8')
+
+        return self.armapIndex().get(name)
+
+    def open_defining(self, name, zero_copy=False):
+        """
+        Return the :py:class:`ElfFile` of the member defining the
+        symbol *name* according to the armap, or None.  Only that
+        member is opened, and it is kept for later calls until
+        :py:meth:`close`.  See :py:meth:`open_member`.
+        """
+
+        member = self.member_defining(name)
+        if member is None:
+            return None
+
+        if self._opened is None:
+            self._opened = {}
+
+        key = (member.headerOffset, zero_copy)
+        if key not in self._opened:
+            self._opened[key] = self.open_member(member, zero_copy)
+
+        return self._opened[key]
+
+    def close(self):
+        """
+        Close the :py:class:`mmap.mmap` and file object owned by this
+        archive, if any, (see :py:func:`open_archive`).  Closing more
+        than once is harmless.  Members opened by :py:meth:`open_defining`
+        are closed first.
+
+        :py:class:`ElfArchive` is also a context manager which closes
+        itself on exit.
+        """
+
+        if self._opened is not None:
+            for ef in self._opened.values():
+                ef.close()
+
+            self._opened = None
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+        if self._fileobj is not None:
+            self._fileobj.close()
+            self._fileobj = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return ('<{0}@{1}: name=\'{2}\', members={3}>'
+                .format(self.__class__.__name__, hex(id(self)), self.name, len(self.members)))
+
+class ElfSummary(object):
+    """
+    A compact, picklable digest of an :py:class:`ElfFile`, holding
+    only plain values, (no section or segment contents).  This is
+    what :py:func:`open_many` ships back from its worker processes,
+    so it is deliberately small.
+    """
+
+    __slots__ = {
+        'name': """
+        The file name.
+        """,
+        'elfClass': """
+        The :py:class:`ElfClass` code, (word size).
+        """,
+        'elfData': """
+        The :py:class:`ElfData` code, (byte order).
+        """,
+        'type': """
+        The :py:class:`ET` code.
+        """,
+        'machine': """
+        The :py:class:`EM` code.
+        """,
+        'entry': """
+        The entry point address.
+        """,
+        'sections': """
+        A :py:class:`list` of (name, type, flags, size) tuples, one per
+        section header.
+        """,
+        'segments': """
+        A :py:class:`list` of (type, flags, offset, vaddr, filesz,
+        memsz) tuples, one per program header.
+        """,
+        'interpreter': """
+        The PT_INTERP path name, or None.
+        """,
+        'needed': """
+        A :py:class:`list` of the DT_NEEDED names.
+        """,
+        'soname': """
+        The DT_SONAME, or None.
+        """,
+        'build_id': """
+        The NT_GNU_BUILD_ID descriptor as :py:class:`bytes`, or None.
+        """,
+    }
+
+    def __init__(self, ef):
+        """
+        :param :py:class:`ElfFile` ef: the file to summarize
+        """
+
+        self.name = ef.name
+        self.elfClass = ef.fileIdent.elfClass
+        self.elfData = ef.fileIdent.elfData
+        self.type = ef.fileHeader.type
+        self.machine = ef.fileHeader.machine
+        self.entry = ef.fileHeader.entry
+        self.sections = [(bytes(sh.name), sh.type, sh.flags, sh.section_size) for sh in ef.sectionHeaders]
+        self.segments = [(ph.type, ph.flags, ph.offset, ph.vaddr, ph.filesz, ph.memsz) for ph in ef.programHeaders]
+        self.interpreter = ef.interpreter()
+
+        dynamic = ef.dynamic()
+        self.needed = [bytes(name) for name in dynamic.needed()] if dynamic else []
+        self.soname = dynamic.soname() if dynamic else None
+        if self.soname is not None:
+            self.soname = bytes(self.soname)
+
+        self.build_id = ef.build_id()
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in sorted(self.__slots__))
+
+    def __setstate__(self, state):
+        for slot, value in zip(sorted(self.__slots__), state):
+            setattr(self, slot, value)
+
+    def __repr__(self):
+        return ('<{0}@{1}: name=\'{2}\', type={3}, machine={4}, sections={5}, segments={6}>'
+                .format(self.__class__.__name__, hex(id(self)), self.name,
+                        ET.bycode[self.type].name if self.type in ET.bycode else self.type,
+                        EM.bycode[self.machine].name if self.machine in EM.bycode else self.machine,
+                        len(self.sections), len(self.segments)))
+
+async def scan_async(name=None, fileobj=None, sections=False, executor=None):
+    """
+    A coroutine which runs :py:func:`scan` in *executor*, (the event
+    loop's default executor if None), so that none of the file system
+    calls block the event loop.  To bound concurrency, use an
+    :py:class:`ElfScanner`.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, functools.partial(scan, name=name, fileobj=fileobj, sections=sections))
+
+class ElfScanner(object):
+    """
+    Scans files from :py:mod:`asyncio` code.  Each :py:meth:`scan`
+    runs :py:func:`scan`, (opening, positioned reads and closing), on
+    a thread pool of *workers* threads so the event loop never waits
+    on the file system, and at most *limit* scans are in progress or
+    queued at once; further callers wait their turn in the loop.  For
+    example::
+
+        async with elffile.ElfScanner(workers=8, limit=256) as scanner:
+            ef = await scanner.scan(path)
+            needed = ef.dynamic().needed()
+    """
+
+    executor = None
+    """
+    The :py:class:`concurrent.futures.ThreadPoolExecutor` scans run in.
+    """
+
+    limit = None
+    """
+    The maximum number of scans in progress or queued at once.
+    """
+
+    def __init__(self, workers=4, limit=None):
+        """
+        :param int workers: number of threads doing the reads
+        :param int limit: maximum number of scans in progress or
+            queued, (default four per thread)
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self.limit = limit or (4 * workers)
+        self._semaphore = None
+
+    async def scan(self, name=None, fileobj=None, sections=False):
+        """
+        Return the :py:class:`ElfFile` produced by :py:func:`scan`,
+        waiting for a free slot first if :py:attr:`limit` scans are
+        already under way.
+        """
+
+        if self._semaphore is None:
+            # created here so that it belongs to the running loop
+            self._semaphore = asyncio.Semaphore(self.limit)
+
+        async with self._semaphore:
+            return await scan_async(name, fileobj, sections, self.executor)
+
+    def close(self):
+        """
+        Shut down the thread pool, waiting for scans in progress.
+        """
+        self.executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.get_event_loop().run_in_executor(None, self.close)
+
+def _open_and_apply(name, function):
+    """
+    Open *name* lazily, apply *function* and close it.  Run in
+    :py:func:`open_many` workers, so exceptions are returned rather
+    than raised.
+    """
+    try:
+        with open(name=name, lazy=True) as ef:
+            return function(ef)
+    except Exception as e:
+        return e
+
+def open_many(names, workers=None, function=ElfSummary, threads=False):
+    """
+    Open many files in parallel and generate (name, result) pairs as
+    they complete, (so not necessarily in the order of *names*).
+    Each file is opened *lazy*, (see :py:func:`open`), so only the
+    contents *function* looks at are read.
+
+    :param names: an iterable of file names, consumed as work is
+        handed out, so it may be a generator over a very large tree
+    :param int workers: number of worker processes or threads, (the
+        default is as for :py:mod:`concurrent.futures`)
+    :param function: called with each :py:class:`ElfFile` in the
+        worker to produce the result.  The default,
+        :py:class:`ElfSummary`, keeps interprocess traffic small.
+        With processes it must be picklable, (a module level function
+        or class).
+    :param :py:class:`bool` threads: use a thread pool rather than a
+        process pool.  Parsing holds the GIL, so this only pays when
+        the time goes to waiting on storage.
+
+    If opening or summarizing a file raises an :py:exc:`Exception`,
+    the exception is the result for that file rather than being
+    raised here, so one bad file does not end the run.
+    """
+
+    if threads:
+        executor = concurrent.futures.ThreadPoolExecutor(workers)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(workers)
+
+    # bound the number of files in flight so that neither *names* nor
+    # the results pile up in memory.
+    window = 4 * (workers or os.cpu_count() or 1)
+
+    with executor:
+        names = iter(names)
+        pending = {}
+
+        for name in itertools.islice(names, window):
+            pending[executor.submit(_open_and_apply, name, function)] = name
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                yield pending.pop(future), future.result()
+
+            for name in itertools.islice(names, len(done)):
+                pending[executor.submit(_open_and_apply, name, function)] = name
+
+class MetadataCache(object):
+    """
+    An on-disk cache of decoded headers, so that opening a file seen
+    before skips parsing.  :py:meth:`open` is a replacement for
+    :py:func:`open` with *lazy* set: on a hit the
+    :py:class:`ElfFileIdent`, :py:class:`ElfFileHeader`, section and
+    program header tables, section names and, (with *symbols*), the
+    :py:class:`ElfSymbolIndex` come from the cache and only the
+    contents are left to be read from the file, on demand.
+
+    Entries are keyed either by the file's identity, (real path,
+    size, modification time, inode and device), or, with
+    ``key='content'``, by a hash of its contents, which costs a read
+    of the whole file but survives copies and touches.  Each entry is
+    a separate file in *directory* holding a magic string and format
+    version followed by plain tuples of :py:class:`int`'s and
+    :py:class:`bytes` in :py:mod:`marshal` form, which, unlike
+    :py:mod:`pickle`, cannot run code when read from a shared
+    directory.  Entries are written to a temporary file and moved
+    into place with :py:func:`os.replace`, so processes sharing a
+    directory never see a partial entry, and entries which fail to
+    decode count as misses.
+
+    The directory is scanned once, on the first store, and from then
+    on only this instance's own stores are counted against
+    *max_bytes*.  When they cross it the directory is scanned again
+    and the least recently used entries, (by modification time, which
+    a hit refreshes), are removed until a quarter of the budget is
+    free.
+    """
+
+    directory = None
+    """
+    The directory holding the entries.
+    """
+
+    max_bytes = None
+    """
+    The size budget for the entries in *directory*.
+    """
+
+    key = None
+    """
+    ``'stat'`` or ``'content'``.
+    """
+
+    symbols = False
+    """
+    If true, the :py:meth:`ElfFile.symbolIndex` of files with symbol
+    tables is built on a miss and cached too.
+    """
+
+    hits = 0
+    """
+    The number of opens answered from the cache.
+    """
+
+    misses = 0
+    """
+    The number of opens which had to parse the file.
+    """
+
+    suffix = '.elfcache'
+
+    _magic = b'ELFCACHE'
+
+    _format = 3
+
+    _header = struct.Struct(str('<8sI'))
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, key='stat', symbols=False):
+        """
+        :param :py:class:`str` directory: where entries are kept,
+            (created if need be)
+        :param int max_bytes: size budget for the entries
+        :param :py:class:`str` key: ``'stat'`` or ``'content'``
+        :param :py:class:`bool` symbols: also cache symbol indexes
+        """
+
+        assert key in ('stat', 'content')
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.key = key
+        self.symbols = symbols
+        self.hits = 0
+        self.misses = 0
+        self._bytes = None
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _entry(self, name, fileobj, block):
+        if self.key == 'content':
+            digest = hashlib.blake2b(block, digest_size=20)
+        else:
+            st = os.fstat(fileobj.fileno())
+            identity = (os.path.realpath(name), st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+            digest = hashlib.blake2b(repr(identity).encode('utf-8'), digest_size=20)
+
+        return os.path.join(self.directory, digest.hexdigest() + self.suffix)
+
+    def open(self, name):
+        """
+        Return an :py:class:`ElfFile` for *name*, as :py:func:`open`
+        with *lazy* set would, but from the cache if possible.  The
+        file and its map belong to the result; see
+        :py:meth:`ElfFile.close`.
+        """
+
+        fileobj = io.open(os.path.normpath(os.path.expanduser(name)), 'rb')
+        try:
+            block = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            fileobj.close()
+            raise
+
+        try:
+            entry = self._entry(name, fileobj, block)
+            record = self._load(entry)
+
+            ef = None
+            if record is not None:
+                try:
+                    ef = self._restore(name, record, block)
+                except Exception:
+                    ef = None
+
+            if ef is not None:
+                self.hits += 1
+            else:
+                efi = ElfFileIdent()
+                efi.unpack_from(block)
+
+                ef = ElfFile.encodedClass(efi)(name, efi)
+                ef.unpack_from(block, lazy=True)
+                self._store(entry, ef)
+                self.misses += 1
+
+        except Exception:
+            block.close()
+            fileobj.close()
+            raise
+
+        ef._map = block
+        ef._fileobj = fileobj
+        return ef
+
+    @staticmethod
+    def _plain(value):
+        if value is None or isinstance(value, (int, bytes)):
+            return True
+
+        if isinstance(value, (tuple, list)):
+            return all(MetadataCache._plain(item) for item in value)
+
+        return False
+
+    def _load(self, entry):
+        try:
+            with io.open(entry, 'rb') as f:
+                data = f.read()
+
+            magic, version = self._header.unpack_from(data)
+            if magic != self._magic or version != self._format:
+                return None
+
+            record = marshal.loads(data[self._header.size:])
+        except Exception:
+            return None
+
+        if not isinstance(record, tuple) or len(record) != 6 or not self._plain(record):
+            return None
+
+        try:
+            os.utime(entry, None)
+        except OSError:
+            pass
+
+        return record
+
+    def _restore(self, name, record, block):
+        (identValues, headerValues, sectionValues, names,
+         programValues, symbolValues) = record
+
+        efi = ElfFileIdent._from_values(identValues)
+        ef = ElfFile.encodedClass(efi)(name, efi)
+        ef.fileHeader = ef.fileHeaderClass._from_values(headerValues)
+
+        ef.sectionHeaders = [ef.sectionHeaderClass._from_values(values) for values in sectionValues]
+        for sh, sectionName in zip(ef.sectionHeaders, names):
+            sh.name = sectionName
+
+        ef.programHeaders = [ef.programHeaderClass._from_values(values) for values in programValues]
+
+        if symbolValues is not None:
+            ef._symbolIndex = ElfSymbolIndex._from_values(ef.symbolClass, symbolValues)
+
+        ef._unpack_sections(block, 0, lazy=True)
+        ef._unpack_segments(block, 0, lazy=True)
+        return ef
+
+    def _store(self, entry, ef):
+        fields = lambda header: tuple(getattr(header, field) for field in header._fields)
+
+        symbolValues = None
+        if self.symbols and ef.symbolTables():
+            symbolValues = ef.symbolIndex()._values()
+
+        record = (fields(ef.fileIdent),
+                  fields(ef.fileHeader),
+                  tuple(fields(sh) for sh in ef.sectionHeaders),
+                  tuple(bytes(sh.name) for sh in ef.sectionHeaders),
+                  tuple(fields(ph) for ph in ef.programHeaders),
+                  symbolValues)
+
+        data = self._header.pack(self._magic, self._format) + marshal.dumps(record)
+
+        fd, temporary = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, entry)
+        except Exception:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            raise
+
+        if self._bytes is not None:
+            self._bytes += len(data)
+
+        if self._bytes is None or self._bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for basename in os.listdir(self.directory):
+            if basename.endswith(self.suffix):
+                path = os.path.join(self.directory, basename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            target = self.max_bytes - self.max_bytes // 4
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+                total -= size
+
+        self._bytes = total
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        for basename in os.listdir(self.directory):
+            if basename.endswith(self.suffix):
+                try:
+                    os.unlink(os.path.join(self.directory, basename))
+                except OSError:
+                    pass
+
+        self._bytes = 0
+
+class FileCache(object):
+    """
+    An in-process, least recently used cache of opened
+    :py:class:`ElfFile`'s, for programs which open the same files over
+    and over.  :py:meth:`open` takes the place of :py:func:`open`;
+    entries are keyed by path and file identity, (device, inode, size
+    and modification time), so a file replaced on disk is opened
+    afresh.
+
+    Each entry is charged its file size, (which is what it maps, or
+    with eager reading roughly what it copies), against *max_bytes*.
+    When the budget is exceeded the least recently used entries are
+    evicted and closed, (see :py:meth:`ElfFile.close`), releasing
+    their maps.  So files from the cache belong to the cache: do not
+    close them, and do not use them after later opens may have evicted
+    them.  The most recently opened file is never evicted, even if it
+    alone exceeds the budget.
+
+    :py:attr:`hits`, :py:attr:`misses` and :py:attr:`evictions` count
+    what the cache has done, (see :py:meth:`stats`).  A
+    :py:class:`FileCache` may be shared between threads.
+    """
+
+    max_bytes = None
+    """
+    The byte budget.
+    """
+
+    hits = 0
+    """
+    The number of opens answered from the cache.
+    """
+
+    misses = 0
+    """
+    The number of opens which had to open the file.
+    """
+
+    evictions = 0
+    """
+    The number of files evicted and closed.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, lazy=True, zero_copy=False):
+        """
+        :param int max_bytes: the byte budget
+        :param :py:class:`bool` lazy: passed to :py:func:`open`
+        :param :py:class:`bool` zero_copy: passed to :py:func:`open`
+        """
+
+        self.max_bytes = max_bytes
+        self.lazy = lazy
+        self.zero_copy = zero_copy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = collections.OrderedDict()
+        self._byPath = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def open(self, name):
+        """
+        Return an :py:class:`ElfFile` for *name*, opening it only if it
+        is not already cached.
+        """
+
+        path = os.path.realpath(os.path.expanduser(name))
+        st = os.stat(path)
+        key = (path, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        ef = open(name=path, lazy=self.lazy, zero_copy=self.zero_copy)
+
+        with self._lock:
+            if key in self._entries:
+                # another thread got here first
+                ef.close()
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+            self.misses += 1
+
+            stale = self._byPath.get(path)
+            if stale is not None:
+                self._evict(stale)
+
+            self._entries[key] = (ef, st.st_size)
+            self._byPath[path] = key
+            self._bytes += st.st_size
+
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._evict(next(iter(self._entries)))
+
+        return ef
+
+    def _evict(self, key):
+        ef, size = self._entries.pop(key)
+        del self._byPath[key[0]]
+        self._bytes -= size
+        self.evictions += 1
+        ef.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return os.path.realpath(os.path.expanduser(name)) in self._byPath
+
+    @property
+    def bytes(self):
+        """
+        The bytes currently charged against :py:attr:`max_bytes`.
+        """
+        return self._bytes
+
+    def stats(self):
+        """
+        Return the counters as a :py:class:`dict`, (for exporting to a
+        monitoring system).
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                }
+
+    def clear(self):
+        """
+        Close and forget every cached file.  The counters are kept.
+        """
+        with self._lock:
+            for ef, size in self._entries.values():
+                ef.close()
+
+            self._entries.clear()
+            self._byPath.clear()
+            self._bytes = 0
+
+    close = clear
+
+    def __enter__(self):
+        return self
 
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.clear()
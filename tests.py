@@ -20,9 +20,13 @@ import nose
 from nose.tools import assert_true, assert_false, assert_equal, assert_raises, raises
 
 import glob
+import io
+import marshal
 import sys
 import os
 import mmap
+import pickle
+import struct
 
 import elffile
 
@@ -47,6 +51,907 @@ def testOpen():
     assert_equal(byfileobj, bymap)
     assert_equal(bymap, byblock)
 
+    # what open made is closed when parsing fails, what it was given isn't
+    import gc
+    import warnings
+
+    bogus = os.path.join('testfiles', 'README')
+    for options in [{}, {'lazy': True}, {'zero_copy': True}]:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            assert_raises(elffile.ElfFile.NO_CLASS, elffile.open, name=bogus, **options)
+            gc.collect()
+        assert_equal([], [w for w in caught if issubclass(w.category, ResourceWarning)])
+
+        with open(bogus, 'rb') as fileobj:
+            assert_raises(elffile.ElfFile.NO_CLASS, elffile.open, fileobj=fileobj, **options)
+            assert_false(fileobj.closed)
+
+
+def testLazy():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*')):
+        eager = elffile.open(name=filename)
+        lazy = elffile.open(name=filename, lazy=True)
+
+        shstrndx = lazy.fileHeader.shstrndx
+        for i, sh in enumerate(lazy.sectionHeaders):
+            if i != shstrndx:
+                assert_true(sh._contentSource is not None)
+
+        for ph in lazy.programHeaders:
+            assert_true(ph._contentSource is not None)
+
+        assert_equal(eager, lazy)
+
+        for this, that in zip(eager.programHeaders, lazy.programHeaders):
+            assert_equal(this.content, that.content)
+            assert_true(that._contentSource is None)
+
+
+def testZeroCopy():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*')):
+        eager = elffile.open(name=filename)
+
+        for lazy in [False, True]:
+            with elffile.open(name=filename, zero_copy=True, lazy=lazy) as ef:
+                assert_equal(eager, ef)
+
+                sh = ef.sectionHeaders[1]
+                assert_true(isinstance(sh.content, memoryview))
+                assert_equal(eager.sectionHeaders[1].content, sh.content.tobytes())
+                assert_equal([x.name for x in eager.sectionHeaders],
+                             [x.name for x in ef.sectionHeaders])
+
+                m = ef._map
+
+            assert_true(m.closed)
+            assert_true(ef._fileobj is None)
+            assert_raises(ValueError, bytes, sh.content)
+
+
+def testClose():
+    filenames = glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*'))
+    fds = os.listdir('/proc/self/fd')
+
+    for filename in filenames:
+        elffile.open(name=filename)
+
+    assert_equal(fds, os.listdir('/proc/self/fd'))
+
+    for filename in filenames:
+        ef = elffile.open(name=filename, lazy=True)
+        assert_false(ef._map.closed)
+
+        ef.close()
+        assert_true(ef._map is None)
+        ef.close()
+
+    assert_equal(fds, os.listdir('/proc/self/fd'))
+
+
+def testUnpackTable():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*')):
+        with open(filename, 'rb') as f:
+            content = f.read()
+
+        ef = elffile.open(block=content)
+        fh = ef.fileHeader
+
+        for cls, off, num, entsize in [(ef.sectionHeaderClass, fh.shoff, fh.shnum, fh.shentsize),
+                                       (ef.programHeaderClass, fh.phoff, fh.phnum, fh.phentsize)]:
+            bulk = cls.unpack_table(content, off, num, entsize)
+            single = [cls().unpack_from(content, off + (i * entsize)) for i in range(num)]
+
+            assert_equal(len(single), len(bulk))
+            for this, that in zip(single, bulk):
+                for field in cls._fields:
+                    assert_equal(getattr(this, field), getattr(that, field))
+
+            # padded entries take the slow path
+            padded = bytearray()
+            for i in range(num):
+                padded += content[off + (i * entsize):off + ((i + 1) * entsize)] + b'\0' * 8
+
+            slow = cls.unpack_table(padded, 0, num, entsize + 8)
+            for this, that in zip(single, slow):
+                for field in cls._fields:
+                    assert_equal(getattr(this, field), getattr(that, field))
+
+        assert_equal([], ef.sectionHeaderClass.unpack_table(content, fh.shoff, 0))
+
+
+def testSlots():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*')):
+        ef = elffile.open(name=filename)
+
+        for x in [ef.fileIdent, ef.fileHeader] + ef.sectionHeaders + ef.programHeaders:
+            assert_false(hasattr(x, '__dict__'))
+
+        sh = pickle.loads(pickle.dumps(ef.sectionHeaders[1], pickle.HIGHEST_PROTOCOL))
+        assert_equal(ef.sectionHeaders[1], sh)
+        assert_equal(ef.sectionHeaders[1].name, sh.name)
+
+    assert_true(elffile.ElfSectionHeader32l().name is None)
+
+
+def testSectionTable():
+    alloc = elffile.SHF.byname['SHF_ALLOC'].code
+    rela = elffile.SHT.byname['SHT_RELA'].code
+
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*')):
+        ef = elffile.open(name=filename)
+
+        for use_numpy in [False, True]:
+            if use_numpy and not elffile.numpy:
+                continue
+
+            table = ef.sectionTable(use_numpy=use_numpy)
+            assert_equal(len(ef.sectionHeaders), len(table))
+
+            for field in ef.sectionHeaderClass._fields:
+                assert_equal([getattr(sh, field) for sh in ef.sectionHeaders], list(table[field]))
+
+            assert_equal(sum(sh.section_size for sh in ef.sectionHeaders if sh.flags & alloc),
+                         table.total('section_size', table.masked('flags', alloc)))
+            assert_equal([i for i, sh in enumerate(ef.sectionHeaders) if sh.type == rela],
+                         list(table.equal('type', rela)))
+
+        # edits show up
+        shstrndx = ef.fileHeader.shstrndx
+        assert_false(shstrndx in list(table.masked('flags', alloc)))
+        ef.sectionHeaders[shstrndx].flags |= alloc
+        assert_true(shstrndx in list(ef.sectionTable().masked('flags', alloc)))
+
+
+def testSymbolTables():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*')):
+        ef = elffile.open(name=filename)
+
+        for use_numpy in [False, True]:
+            if use_numpy and not elffile.numpy:
+                continue
+
+            tables = ef.symbolTables(use_numpy=use_numpy)
+            assert_equal([b'.dynsym', b'.symtab'], [t.section.name for t in tables])
+
+            for table in tables:
+                sh = table.section
+                expected = ef.symbolClass.unpack_table(sh.content, 0, sh.section_size // sh.entsize, sh.entsize)
+                assert_equal(expected, list(table.symbols()))
+
+            dynsym = tables[0]
+            names = dynsym.names()
+            for name in [b'd', b'e', b'f']:
+                symbol = dynsym.symbol(names.index(name))
+                assert_equal(name, symbol.name)
+                assert_equal(elffile.STB.byname['STB_GLOBAL'].code, symbol.bind)
+                assert_equal(elffile.STT.byname['STT_FUNC'].code, symbol.type)
+
+            funcs = dynsym.table.equal('info', (elffile.STB.byname['STB_GLOBAL'].code << 4)
+                                       | elffile.STT.byname['STT_FUNC'].code)
+            assert_true(set([b'd', b'e', b'f']) <= set(dynsym.name(i) for i in funcs))
+
+
+def testStringTable():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*')):
+        with elffile.open(name=filename, zero_copy=True) as ef:
+            shstrndx = ef.fileHeader.shstrndx
+            strings = ef.stringTable(shstrndx)
+            assert_true(strings is ef.stringTable(shstrndx))
+
+            content = bytes(ef.sectionHeaders[shstrndx].content)
+            for sh in ef.sectionHeaders:
+                expected = content[sh.nameoffset:content.find(b'\0', sh.nameoffset)]
+                assert_equal(expected, strings[sh.nameoffset])
+                assert_equal(expected, ef.sectionName(sh))
+
+            # offsets into the middle of a name, (shared suffixes)
+            for sh in ef.sectionHeaders[1:]:
+                assert_equal(sh.name[1:], strings[sh.nameoffset + 1])
+
+            views = ef.stringTable(shstrndx, zero_copy=True)
+            split = views.split()
+            assert_true(isinstance(views[1], memoryview))
+            assert_equal(dict((k, bytes(v)) for k, v in split.items()),
+                         dict((k, v) for k, v in strings.split().items() if k in split))
+
+        # lookups are bounded and nothing is read in for them
+        with elffile.open(name=filename, lazy=True) as ef:
+            index, = [i for i, sh in enumerate(ef.sectionHeaders) if sh.name == b'.strtab']
+            strtab = ef.sectionHeaders[index]
+            strings = ef.stringTable(index)
+            strings.memoSize = 4
+
+            names = ef.symbolTables()[1].names()
+            for offset in sorted(set(strings.split()))[:10]:
+                assert_true(strings[offset] in names + [b''])
+
+            assert_equal(4, len(strings._memo))
+            assert_true(strtab._contentSource is not None)
+
+            # replacing the contents is noticed
+            strtab.content = b'\0replaced\0'
+            assert_equal(b'replaced', strings[1])
+
+
+def testRelocationTables():
+    for filename in glob.glob(os.path.join('testfiles', '*', 'a.o')) + glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*')):
+        ef = elffile.open(name=filename)
+        tables = ef.relocationTables()
+        assert_true(tables)
+
+        for table in tables:
+            sh = table.section
+            cls = table.relocationClass
+            assert_equal(sh.type == elffile.SHT.byname['SHT_RELA'].code, issubclass(cls, elffile.ElfRela))
+
+            expected = cls.unpack_table(sh.content, 0, sh.section_size // sh.entsize, sh.entsize)
+            assert_equal(expected, list(table.relocations()))
+            assert_equal([r.sym for r in expected], list(table['sym']))
+            assert_equal([r.type for r in expected], list(table['type']))
+            assert_equal([getattr(r, 'addend', 0) for r in expected], list(table['addend']))
+
+            if elffile.numpy:
+                other = elffile.ElfRelocationTable(ef, sh, use_numpy=True)
+                for field in ['offset', 'sym', 'type', 'addend']:
+                    assert_equal(list(table[field]), [int(x) for x in other[field]])
+
+            if sh.name in (b'.rel.dyn', b'.rela.dyn'):
+                assert_true(table.typeName(0).endswith('_RELATIVE'))
+
+        names = set(table.typeName(i) for table in tables for i in range(len(table)))
+        prefix = 'R_X86_64_' if ef.fileHeader.machine == elffile.EM.byname['EM_X86_64'].code else 'R_386_'
+        assert_true(all(name.startswith(prefix) for name in names))
+
+        # lazy and zero_copy contents are decoded in place, unread
+        for options in [{'lazy': True}, {'zero_copy': True}]:
+            with elffile.open(name=filename, **options) as other:
+                for table, otherTable in zip(tables, other.relocationTables()):
+                    assert_equal(list(table['offset']), list(otherTable['offset']))
+                    if options.get('lazy'):
+                        assert_true(otherTable.section._contentSource is not None)
+
+
+def testDynamic():
+    for dirname in glob.glob(os.path.join('testfiles', '*', '.libs')):
+        for basename, needed, soname in [('libdynamic.so.0.0.0', [b'libc.so.6'], b'libdynamic.so.0'),
+                                         ('hello', [b'libstatic.so.0', b'libdynamic.so.0', b'libc.so.6'], None)]:
+            ef = elffile.open(name=os.path.join(dirname, basename))
+            dynamic = ef.dynamic()
+            assert_true(dynamic is ef.dynamic())
+            assert_equal(needed, dynamic.needed())
+            assert_equal(soname, dynamic.soname())
+            assert_true(elffile.DT.byname['DT_STRTAB'].code in dynamic)
+
+            # without section headers, go through PT_DYNAMIC and DT_STRTAB
+            ef.sectionHeaders = []
+            ef._dynamic = None
+            assert_equal(needed, ef.dynamic().needed())
+            assert_equal(soname, ef.dynamic().soname())
+            assert_equal(dynamic.entries, ef.dynamic().entries)
+
+    assert_equal(None, elffile.open(name=glob.glob(os.path.join('testfiles', '*', 'a.o'))[0]).dynamic())
+
+
+def testScan():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', '*')):
+        if os.path.islink(filename) or filename.endswith('.a'):
+            continue
+
+        full = elffile.open(name=filename)
+        ef = elffile.scan(name=filename)
+
+        assert_equal(full.fileHeader, ef.fileHeader)
+        assert_equal(full.programHeaders, ef.programHeaders)
+        assert_equal([], ef.sectionHeaders)
+        assert_equal(full.interpreter(), ef.interpreter())
+
+        if full.dynamic() is None:
+            assert_equal(None, ef.dynamic())
+        else:
+            assert_equal(full.dynamic().needed(), ef.dynamic().needed())
+            assert_equal(full.dynamic().soname(), ef.dynamic().soname())
+
+        with io.open(filename, 'rb') as f:
+            assert_equal(full.fileHeader, elffile.scan(fileobj=f).fileHeader)
+            assert_false(f.closed)
+
+
+def testNotes():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*')):
+        ef = elffile.open(name=filename)
+
+        notes = list(ef.notes())
+        assert_equal([b'GNU'], [note.name for note in notes])
+        assert_equal(elffile.NT.byname['NT_GNU_BUILD_ID'].code, notes[0].type)
+        assert_equal(20, len(notes[0].desc))
+
+        assert_equal(notes[0].desc, ef.build_id())
+        assert_equal(notes[0].desc, elffile.scan(name=filename).build_id())
+
+        block = bytearray(64)
+        notes[0].pack_into(block)
+        assert_equal(notes[0], ef.noteClass().unpack_from(block))
+
+        # an 8 aligned note section, (like .note.gnu.property on ELF64)
+        sh = [sh for sh in ef.sectionHeaders if sh.type == elffile.SHT.byname['SHT_NOTE'].code][0]
+        sh.addralign = 8
+
+        prop = ef.noteClass()
+        prop.name, prop.type, prop.desc = b'GNU', elffile.NT.byname['NT_GNU_PROPERTY_TYPE_0'].code, b'\1' * 12
+        ef.pack_notes(sh, [prop, notes[0]])
+
+        # header, name padded to 16, descriptor padded to 32
+        assert_equal(32 + 16 + 24, sh.section_size)
+        assert_equal(b'\1' * 12 + b'\0' * 4, bytes(sh.content[16:32]))
+        assert_equal([prop, notes[0]], list(ef.notes()))
+
+        # notes are read in place
+        with elffile.open(name=filename, lazy=True) as lazy:
+            assert_equal(notes, list(lazy.notes()))
+            assert_equal(notes[0].desc, lazy.build_id())
+            assert_true(all(header._contentSource is not None for header in lazy.sectionHeaders[1:] + lazy.programHeaders
+                            if header is not lazy.sectionHeaders[lazy.fileHeader.shstrndx]))
+
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'a.o')):
+        assert_equal(None, elffile.open(name=filename).build_id())
+
+
+def _archive(members):
+    """
+    Build an archive from (raw name, contents) pairs.
+    """
+    block = bytearray(elffile.ElfArchive.magic)
+    for name, data in members:
+        header = elffile.ElfArchiveMember()
+        header.name, header.date, header.uid, header.gid, header.mode = name, 0, 0, 0, 0o644
+        header.member_size = len(data)
+        block += header.pack() + data + (b'\n' if len(data) & 1 else b'')
+    return bytes(block)
+
+def testArchive():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libstatic.a')):
+        dirname = os.path.dirname(filename)
+
+        with elffile.open_archive(name=filename) as archive:
+            assert_equal([b'a.o', b'b.o', b'c.o'], [member.name for member in archive.members])
+            assert_equal([(b'a', b'a.o'), (b'b', b'b.o'), (b'c', b'c.o')],
+                         [(symbol, member.name) for symbol, member in archive.armap()])
+
+            for ef in archive:
+                member = os.path.basename(ef.name)[len('libstatic.a('):-1]
+                assert_true(ef.close_enough(elffile.open(name=os.path.join(dirname, member))))
+
+        # GNU and BSD long names and a BSD symbol index
+        with io.open(os.path.join(dirname, 'a.o'), 'rb') as f:
+            obj = f.read()
+
+        longNames = b'a_rather_long_object_name.o/\n'
+        strings = b'a\0'
+        symdef = struct.pack('<III', 8, 0, 0) + struct.pack('<I', len(strings)) + strings
+
+        first = len(elffile.ElfArchive.magic) + elffile.ElfArchiveMember.size + len(symdef) + (len(symdef) & 1)
+        symdef = struct.pack('<III', 8, 0, first + elffile.ElfArchiveMember.size + len(longNames) + (len(longNames) & 1)) + symdef[12:]
+
+        archive = elffile.ElfArchive('test.a', _archive([(b'__.SYMDEF', symdef), (b'//', longNames),
+                                                         (b'/0', obj), (b'#1/32', b'another_quite_long_name.o'.ljust(32, b'\0') + obj)]))
+        assert_equal([b'a_rather_long_object_name.o', b'another_quite_long_name.o'], [m.name for m in archive.members])
+        assert_equal([(b'a', archive.members[0])], archive.armap())
+        assert_equal(2, len([ef.fileHeader for ef in archive]))
+        assert_equal(len(obj), archive.member(b'another_quite_long_name.o').member_size)
+
+    assert_raises(elffile.ElfArchive.NOT_ARCHIVE, elffile.open_archive, glob.glob(os.path.join('testfiles', '*', '.libs', 'a.o'))[0])
+
+
+def testArchiveLookup():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'lib*.a')):
+        with elffile.open_archive(name=filename) as archive:
+            index = archive.armapIndex()
+            assert_true(index is archive.armapIndex())
+
+            for symbol, member in archive.armap():
+                assert_true(index[symbol] is member)
+                assert_true(archive.member_defining(symbol.decode('ascii')) is member)
+
+                ef = archive.open_defining(symbol)
+                assert_equal(1, len(ef.symbols_named(symbol)))
+                assert_true(ef is archive.open_defining(symbol))
+
+            assert_equal(None, archive.member_defining(b'no_such_symbol'))
+            assert_equal(None, archive.open_defining(b'no_such_symbol'))
+
+            # zero_copy members must be released before the map is closed
+            assert_true(archive.open_defining(archive.armap()[0][0], zero_copy=True).sectionHeaders)
+
+        assert_equal(None, archive._opened)
+
+
+def testOpenMany():
+    names = glob.glob(os.path.join('testfiles', '*', '.libs', '*'))
+    bogus = os.path.join('testfiles', 'README')
+
+    for threads in [False, True]:
+        results = dict(elffile.open_many(names + [bogus], workers=2, threads=threads))
+        assert_equal(set(names + [bogus]), set(results))
+        assert_true(isinstance(results[bogus], elffile.ElfFile.NO_CLASS))
+
+        for name in names:
+            if name.endswith('.a'):
+                continue
+
+            summary = results[name]
+            expected = elffile.ElfSummary(elffile.open(name=name))
+            assert_equal(pickle.loads(pickle.dumps(expected)).__getstate__(), summary.__getstate__())
+            assert_equal([sh.name for sh in elffile.open(name=name).sectionHeaders], [s[0] for s in summary.sections])
+
+
+def testScanAsync():
+    import asyncio
+
+    names = [name for name in glob.glob(os.path.join('testfiles', '*', '.libs', '*'))
+             if not os.path.islink(name) and not name.endswith('.a')]
+
+    async def scanAll():
+        async with elffile.ElfScanner(workers=2, limit=3) as scanner:
+            return await asyncio.gather(*[scanner.scan(name, sections=True) for name in names])
+
+    # asyncio.run is 3.7 and later
+    loop = asyncio.new_event_loop()
+    try:
+        scanned = loop.run_until_complete(scanAll())
+        first = loop.run_until_complete(elffile.scan_async(names[0]))
+    finally:
+        loop.close()
+
+    for name, ef in zip(names, scanned):
+        full = elffile.open(name=name)
+        assert_equal(full.fileHeader, ef.fileHeader)
+        assert_equal(full.programHeaders, ef.programHeaders)
+        fields = lambda sh: [sh.name] + [getattr(sh, field) for field in sh._fields]
+        assert_equal([fields(sh) for sh in full.sectionHeaders], [fields(sh) for sh in ef.sectionHeaders])
+        assert_equal(full.build_id(), ef.build_id())
+        assert_equal(len(list(full.notes())), len(list(ef.notes())))
+
+    assert_equal(elffile.open(name=names[0]).fileHeader, first.fileHeader)
+
+
+def testMetadataCache():
+    import shutil
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    try:
+        names = glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*'))
+
+        for key in ['stat', 'content']:
+            cache = elffile.MetadataCache(os.path.join(directory, key), key=key, symbols=True)
+
+            for name in names:
+                full = elffile.open(name=name)
+                for i in range(2):
+                    with cache.open(name) as ef:
+                        fields = lambda sh: [sh.name] + [getattr(sh, field) for field in sh._fields]
+                        assert_equal(full.fileIdent, ef.fileIdent)
+                        assert_equal(full.fileHeader, ef.fileHeader)
+                        assert_equal([fields(sh) for sh in full.sectionHeaders], [fields(sh) for sh in ef.sectionHeaders])
+                        assert_equal(full.programHeaders, ef.programHeaders)
+                        assert_equal([sh.content for sh in full.sectionHeaders], [sh.content for sh in ef.sectionHeaders])
+                        assert_equal(full.symbol_at(full.symbols_named(b'd')[0].value), ef.symbol_at(full.symbols_named(b'd')[0].value))
+
+            assert_equal(len(names), cache.misses)
+            assert_equal(len(names), cache.hits)
+
+        # entries are plain marshal data behind a magic and version
+        cache = elffile.MetadataCache(os.path.join(directory, 'stat'), max_bytes=1)
+        entries = sorted(glob.glob(os.path.join(directory, 'stat', '*' + cache.suffix)))
+        assert_equal(len(names), len(entries))
+        with io.open(entries[0], 'rb') as f:
+            data = f.read()
+        assert_equal(cache._header.pack(cache._magic, cache._format), data[:cache._header.size])
+        assert_true(cache._plain(marshal.loads(data[cache._header.size:])))
+
+        # undecodable entries are misses and the budget is kept
+        header = cache._header.pack(cache._magic, cache._format)
+        bad = [b'garbage',
+               cache._header.pack(cache._magic, cache._format + 1) + data[cache._header.size:],
+               header + marshal.dumps(compile('0', '', 'eval')),
+               header + marshal.dumps((1.5,) * 6),
+               header + marshal.dumps((0,) * 6)]
+        for payload in bad:
+            for entry in entries:
+                with io.open(entry, 'wb') as f:
+                    f.write(payload)
+
+            for name in names:
+                cache.open(name).close()
+
+        assert_equal((0, len(bad) * len(names)), (cache.hits, cache.misses))
+
+        assert_equal([], glob.glob(os.path.join(directory, 'stat', '*')))
+
+        # the directory is only scanned again once the budget is crossed
+        cache = elffile.MetadataCache(os.path.join(directory, 'budget'))
+        scans = []
+        evict = cache._evict
+        cache._evict = lambda: scans.append(evict())
+        for name in names:
+            cache.open(name).close()
+        assert_equal(1, len(scans))
+        assert_equal(len(names), len(glob.glob(os.path.join(directory, 'budget', '*'))))
+
+    finally:
+        shutil.rmtree(directory)
+
+
+def testFileCache():
+    # largest first, so one eviction always makes room
+    names = sorted(glob.glob(os.path.join('testfiles', '*', '.libs', '*.so.*.*')), key=lambda name: -os.stat(name).st_size)
+    sizes = [os.stat(name).st_size for name in names]
+
+    with elffile.FileCache(max_bytes=sizes[0] + sizes[1]) as cache:
+        first = cache.open(names[0])
+        assert_true(first is cache.open(names[0]))
+        assert_true(cache.open(names[1]) is cache.open(names[1]))
+        assert_equal({'hits': 2, 'misses': 2, 'evictions': 0, 'entries': 2,
+                      'bytes': sizes[0] + sizes[1], 'max_bytes': sizes[0] + sizes[1]}, cache.stats())
+
+        # the least recently used, (names[0]), goes and is closed
+        cache.open(names[1])
+        cache.open(names[2])
+        assert_equal(1, cache.evictions)
+        assert_false(names[0] in cache)
+        assert_true(names[1] in cache)
+        assert_equal(None, first._map)
+
+        assert_true(cache.open(names[0]) is not first)
+        assert_equal(4, cache.misses)
+
+    assert_equal(0, len(cache))
+
+
+def testWriteTo():
+    import tempfile
+
+    for filename in glob.glob(os.path.join('testfiles', '*', '*.o')):
+        ef = elffile.open(name=filename)
+        block = bytearray(ef.size)
+        ef.pack_into(block)
+
+        # unread sections are copied straight from the source file
+        with elffile.open(name=filename, lazy=True) as lazy, tempfile.TemporaryFile() as f:
+            f.write(b'junk')
+            lazy.write_to(f)
+            assert_equal(4 + len(block), f.tell())
+
+            f.seek(4)
+            assert_equal(bytes(block), f.read())
+
+        with elffile.open(name=filename, zero_copy=True) as zc:
+            out = io.BytesIO()
+            zc.write_to(out)
+            assert_equal(bytes(block), out.getvalue())
+
+        ef2 = elffile.open(block=bytes(block))
+        assert_equal(ef, ef2)
+        assert_equal([sh.name for sh in ef.sectionHeaders], [sh.name for sh in ef2.sectionHeaders])
+
+    # size leaves the section names alone until the file is packed
+    for filename in glob.glob(os.path.join('testfiles', '*', 'hello.o')):
+        ef = elffile.open(name=filename)
+        names = ef.sectionHeaders[ef.fileHeader.shstrndx]
+        content = bytes(names.content)
+        offsets = [sh.nameoffset for sh in ef.sectionHeaders]
+
+        comment = [sh for sh in ef.sectionHeaders if sh.name == b'.comment'][0]
+        comment.name = b'.comment.renamed'
+        size = ef.size
+        assert_equal(content, bytes(names.content))
+        assert_equal(offsets, [sh.nameoffset for sh in ef.sectionHeaders])
+
+        # a segment moves along with the section it covers
+        ph = ef.programHeaderClass()
+        for field in ph._fields:
+            setattr(ph, field, 0)
+        ph.type = elffile.PT.byname['PT_NOTE'].code
+        ph.offset, ph.filesz, ph.align = comment.offset, comment.section_size, 1
+        ef.programHeaders.append(ph)
+        ef.fileHeader.phnum = 1
+        ef.fileHeader.phentsize = ef.programHeaderClass.coder.size
+
+        size += ef.fileHeader.phentsize
+        assert_equal(size, ef.size)
+        block = bytearray(size)
+        ef.pack_into(block)
+
+        ef2 = elffile.open(block=bytes(block))
+        assert_equal(b'.comment.renamed', ef2.sectionHeaders[ef.sectionHeaders.index(comment)].name)
+        assert_equal(comment.offset, ef2.programHeaders[0].offset)
+        assert_equal(bytes(comment.content), bytes(ef2.programHeaders[0].content))
+
+    # executables' segments cover the file header and padding, so
+    # they can't be moved and nothing is written
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'hello')) + glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.0.0.0')):
+        with elffile.open(name=filename, lazy=True) as ef:
+            ef.sectionHeaders[-1].name = b'.renamed'
+            offsets = [ph.offset for ph in ef.programHeaders]
+            nameOffsets = [sh.nameoffset for sh in ef.sectionHeaders]
+            out = io.BytesIO()
+            assert_raises(elffile.ElfFile.NO_LAYOUT, ef.write_to, out)
+            assert_raises(elffile.ElfFile.NO_LAYOUT, ef.pack_into, bytearray(ef.size))
+            assert_equal(0, out.tell())
+            assert_equal(offsets, [ph.offset for ph in ef.programHeaders])
+            assert_equal(nameOffsets, [sh.nameoffset for sh in ef.sectionHeaders])
+            assert_true(ef.sectionHeaders[ef.fileHeader.shstrndx]._contentSource is not None)
+
+
+def testPatchInto():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.0.0.0')):
+        with open(filename, 'rb') as f:
+            content = f.read()
+
+        with elffile.open(name=filename, lazy=True) as ef:
+            block = bytearray(content)
+            assert_equal([], ef.patch_into(block))
+
+            names = [sh.name for sh in ef.sectionHeaders]
+            noteIndex, commentIndex = names.index(b'.note.gnu.build-id'), names.index(b'.comment')
+            note, comment = ef.sectionHeaders[noteIndex], ef.sectionHeaders[commentIndex]
+            noteOffset, commentOffset = note.offset, comment.offset
+
+            buildId = bytearray(note.content)
+            buildId[-1] ^= 0xff
+            note.content = buildId
+            comment.content = comment.content[:4]
+
+            written = ef.patch_into(block)
+
+            # the note's bytes plus the comment's shrunken header entry
+            assert_equal(2, len(written))
+            assert_equal((noteOffset, len(buildId)), written[0])
+            assert_equal(comment.offset, commentOffset)
+
+            patched = elffile.open(block=bytes(block))
+            assert_equal(bytes(buildId), bytes(patched.sectionHeaders[noteIndex].content))
+            assert_equal(4, patched.sectionHeaders[commentIndex].section_size)
+            assert_equal(content[:noteOffset], bytes(block[:noteOffset]))
+
+            note.content = bytes(buildId) + b'x'
+            assert_raises(elffile.ElfFile.NO_ROOM, ef.patch_into, block)
+
+            # the note is inside the first PT_LOAD, so it can't shrink
+            note.content = bytes(buildId)[:-4]
+            assert_raises(elffile.ElfFile.NO_ROOM, ef.patch_into, block)
+            note.content = bytes(buildId)
+
+            # .data ends the second PT_LOAD, which shrinks with it
+            data = ef.sectionHeaders[names.index(b'.data')]
+            load = [ph for ph in ef.programHeaders if ph.offset + ph.filesz == data.offset + data.section_size][0]
+            filesz, dataSize = load.filesz, data.section_size
+            data.content = data.content[:2]
+            ef.patch_into(block)
+            assert_equal(filesz - dataSize + 2, load.filesz)
+            patched = elffile.open(block=bytes(block))
+            assert_equal(load.filesz, patched.programHeaders[ef.programHeaders.index(load)].filesz)
+
+            # counts kept in section 0 when they overflow the file header
+            shnum, phnum = len(ef.sectionHeaders), len(ef.programHeaders)
+            ef.sectionHeaders[0].section_size = shnum
+            ef.sectionHeaders[0].info = phnum
+            ef.sectionHeaders[0]._pack_header_into(block, ef.fileHeader.shoff)
+            ef.fileHeader.shnum = 0
+            ef.fileHeader.phnum = elffile.ElfProgramHeader.PN_XNUM
+            ef.fileHeader.pack_into(block, ef.fileIdent.size)
+            assert_equal([], ef.patch_into(block))
+
+
+def testStringTableBuilder():
+    names = [b'', b'.text', b'.rela.text', b'.text.foo', b'.rela.text.foo', b'.data', b'.text', b'foo']
+    builder = elffile.StringTableBuilder(names)
+    content = bytes(builder.build())
+
+    assert_equal(7, len(builder))
+    assert_true(b'.text' in builder)
+    assert_equal(0, builder[b''])
+    assert_equal(len(b'\0.rela.text.foo\0.rela.text\0.data\0'), len(content))
+
+    for name in names:
+        assert_equal(name, content[builder[name]:].split(b'\0')[0])
+
+    builder.add(b'.bss')
+    content = bytes(builder.build())
+    assert_equal(b'.bss', content[builder[b'.bss']:].split(b'\0')[0])
+
+    # the linker merges suffixes the same way
+    for filename in glob.glob(os.path.join('testfiles', '*', '*.o')):
+        ef = elffile.open(name=filename)
+        names = ef.sectionHeaders[ef.fileHeader.shstrndx]
+        size = names.section_size
+
+        ef._regen_section_name_table()
+        assert_equal(size, names.section_size)
+        for sh in ef.sectionHeaders:
+            assert_equal(sh.name, ef.sectionName(sh))
+
+
+def testPackWorkers():
+    import tempfile
+
+    copySize = elffile._numpyCopySize
+    for filename in glob.glob(os.path.join('testfiles', '*', '*.o')):
+        ef = elffile.open(name=filename)
+        block = bytearray(ef.size)
+        ef.pack_into(block)
+
+        try:
+            # small enough that every section goes through numpy, if it's there
+            elffile._numpyCopySize = 1
+
+            with elffile.open(name=filename, lazy=True) as lazy, tempfile.TemporaryFile() as f:
+                f.truncate(lazy.size)
+                m = mmap.mmap(f.fileno(), lazy.size)
+                lazy.pack_into(m, workers=4)
+                assert_equal(bytes(block), m[:])
+                m.close()
+
+                # contents were copied without being read in
+                assert_true(lazy.sectionHeaders[1]._contentSource is not None)
+
+        finally:
+            elffile._numpyCopySize = copySize
+
+
+def testCloseEnough():
+    import hashlib
+
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*')):
+        with elffile.open(name=filename, lazy=True) as this, elffile.open(name=filename, lazy=True) as that:
+            names = [sh.name for sh in this.sectionHeaders]
+            text = names.index(b'.text')
+
+            digest = this.sectionDigest(text)
+            assert_true(digest is this.sectionDigest(text))
+            assert_equal(hashlib.blake2b(bytes(that.sectionHeaders[text].content)).digest(), digest)
+
+            # hashed in place
+            assert_true(this.sectionHeaders[text]._contentSource is not None)
+
+            assert_true(this.close_enough(that))
+
+            comment = that.sectionHeaders[names.index(b'.comment')]
+            comment.content = b'x' * len(comment.content)
+            assert_true(this.close_enough(that))
+
+            code = bytearray(that.sectionHeaders[text].content)
+            code[0] ^= 0xff
+            that.sectionHeaders[text].content = code
+            assert_false(this.close_enough(that))
+
+
+def testSymbolIndex():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'hello')):
+        ef = elffile.open(name=filename)
+
+        main, = ef.symbols_named(b'main')
+        assert_equal(b'main', main.name)
+        assert_equal([], ef.symbols_named('no such symbol'))
+
+        assert_true(ef.symbol_at(main.value) is main)
+        assert_true(ef.symbol_at(main.value + main.symbol_size - 1) is main)
+        assert_true(ef.symbol_at(main.value + main.symbol_size) is not main)
+        assert_true(ef.symbol_at(0) is None)
+
+        # built once, and cacheable
+        index = ef.symbolIndex()
+        assert_true(index is ef.symbolIndex())
+
+        index = pickle.loads(pickle.dumps(index, pickle.HIGHEST_PROTOCOL))
+        assert_equal(main, index.symbol_at(main.value + 1))
+
+    # a local label and ARM mapping symbols inside a function
+    class Table(object):
+        def __init__(self, symbols):
+            self._symbols = symbols
+
+        def symbols(self):
+            return self._symbols
+
+    def symbol(name, value, size, type):
+        s = elffile.ElfSymbol32l()
+        s.name, s.value, s.symbol_size, s.other, s.shndx = name, value, size, 0, 1
+        s.info = (elffile.STB.byname['STB_GLOBAL' if size else 'STB_LOCAL'].code << 4) | elffile.STT.byname[type].code
+        return s
+
+    func = symbol(b'func', 0x1000, 0x100, 'STT_FUNC')
+    label = symbol(b'.Lloop', 0x1010, 0, 'STT_NOTYPE')
+    inner = symbol(b'inner', 0x1020, 0x10, 'STT_OBJECT')
+    mapping = [symbol(b'$a', 0x1000, 0, 'STT_NOTYPE'), symbol(b'$d.1', 0x1080, 0, 'STT_NOTYPE')]
+    after = symbol(b'after', 0x2000, 0x10, 'STT_FUNC')
+
+    index = elffile.ElfSymbolIndex([Table([after, inner, label, func] + mapping)])
+    assert_true(index.symbol_at(0x1000) is func)
+    assert_true(index.symbol_at(0x1010) is label)
+    assert_true(index.symbol_at(0x1014) is func)
+    assert_true(index.symbol_at(0x1024) is inner)
+    assert_true(index.symbol_at(0x1030) is func)
+    assert_true(index.symbol_at(0x1080) is func)
+    assert_true(index.symbol_at(0x10ff) is func)
+    assert_true(index.symbol_at(0x1100) is None)
+    assert_true(index.symbol_at(0x2008) is after)
+    assert_equal([mapping[1]], index.symbols_named(b'$d.1'))
+
+
+def testHashFunctions():
+    assert_equal(0x077905a6, elffile.elf_hash(b'printf'))
+    assert_equal(0x156b2bb8, elffile.gnu_hash(b'printf'))
+    assert_equal(5381, elffile.gnu_hash(b''))
+
+
+def testDynamicSymbolLookup():
+    for filename in glob.glob(os.path.join('testfiles', '*', '.libs', 'libdynamic.so.*.*')):
+        ef = elffile.open(name=filename)
+        assert_true(isinstance(ef.hashTable(), elffile.ElfGnuHashTable))
+
+        dynsym, = [t for t in ef.symbolTables() if t.section.name == b'.dynsym']
+        undef = elffile.SHN.byname['SHN_UNDEF'].code
+
+        defined = set(dynsym.name(i) for i in range(1, len(dynsym)) if dynsym['shndx'][i] != undef)
+        imports = 0
+        for i in range(1, len(dynsym)):
+            symbol = dynsym.symbol(i)
+            if not symbol.name:
+                continue
+
+            if symbol.shndx != undef:
+                assert_equal(symbol, ef.lookup_dynamic_symbol(symbol.name))
+            elif symbol.name not in defined:
+                # imports are not definitions, whichever way we look
+                assert_true(ef.lookup_dynamic_symbol(symbol.name) is None)
+                imports += 1
+
+        assert_true(imports > 0)
+
+        assert_equal(b'd', ef.lookup_dynamic_symbol('d').name)
+        assert_true(ef.lookup_dynamic_symbol(b'no_such_symbol') is None)
+
+        # build a System V hash table for the same symbols
+        nbucket = 3
+        buckets = [0] * nbucket
+        chains = [0] * len(dynsym)
+        for i in range(1, len(dynsym)):
+            h = elffile.elf_hash(dynsym.name(i)) % nbucket
+            chains[i] = buckets[h]
+            buckets[h] = i
+
+        sh = ef.sectionHeaderClass()
+        sh.link = ef.sectionHeaders.index(dynsym.section)
+        sh.entsize = 4
+        sh.content = struct.pack(str('<{0}I'.format(2 + nbucket + len(chains))),
+                                 nbucket, len(chains), *(buckets + chains))
+
+        sysv = elffile.ElfSysvHashTable(ef, sh)
+        for i in range(1, len(dynsym)):
+            if dynsym.name(i) and dynsym['shndx'][i] != undef:
+                assert_equal(dynsym.symbol(i), sysv.lookup(dynsym.name(i)))
+            elif dynsym.name(i) and dynsym.name(i) not in defined:
+                assert_true(sysv.lookup(dynsym.name(i)) is None)
+
+        assert_true(sysv.lookup(b'no_such_symbol') is None)
+
+        # nor without a hash table
+        ef.hashTable = lambda: None
+        for i in range(1, len(dynsym)):
+            if dynsym.name(i) and dynsym.name(i) not in defined:
+                assert_true(ef.lookup_dynamic_symbol(dynsym.name(i)) is None)
+
+        assert_equal(b'd', ef.lookup_dynamic_symbol('d').name)
+
+        # lookups leave lazy contents unread
+        with elffile.open(name=filename, lazy=True) as lazy:
+            assert_equal(b'd', lazy.lookup_dynamic_symbol('d').name)
+            for sh in lazy.sectionHeaders:
+                if sh.name in (b'.dynsym', b'.dynstr'):
+                    assert_true(sh._contentSource is not None)
+
 
 def testTestfiles():
     for filename in (glob.glob(os.path.join('testfiles', '*', '*.o'))
@@ -102,6 +1007,20 @@ def testFileEncoding():
             ident.elfData = j
             assert_equal(elffile._fileEncodingDict[i][j], elffile.ElfFile.encodedClass(ident))
 
+    # one class per word size and byte order, each decoding with its own
+    expected = {(1, 1): elffile.ElfFile32l, (1, 2): elffile.ElfFile32b,
+                (2, 1): elffile.ElfFile64l, (2, 2): elffile.ElfFile64b}
+    for (i, j), cls in expected.items():
+        assert_true(elffile._fileEncodingDict[i][j] is cls)
+
+        order = '<' if j == 1 else '>'
+        for part in [cls.fileHeaderClass, cls.sectionHeaderClass, cls.programHeaderClass,
+                     cls.symbolClass, cls.relClass, cls.relaClass, cls.dynClass, cls.noteClass]:
+            assert_equal(order, part.coder.format[:1] if isinstance(part.coder.format, str) else chr(part.coder.format[0]))
+
+        assert_equal(i == 2, issubclass(cls.symbolClass, elffile.ElfSymbol64))
+        assert_equal(8 * i, cls.dynClass.coder.size)
+
 @raises(elffile.ElfFile.NO_CLASS)
 def testBogusClass():
     ident = elffile.ElfFileIdent()